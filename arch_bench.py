@@ -0,0 +1,192 @@
+import os
+import csv
+import time
+import argparse
+import tempfile
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, models, regularizers
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from model import MODELS_PATH, EPOCHS, BATCH_SIZE, load_cached_data, build_compact_model, fit_model
+
+# --- KONFIGURASI ---
+REPORT_PATH = os.path.join(MODELS_PATH, 'arch_bench.csv')   # Tabel hasil benchmark
+LATENCY_RUNS = 100                                          # Jumlah pengukuran latensi
+
+
+def build_conv2d_variant(input_shape, num_classes, filters=(16, 32, 64), separable=False, global_pool=False):
+    """
+    Varian build_compact_model: jumlah filter, jenis konvolusi (biasa atau
+    depthwise-separable) dan pooling akhir (Flatten atau Global Average Pooling).
+    """
+    conv = layers.SeparableConv2D if separable else layers.Conv2D
+    dropouts = (0.2, 0.3, 0.3)
+
+    stack = [
+        layers.Input(shape=input_shape),
+        layers.Reshape((input_shape[0], input_shape[1], 1)),
+    ]
+    for i, n_filters in enumerate(filters):
+        # Konvolusi pertama tetap Conv2D biasa: input hanya memiliki satu channel
+        block_conv = layers.Conv2D if i == 0 else conv
+        stack += [
+            block_conv(n_filters, (3, 3), padding='same'),
+            layers.Activation('relu'),
+            layers.BatchNormalization(),
+            layers.MaxPooling2D((2, 2)),
+            layers.Dropout(dropouts[min(i, len(dropouts) - 1)]),
+        ]
+    stack += [
+        layers.GlobalAveragePooling2D() if global_pool else layers.Flatten(),
+        layers.Dense(64, activation='relu', kernel_regularizer=regularizers.l2(0.001)),
+        layers.BatchNormalization(),
+        layers.Dropout(0.5),
+        layers.Dense(num_classes, activation='softmax'),
+    ]
+    return _compile(models.Sequential(stack))
+
+
+def build_temporal_model(input_shape, num_classes, filters=(64, 64, 96)):
+    """Konvolusi 1-D sepanjang waktu: koefisien MFCC/delta diperlakukan sebagai channel."""
+    stack = [layers.Input(shape=input_shape)]
+    for n_filters in filters:
+        stack += [
+            layers.Conv1D(n_filters, 5, padding='same'),
+            layers.Activation('relu'),
+            layers.BatchNormalization(),
+            layers.MaxPooling1D(2),
+            layers.Dropout(0.2),
+        ]
+    stack += [
+        layers.GlobalAveragePooling1D(),
+        layers.Dense(64, activation='relu', kernel_regularizer=regularizers.l2(0.001)),
+        layers.Dropout(0.5),
+        layers.Dense(num_classes, activation='softmax'),
+    ]
+    return _compile(models.Sequential(stack))
+
+
+def _compile(model):
+    """Kompilasi dengan pengaturan yang sama seperti build_compact_model."""
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+# Daftar kandidat arsitektur: nama -> fungsi pembangun
+CANDIDATES = {
+    'baseline': build_compact_model,
+    'gap': lambda s, n: build_conv2d_variant(s, n, global_pool=True),
+    'separable': lambda s, n: build_conv2d_variant(s, n, separable=True),
+    'separable_gap': lambda s, n: build_conv2d_variant(s, n, separable=True, global_pool=True),
+    'narrow': lambda s, n: build_conv2d_variant(s, n, filters=(8, 16, 32)),
+    'wide': lambda s, n: build_conv2d_variant(s, n, filters=(32, 64, 128)),
+    'temporal_1d': build_temporal_model,
+}
+
+
+def count_flops(model):
+    """
+    Estimasi FLOPs satu sampel (2 x multiply-accumulate) untuk layer konvolusi dan Dense.
+    Layer lain (aktivasi, BN, pooling) diabaikan karena kontribusinya kecil.
+    """
+    flops = 0
+    for layer in model.layers:
+        if isinstance(layer, (layers.Conv2D, layers.Conv1D, layers.Dense, layers.DepthwiseConv2D, layers.SeparableConv2D)):
+            in_ch = layer.input.shape[-1]
+            out_shape = layer.output.shape[1:]
+            positions = int(np.prod(out_shape[:-1])) if len(out_shape) > 1 else 1
+            out_ch = out_shape[-1]
+
+            if isinstance(layer, layers.SeparableConv2D):
+                k = int(np.prod(layer.kernel_size))
+                flops += 2 * positions * in_ch * (k + out_ch)
+            elif isinstance(layer, layers.DepthwiseConv2D):
+                flops += 2 * positions * int(np.prod(layer.kernel_size)) * out_ch
+            elif isinstance(layer, layers.Dense):
+                flops += 2 * in_ch * out_ch
+            else:
+                flops += 2 * positions * int(np.prod(layer.kernel_size)) * in_ch * out_ch
+    return flops
+
+
+def measure_latency(model, sample, runs=LATENCY_RUNS):
+    """Median latensi inferensi satu sampel di CPU (ms)."""
+    for _ in range(5):
+        model(sample, training=False)
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        model(sample, training=False).numpy()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1000)
+
+
+def model_size(model):
+    """Ukuran file .h5 model dalam KB."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.h5')
+        model.save(path)
+        return os.path.getsize(path) / 1024
+
+
+def run_benchmark(names, epochs=EPOCHS, report_path=REPORT_PATH):
+    """Melatih dan mengevaluasi setiap kandidat pada fitur dan pembagian data yang sama."""
+    X, y = load_cached_data()
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+    num_classes = len(le.classes_)
+
+    # Pembagian yang sama dengan model.py
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
+    )
+    input_shape = (X_train.shape[1], X_train.shape[2])
+    sample = X_test[:1]
+
+    rows = []
+    for name in names:
+        print(f"\n{'=' * 60}\nKANDIDAT: {name}\n{'=' * 60}")
+        tf.keras.backend.clear_session()
+        tf.random.set_seed(42)
+        model = CANDIDATES[name](input_shape, num_classes)
+
+        t0 = time.perf_counter()
+        fit_model(model, X_train, y_train, X_test, y_test, epochs=epochs, batch_size=BATCH_SIZE)
+        train_time = time.perf_counter() - t0
+        _, acc = model.evaluate(X_test, y_test, verbose=0)
+
+        rows.append({
+            'model': name,
+            'params': model.count_params(),
+            'mflops': round(count_flops(model) / 1e6, 2),
+            'latency_ms': round(measure_latency(model, sample), 3),
+            'size_kb': round(model_size(model), 1),
+            'accuracy': round(float(acc) * 100, 2),
+            'train_s': round(train_time, 1),
+        })
+
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    # Tabel ringkasan, diurutkan dari latensi terendah
+    print(f"\n{'Model':<16}{'Params':>10}{'MFLOPs':>10}{'Latensi(ms)':>13}{'Ukuran(KB)':>12}{'Akurasi':>10}")
+    for r in sorted(rows, key=lambda r: r['latency_ms']):
+        print(f"{r['model']:<16}{r['params']:>10}{r['mflops']:>10.2f}{r['latency_ms']:>13.3f}{r['size_kb']:>12.1f}{r['accuracy']:>9.2f}%")
+    print(f"\n✅ Hasil disimpan: {report_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark latensi vs akurasi untuk varian arsitektur.")
+    parser.add_argument('--only', nargs='+', choices=list(CANDIDATES), help="Hanya jalankan kandidat tertentu")
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help="Iterasi pelatihan per kandidat")
+    args = parser.parse_args()
+
+    run_benchmark(args.only or list(CANDIDATES), args.epochs)
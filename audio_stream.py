@@ -0,0 +1,292 @@
+import time
+import argparse
+import threading
+import numpy as np
+import sounddevice as sd
+
+# --- KONFIGURASI ---
+SAMPLE_RATE = 44100          # Tingkat sampling audio (sama dengan voice_core.py)
+STALL_TIMEOUT = 1.0          # Stream dianggap macet jika tidak ada callback selama ini (detik)
+RETRY_DELAY = 0.5            # Jeda awal sebelum mencoba membuka ulang setelah semua perangkat gagal (detik)
+MAX_RETRY_DELAY = 5.0        # Batas jeda percobaan ulang (backoff eksponensial)
+
+
+def input_devices():
+    """Indeks semua perangkat yang memiliki kanal input."""
+    try:
+        return [i for i, d in enumerate(sd.query_devices()) if d['max_input_channels'] > 0]
+    except Exception:
+        return []
+
+
+class StreamSupervisor:
+    """
+    Mengawasi stream input satu AudioSource. Error (stream tidak aktif) dan macet
+    (tidak ada callback selama STALL_TIMEOUT) memicu pembukaan ulang, pertama pada
+    perangkat sumber lalu pada perangkat input lain. Sampel yang hilang selama jeda
+    diisi nol agar posisi buffer cincin tetap sejalan dengan waktu nyata, dan dihitung
+    sebagai frame yang hilang bersama jumlah overflow input.
+    """
+    def __init__(self, source, log=None, sample_rate=SAMPLE_RATE, stream_factory=None, fallback_devices=None):
+        self.source = source
+        self.log = log or (lambda message, type="info": None)
+        self.sample_rate = sample_rate
+        self.stream_factory = stream_factory or sd.InputStream
+        self.fallback_devices = fallback_devices   # None = semua perangkat input (sd.query_devices)
+
+        self.stream = None
+        self.device = None           # Perangkat yang sedang dipakai
+        self.blocksize = None
+        self.last_callback = None    # Waktu callback terakhir (monotonic)
+        self.gap_start = None        # Awal jeda yang belum diisi (diisi saat callback pertama setelah pulih)
+        self.next_attempt = 0.0
+        self.retry_delay = RETRY_DELAY
+        self._lock = threading.Lock()
+
+        # Metrik
+        self.n_overflows = 0         # Callback dengan flag input overflow
+        self.n_dropped_frames = 0    # Sampel yang hilang selama stream macet/terputus
+        self.n_reopens = 0           # Pembukaan ulang setelah error atau macet
+        self.n_fallbacks = 0         # Pembukaan ulang yang berakhir di perangkat lain
+
+    def candidates(self):
+        """Urutan perangkat yang dicoba: perangkat sumber, default, lalu perangkat input lain."""
+        others = input_devices() if self.fallback_devices is None else self.fallback_devices
+        order = []
+        for device in [self.source.device, None] + list(others):
+            if device not in order:
+                order.append(device)
+        return order
+
+    def callback(self, indata, frames, time_info, status):
+        """Callback audio: mencatat overflow, mengisi jeda setelah pemulihan, lalu meneruskan ke sumber."""
+        now = time.monotonic()
+        if status and status.input_overflow:
+            self.n_overflows += 1
+        with self._lock:
+            gap_start, self.gap_start = self.gap_start, None
+            self.last_callback = now
+        if gap_start is not None:
+            missing = int((now - gap_start) * self.sample_rate) - frames
+            if missing > 0:
+                self.n_dropped_frames += missing
+                self.source.feed(np.zeros(min(missing, self.source.buffer.size), dtype=np.float32))
+        self.source.audio_callback(indata, frames, time_info, status)
+
+    def open(self, blocksize):
+        """Membuka stream dengan blocksize profil saat ini. Mengembalikan True jika berhasil."""
+        self.blocksize = blocksize
+        for device in self.candidates():
+            try:
+                stream = self.stream_factory(
+                    samplerate=self.sample_rate, channels=1, device=device,
+                    blocksize=blocksize, callback=self.callback
+                )
+                stream.start()
+            except Exception as e:
+                self.log(f"⚠️ [{self.source.name}] Perangkat {device if device is not None else 'default'} gagal dibuka: {e}", "warning")
+                continue
+            self.stream, self.device = stream, device
+            with self._lock:
+                self.last_callback = time.monotonic()
+            self.retry_delay = RETRY_DELAY
+            return True
+        self.next_attempt = time.monotonic() + self.retry_delay
+        self.retry_delay = min(self.retry_delay * 2, MAX_RETRY_DELAY)
+        return False
+
+    def close(self):
+        """Menutup stream (error saat menutup perangkat yang sudah hilang diabaikan)."""
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
+
+    def healthy(self, now):
+        """False jika stream berhenti karena error atau tidak ada callback selama STALL_TIMEOUT."""
+        if self.stream is None:
+            return False
+        try:
+            if not self.stream.active:
+                return False
+        except Exception:
+            return False
+        return now - self.last_callback < max(STALL_TIMEOUT, 4 * self.blocksize / self.sample_rate)
+
+    def check(self, now=None):
+        """Dipanggil dari loop deteksi: membuka ulang stream yang error/macet (dengan backoff)."""
+        now = time.monotonic() if now is None else now
+        if self.healthy(now):
+            return
+        if self.stream is not None:
+            reason = "berhenti" if not self.stream.active else f"macet {now - self.last_callback:.1f} dtk"
+            self.log(f"🔌 [{self.source.name}] Stream {reason}, membuka ulang...", "warning")
+            self.close()
+            with self._lock:
+                if self.gap_start is None:
+                    self.gap_start = self.last_callback
+            # Ucapan yang terpotong jeda tidak dianalisis
+            self.source.trigger_time = None
+            if self.source.pending is None:
+                self.source.trigger_info = None
+        if now < self.next_attempt:
+            return
+        previous = self.device
+        if self.open(self.blocksize):
+            self.n_reopens += 1
+            if self.device != self.source.device:
+                self.n_fallbacks += 1
+            moved = f" (pindah dari {previous} ke {self.device})" if self.device != previous else ""
+            self.log(f"✅ [{self.source.name}] Stream pulih{moved}", "success")
+
+    def stats(self):
+        """Metrik stream sumber ini."""
+        return {
+            "device": self.device,
+            "overflows": self.n_overflows,
+            "dropped_frames": self.n_dropped_frames,
+            "dropped_seconds": self.n_dropped_frames / self.sample_rate,
+            "reopens": self.n_reopens,
+            "fallbacks": self.n_fallbacks,
+        }
+
+
+class _Flags:
+    """Pengganti sd.CallbackFlags untuk perangkat palsu."""
+    def __init__(self, input_overflow=False):
+        self.input_overflow = input_overflow
+
+    def __bool__(self):
+        return self.input_overflow
+
+
+class FakeDevice:
+    """
+    Perangkat input palsu dengan jadwal kegagalan, untuk menguji pemulihan tanpa mikrofon.
+    `schedule` berisi (detik sejak perangkat dibuat, jenis): "overflow" (flag overflow pada
+    blok berikutnya), "stall" (callback berhenti tanpa error), "die" (stream berhenti),
+    "unplug" (stream berhenti dan perangkat tidak dapat dibuka) dan "replug".
+    """
+    def __init__(self, name, schedule=(), noise_rms=0.01):
+        self.name = name
+        self.schedule = sorted(schedule)
+        self.noise_rms = noise_rms
+        self.created = time.monotonic()
+        self.cursor = 0              # Event jadwal berikutnya yang belum dijalankan stream
+
+    def elapsed(self):
+        return time.monotonic() - self.created
+
+    @property
+    def plugged(self):
+        """Status colokan menurut event unplug/replug terakhir yang sudah lewat."""
+        state = True
+        for t, kind in self.schedule:
+            if t <= self.elapsed() and kind in ("unplug", "replug"):
+                state = kind == "replug"
+        return state
+
+    def due_events(self):
+        """Event jadwal yang sudah jatuh tempo sejak pemanggilan sebelumnya."""
+        events = []
+        while self.cursor < len(self.schedule) and self.schedule[self.cursor][0] <= self.elapsed():
+            events.append(self.schedule[self.cursor][1])
+            self.cursor += 1
+        return events
+
+
+class FakeInputStream:
+    """Pengganti sd.InputStream: memanggil callback dengan noise sesuai blocksize secara waktu nyata."""
+    def __init__(self, devices, samplerate, channels, device, blocksize, callback):
+        self.fake = devices.get(device)
+        if self.fake is None or not self.fake.plugged:
+            raise RuntimeError(f"perangkat {device} tidak tersedia")
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.active = False
+        self._stop = threading.Event()
+
+    def start(self):
+        self.active = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.active = False
+
+    def close(self):
+        self.stop()
+
+    def _run(self):
+        rng = np.random.default_rng()
+        overflow = stalled = False
+        next_block = time.monotonic()
+        while not self._stop.is_set():
+            for kind in self.fake.due_events():
+                if kind == "overflow":
+                    overflow = True
+                elif kind == "stall":
+                    stalled = True
+                elif kind in ("die", "unplug"):
+                    self.active = False
+                    return
+            if not stalled:
+                block = rng.normal(0, self.fake.noise_rms, (self.blocksize, 1)).astype(np.float32)
+                self.callback(block, self.blocksize, None, _Flags(overflow))
+                overflow = False
+            next_block += self.blocksize / self.samplerate
+            time.sleep(max(0.0, next_block - time.monotonic()))
+
+
+def simulate(seconds=20.0, blocksize=1024, poll_interval=0.05):
+    """
+    Menjalankan AudioSource dengan dua perangkat palsu: mikrofon utama mengalami overflow,
+    macet, berhenti lalu dicabut; supervisor harus pulih dan pindah ke perangkat cadangan.
+    Mencetak metrik dan memeriksa total sampel buffer terhadap waktu nyata.
+    """
+    from voice_core import AudioSource
+
+    devices = {
+        0: FakeDevice("mic-usb", [(2.0, "overflow"), (4.0, "stall"), (8.0, "die"), (12.0, "unplug"), (17.0, "replug")]),
+        1: FakeDevice("mic-internal"),
+    }
+    devices[None] = devices[0]
+    factory = lambda **kwargs: FakeInputStream(devices, **kwargs)
+    logs = []
+    source = AudioSource("sim", device=0)
+    supervisor = StreamSupervisor(source, log=lambda m, type="info": logs.append(m), stream_factory=factory,
+                                  fallback_devices=[1])
+
+    t0 = time.monotonic()
+    supervisor.open(blocksize)
+    while time.monotonic() - t0 < seconds:
+        supervisor.check()
+        time.sleep(poll_interval)
+    elapsed = time.monotonic() - t0
+    supervisor.close()
+
+    for line in logs:
+        print(line)
+    stats = supervisor.stats()
+    expected = elapsed * SAMPLE_RATE
+    print("=" * 72)
+    print(f"Durasi {elapsed:.1f} dtk | Perangkat akhir: {stats['device']}")
+    print(f"Overflow: {stats['overflows']} | Frame hilang: {stats['dropped_frames']} ({stats['dropped_seconds']:.2f} dtk) | "
+          f"Buka ulang: {stats['reopens']} | Fallback: {stats['fallbacks']}")
+    print(f"Total sampel buffer: {source.buffer.total} | Waktu nyata: {expected:.0f} "
+          f"(selisih {(source.buffer.total - expected) / SAMPLE_RATE * 1000:+.0f} ms)")
+    print("=" * 72)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulasi pemulihan stream audio dengan perangkat palsu yang gagal terjadwal.")
+    parser.add_argument('--seconds', type=float, default=20.0, help="Durasi simulasi (detik)")
+    parser.add_argument('--blocksize', type=int, default=1024, help="Sampel per callback")
+    args = parser.parse_args()
+
+    simulate(args.seconds, args.blocksize)
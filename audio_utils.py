@@ -1,32 +1,47 @@
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import librosa
 import noisereduce as nr
+from features import mfcc_features
 
-def enhance_audio(audio, sample_rate=44100):
+# --- KONFIGURASI ---
+PRE_EMPHASIS = 0.97          # Koefisien pre-emphasis
+NOISE_PROFILE = 2000         # Sampel awal klip yang dipakai sebagai profil noise
+NOISE_DECREASE = 0.8         # Proporsi pengurangan noise
+TRIM_DB = 20                 # Ambang pemotongan sunyi (dB di bawah puncak)
+TRIM_FRAME = 2048            # Panjang frame RMS untuk trimming (sama dengan librosa)
+TRIM_HOP = 512               # Jarak frame RMS untuk trimming
+DENOISE_WORKERS = os.cpu_count() or 1   # Thread reduksi noise paralel untuk enhance_batch
+
+# Kebijakan reduksi noise: "full", "light", "none", atau "adaptive" (dipilih per snapshot dari SNR)
+DENOISE_MODES = ("none", "light", "full")
+CLEAN_SNR_DB = 30.0          # Adaptif: SNR snapshot >= ini tanpa reduksi noise
+LIGHT_SNR_DB = 18.0          # Adaptif: SNR >= ini reduksi noise ringan, di bawahnya penuh
+LIGHT_NOISE_DECREASE = 0.5   # Proporsi pengurangan noise jalur ringan
+LIGHT_N_FFT = 512            # FFT jalur ringan (spectral gating stasioner, tanpa smoothing non-stasioner)
+SNR_FRAME = 1024             # Panjang frame energi untuk estimasi SNR snapshot
+
+def enhance_audio(audio, sample_rate=44100, mode="full"):
     """
     Menerapkan serangkaian perbaikan untuk meningkatkan akurasi pengenalan suara.
     Mencakup: Reduksi noise, Pre-emphasis, Normalisasi, dan Pemotongan (Trimming).
+    `mode` memilih jalur reduksi noise ("full", "light" atau "none", lihat choose_denoise).
     """
     # Mengembalikan audio jika kosong
     if len(audio) == 0:
         return audio
         
     # --- 1. Reduksi Noise (Denoising) ---
-    try:
-        # Gunakan 2000 sampel pertama sebagai profil noise jika memungkinkan
-        noise_clip = audio[:2000] if len(audio) > 2000 else audio
-        # Mengurangi noise statis pada sinyal audio
-        audio_denoised = nr.reduce_noise(y=audio, sr=sample_rate, y_noise=noise_clip, prop_decrease=0.8)
-    except Exception as e:
-        # Jika gagal, gunakan audio asli tanpa reduksi noise
-        print(f"Reduksi noise gagal: {e}")
-        audio_denoised = audio
+    audio_denoised = denoise(audio, sample_rate, mode)
 
     # --- 2. Pre-emphasis ---
     # Memperkuat frekuensi tinggi yang penting untuk fitur bicara (MFCC)
-    pre_emphasis = 0.97
-    # Rumus: y(t) = x(t) - 0.97 * x(t-1)
-    audio_emphasized = np.append(audio_denoised[0], audio_denoised[1:] - pre_emphasis * audio_denoised[:-1])
+    # Rumus: y(t) = x(t) - 0.97 * x(t-1), ditulis ke array baru tanpa np.append
+    audio_emphasized = np.empty_like(audio_denoised)
+    audio_emphasized[0] = audio_denoised[0]
+    np.subtract(audio_denoised[1:], PRE_EMPHASIS * audio_denoised[:-1], out=audio_emphasized[1:])
 
     # --- 3. Normalisasi Amplitudo ---
     # Menghitung nilai puncak maksimum
@@ -39,7 +54,300 @@ def enhance_audio(audio, sample_rate=44100):
 
     # --- 4. Trimming (Pemotongan Sunyi) ---
     # Menghapus bagian sunyi di awal dan akhir audio agar fokus pada perintah
-    audio_trimmed, _ = librosa.effects.trim(audio_normalized, top_db=20)
+    # (setara librosa.effects.trim, tanpa librosa di jalur runtime)
+    start, end = trim_bounds(audio_normalized[np.newaxis, :], np.array([len(audio_normalized)]))
+    audio_trimmed = audio_normalized[start[0]:end[0]]
     
     # Mengembalikan audio yang telah diproses
     return audio_trimmed
+
+def denoise(audio, sample_rate=44100, mode="full"):
+    """
+    Reduksi noise dengan awal klip sebagai profil noise; audio asli jika gagal.
+    "full": spectral gating noisereduce standar, "light": gating stasioner dengan FFT
+    pendek dan pengurangan lebih kecil, "none": audio dikembalikan apa adanya.
+    """
+    if mode == "none":
+        return audio
+    try:
+        # Gunakan 2000 sampel pertama setelah awalan nol (bagian yang sudah dikonsumsi) sebagai profil noise
+        start = np.argmax(audio != 0) if len(audio) else 0
+        noise_clip = audio[start:start + NOISE_PROFILE] if len(audio) - start > NOISE_PROFILE else audio
+        if mode == "light":
+            return nr.reduce_noise(y=audio, sr=sample_rate, y_noise=noise_clip, stationary=True,
+                                   n_fft=LIGHT_N_FFT, prop_decrease=LIGHT_NOISE_DECREASE)
+        # Mengurangi noise statis pada sinyal audio
+        return nr.reduce_noise(y=audio, sr=sample_rate, y_noise=noise_clip, prop_decrease=NOISE_DECREASE)
+    except Exception as e:
+        # Jika gagal, gunakan audio asli tanpa reduksi noise
+        print(f"Reduksi noise gagal: {e}")
+        return audio
+
+def snapshot_snr(audio, frame=SNR_FRAME):
+    """
+    SNR snapshot (dB): energi frame terkeras (persentil 95) terhadap frame tersunyi
+    (persentil 10). Frame yang seluruhnya nol (bagian snapshot yang sudah dikonsumsi,
+    lihat RingBuffer.snapshot_since) tidak ikut menentukan noise floor.
+    """
+    n = len(audio) // frame
+    if n < 2:
+        return 0.0
+    rms = np.sqrt(np.mean(np.square(audio[:n * frame].reshape(n, frame), dtype=np.float64), axis=1))
+    rms = rms[rms > 0]
+    if len(rms) < 2:
+        return 0.0
+    db = 20 * np.log10(np.maximum(rms, 1e-5))
+    return float(np.percentile(db, 95) - np.percentile(db, 10))
+
+def choose_denoise(audio, policy="full"):
+    """
+    Jalur reduksi noise untuk satu snapshot beserta SNR-nya: kebijakan tetap
+    dikembalikan apa adanya, "adaptive" melewati reduksi noise untuk input bersih
+    (SNR >= CLEAN_SNR_DB), memakai jalur ringan hingga LIGHT_SNR_DB, dan penuh di bawahnya.
+    """
+    snr_db = snapshot_snr(audio)
+    if policy != "adaptive":
+        return policy, snr_db
+    if snr_db >= CLEAN_SNR_DB:
+        return "none", snr_db
+    if snr_db >= LIGHT_SNR_DB:
+        return "light", snr_db
+    return "full", snr_db
+
+def pack_clips(clips, lengths=None):
+    """
+    Menyatukan klip menjadi array 2-D float32 (n, panjang maks) berpadding nol.
+    Menerima list array 1-D, atau array 2-D yang sudah berpadding beserta `lengths`.
+    Selalu mengembalikan buffer baru karena enhance_batch menulis ke dalamnya.
+    """
+    if isinstance(clips, np.ndarray) and clips.ndim == 2:
+        lengths = np.full(len(clips), clips.shape[1]) if lengths is None else np.asarray(lengths)
+        return np.array(clips, dtype=np.float32, order='C', copy=True), lengths.astype(np.int64)
+
+    lengths = np.array([len(c) for c in clips], dtype=np.int64)
+    batch = np.zeros((len(clips), max(lengths.max(initial=0), 1)), dtype=np.float32)
+    for row, clip in zip(batch, clips):
+        row[:len(clip)] = clip
+    return batch, lengths
+
+def trim_bounds(batch, lengths, top_db=TRIM_DB, frame_length=TRIM_FRAME, hop_length=TRIM_HOP):
+    """
+    Batas (start, end) non-sunyi setiap baris, setara librosa.effects.trim: RMS per frame
+    (center, padding nol) dibandingkan terhadap RMS maksimum baris dalam dB.
+    Energi frame dihitung sekaligus untuk semua baris lewat cumulative sum kuadrat.
+    Sampel di luar `lengths` harus bernilai nol.
+    """
+    n, width = batch.shape
+    pad = frame_length // 2
+    squares = np.zeros((n, width + 2 * pad + 1), dtype=np.float64)
+    np.square(batch, out=squares[:, pad + 1:pad + 1 + width])
+    np.cumsum(squares, axis=1, out=squares)
+
+    n_frames = 1 + width // hop_length
+    starts = np.arange(n_frames) * hop_length
+    rms = np.sqrt(np.maximum(squares[:, starts + frame_length] - squares[:, starts], 0) / frame_length)
+
+    # Frame di luar panjang asli setiap klip diabaikan
+    valid = np.arange(n_frames)[np.newaxis, :] < (1 + lengths // hop_length)[:, np.newaxis]
+    rms[~valid] = 0
+    # amplitude_to_db(ref=np.max, amin=1e-5): rms > max_rms * 10^(-top_db/20)
+    amin = 1e-5
+    ref = np.maximum(rms.max(axis=1, keepdims=True), amin)
+    non_silent = (np.maximum(rms, amin) / ref > 10 ** (-top_db / 20)) & valid
+
+    found = non_silent.any(axis=1)
+    first = np.argmax(non_silent, axis=1)
+    last = n_frames - 1 - np.argmax(non_silent[:, ::-1], axis=1)
+    start = np.where(found, first * hop_length, 0)
+    end = np.where(found, np.minimum(lengths, (last + 1) * hop_length), 0)
+    return start, end
+
+def enhance_batch(clips, sample_rate=44100, lengths=None, workers=DENOISE_WORKERS, modes=None):
+    """
+    Versi batch enhance_audio untuk banyak klip sekaligus. `modes` berisi jalur
+    reduksi noise per klip (default "full" untuk semua).
+    Reduksi noise berjalan paralel (noisereduce menghabiskan waktunya di FFT SciPy dan
+    operasi NumPy yang melepas GIL), sedangkan pre-emphasis, normalisasi dan trimming
+    dihitung tervektorisasi atas array 2-D. Mengembalikan list view hasil trimming
+    ke dalam satu buffer bersama (tanpa salinan per klip).
+    """
+    batch, lengths = pack_clips(clips, lengths)
+    n = len(batch)
+    if n == 0:
+        return []
+
+    # --- 1. Reduksi Noise paralel, hasil ditulis langsung ke baris batch ---
+    def denoise_row(i):
+        length = lengths[i]
+        if length > 0:
+            batch[i, :length] = denoise(batch[i, :length], sample_rate, modes[i] if modes is not None else "full")
+
+    if n == 1 or workers <= 1:
+        for i in range(n):
+            denoise_row(i)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, n)) as pool:
+            list(pool.map(denoise_row, range(n)))
+
+    # --- 2. Pre-emphasis tervektorisasi ---
+    emphasized = np.empty_like(batch)
+    emphasized[:, 0] = batch[:, 0]
+    np.multiply(batch[:, :-1], -PRE_EMPHASIS, out=emphasized[:, 1:])
+    emphasized[:, 1:] += batch[:, 1:]
+    # Sampel padding kembali nol (pre-emphasis membocorkan sampel terakhir ke padding)
+    emphasized[np.arange(emphasized.shape[1])[np.newaxis, :] >= lengths[:, np.newaxis]] = 0
+
+    # --- 3. Normalisasi puncak per baris ---
+    peaks = np.abs(emphasized).max(axis=1)
+    peaks[peaks == 0] = 1
+    emphasized /= peaks[:, np.newaxis]
+
+    # --- 4. Trimming tervektorisasi ---
+    start, end = trim_bounds(emphasized, lengths)
+    return [emphasized[i, start[i]:end[i]] for i in range(n)]
+
+def segment_utterances(audio, sample_rate=44100, frame_ms=20, snr_db=12.0, min_gap=0.3,
+                       padding=0.15, min_len=0.25, max_len=2.0, clip_level=0.99, max_clip_ratio=0.001):
+    """
+    Memecah rekaman sesi panjang menjadi ucapan-ucapan terpisah berbasis energi.
+    Mengembalikan list dict berisi 'start', 'end' (dalam sampel) dan 'status'
+    ('ok', 'short', 'long', atau 'clipped'). Hanya segmen 'ok' yang layak disimpan.
+    """
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return []
+
+    # --- 1. Energi per frame (dB) ---
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+    # --- 2. Ambang batas relatif terhadap noise floor sesi ---
+    noise_floor = np.percentile(db, 10)
+    active = db > noise_floor + snr_db
+    if not np.any(active):
+        return []
+
+    # --- 3. Gabungkan frame aktif menjadi segmen, jeda pendek tetap satu ucapan ---
+    max_gap_frames = int(min_gap * 1000 / frame_ms)
+    idx = np.flatnonzero(active)
+    breaks = np.flatnonzero(np.diff(idx) > max_gap_frames + 1)
+    starts = np.concatenate([[idx[0]], idx[breaks + 1]])
+    ends = np.concatenate([idx[breaks], [idx[-1]]]) + 1
+
+    # --- 4. Padding dan validasi panjang serta clipping ---
+    pad = int(padding * sample_rate)
+    segments = []
+    for s, e in zip(starts, ends):
+        start = max(0, s * frame_len - pad)
+        end = min(len(audio), e * frame_len + pad)
+        duration = (end - start) / sample_rate
+        segment = audio[start:end]
+
+        if duration < min_len:
+            status = "short"
+        elif duration > max_len:
+            status = "long"
+        elif np.mean(np.abs(segment) >= clip_level) > max_clip_ratio:
+            status = "clipped"
+        else:
+            status = "ok"
+        segments.append({"start": int(start), "end": int(end), "status": status})
+
+    return segments
+
+def pad_to_bucket(audio, sample_rate=44100, bucket=0.25, duration=2.0):
+    """
+    Memotong audio ke `duration` lalu menambahkan padding hingga kelipatan `bucket`
+    detik berikutnya. Dipakai model panjang-variabel agar hanya ada sedikit bentuk
+    input (bucket) tanpa memaksa setiap ucapan menjadi `duration` penuh.
+    """
+    audio = audio[:int(sample_rate * duration)]
+    step = int(sample_rate * bucket)
+    target = max(step, -(-len(audio) // step) * step)
+    if len(audio) < target:
+        audio = np.pad(audio, (0, target - len(audio)))
+    return audio
+
+def extract_features(audio, sample_rate=44100, duration=2.0, n_mfcc=40, bucket=None, denoise_mode="full"):
+    """
+    Jalur praproses runtime: enhance, penyesuaian durasi, normalisasi,
+    lalu MFCC + Delta + Delta2 dengan bentuk (Frames, Fitur).
+    Dengan `bucket` (detik), ucapan yang sudah dipotong hanya di-padding hingga
+    kelipatan bucket berikutnya, bukan hingga `duration` penuh.
+    """
+    # Perbaikan kualitas audio
+    audio = enhance_audio(audio, sample_rate, denoise_mode)
+    return enhanced_features(audio, sample_rate, duration, n_mfcc, bucket)
+
+def enhanced_features(audio, sample_rate=44100, duration=2.0, n_mfcc=40, bucket=None):
+    """Sisa jalur extract_features untuk audio yang sudah di-enhance (misalnya hasil enhance_batch)."""
+    # Penyesuaian durasi
+    target_samples = int(sample_rate * duration)
+    if bucket:
+        audio = pad_to_bucket(audio, sample_rate, bucket, duration)
+    elif len(audio) < target_samples:
+        audio = np.pad(audio, (0, target_samples - len(audio)))
+    else:
+        audio = audio[:target_samples]
+    
+    # Normalisasi
+    if np.max(np.abs(audio)) > 0:
+        audio = audio / np.max(np.abs(audio))
+    
+    # Ekstraksi MFCC + Delta + Delta2 (NumPy, setara librosa; lihat features.py)
+    return mfcc_features(audio, sample_rate, n_mfcc)
+
+def benchmark_enhance(limit=200, workers=DENOISE_WORKERS, dataset_path='dataset'):
+    """
+    Klip/detik enhance_audio per klip (loop) vs enhance_batch, beserta selisih hasilnya
+    dan kesetaraan batas trim_bounds terhadap librosa.effects.trim (referensi).
+    """
+    import librosa
+    clips = []
+    for label in sorted(os.listdir(dataset_path)):
+        class_path = os.path.join(dataset_path, label)
+        if not os.path.isdir(class_path):
+            continue
+        for f in sorted(os.listdir(class_path)):
+            if f.endswith('.wav') and len(clips) < limit:
+                audio, _ = librosa.load(os.path.join(class_path, f), sr=44100)
+                clips.append(audio)
+
+    t0 = time.perf_counter()
+    looped = [enhance_audio(audio) for audio in clips]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = enhance_batch(clips, workers=workers)
+    t_batch = time.perf_counter() - t0
+
+    length_mismatch = sum(len(a) != len(b) for a, b in zip(looped, batched))
+    max_diff = max((float(np.max(np.abs(a - b))) for a, b in zip(looped, batched) if len(a) == len(b) and len(a)),
+                   default=0.0)
+
+    # Referensi trimming: klip yang dinormalisasi dipotong dengan librosa dan trim_bounds
+    trim_mismatch = 0
+    for audio in clips:
+        audio = audio / max(float(np.max(np.abs(audio))), 1e-9)
+        _, (ref_start, ref_end) = librosa.effects.trim(audio, top_db=TRIM_DB)
+        start, end = trim_bounds(audio[np.newaxis, :].astype(np.float32), np.array([len(audio)]))
+        trim_mismatch += (ref_start, ref_end) != (start[0], end[0])
+
+    print("=" * 60)
+    print(f"Klip: {len(clips)} | Worker reduksi noise: {workers}")
+    print(f"Loop enhance_audio : {len(clips) / t_loop:>8.1f} klip/detik ({t_loop:.2f} s)")
+    print(f"enhance_batch      : {len(clips) / t_batch:>8.1f} klip/detik ({t_batch:.2f} s)")
+    print(f"Percepatan: {t_loop / t_batch:.2f}x")
+    print(f"Panjang hasil trim berbeda: {length_mismatch} | Selisih sampel maks: {max_diff:.2e}")
+    print(f"Batas trim berbeda dari librosa.effects.trim: {trim_mismatch}/{len(clips)}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark enhance_audio (loop) vs enhance_batch.")
+    parser.add_argument('--limit', type=int, default=200, help="Jumlah klip dataset")
+    parser.add_argument('--workers', type=int, default=DENOISE_WORKERS, help="Thread reduksi noise")
+    args = parser.parse_args()
+
+    benchmark_enhance(args.limit, args.workers)
@@ -2,13 +2,14 @@ import os
 import wave
 import json
 import time
+import queue
 import threading
 import numpy as np
 import sounddevice as sd
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-from audio_utils import enhance_audio
+from audio_utils import enhance_audio, enhance_batch, segment_utterances
 
 # --- KONFIGURASI ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Direktori aplikasi
@@ -18,6 +19,14 @@ MAP_FILE = os.path.join(BASE_DIR, "command_map.json")  # File pemetaan perintah
 SAMPLE_RATE = 44100  # Tingkat sampling audio
 CHANNELS = 1         # Jumlah channel audio (mono)
 
+# --- MODE SESI (AUTO-SEGMENTASI) ---
+SEGMENT_PADDING = 0.15   # Padding sebelum/sesudah ucapan (detik)
+SEGMENT_MIN_LEN = 0.25   # Panjang minimum ucapan (detik)
+SEGMENT_MAX_LEN = 2.0    # Panjang maksimum ucapan (detik), sesuai DURATION model
+SEGMENT_MIN_GAP = 0.3    # Jeda minimum antar ucapan (detik)
+SEGMENT_SNR_DB = 12.0    # Ambang energi di atas noise floor sesi (dB)
+CLIP_LEVEL = 0.99        # Level amplitudo yang dianggap clipping
+
 # --- WARNA & ESTETIKA UI ---
 BG_DARK = "#0F172A"       # Latar belakang gelap utama
 BG_CARD = "#1E293B"       # Latar panel/card
@@ -80,13 +89,57 @@ class AudioRecorder:
 
         # Menggabungkan semua frame audio
         audio_data = np.concatenate(self.frames, axis=0).flatten()
-        
+        self._save_clip(audio_data, filename)
+        return True
+
+    def stop_session(self, target_dir, label):
+        """
+        Menghentikan perekaman sesi panjang, memecahnya menjadi ucapan terpisah,
+        lalu menyimpan setiap ucapan yang valid sebagai file WAV sendiri.
+        Mengembalikan (jumlah tersimpan, jumlah ditolak).
+        """
+        self.is_recording = False
+        if self._stream:
+            self._stream.stop()
+            self._stream.close()
+
+        if not self.frames:
+            return 0, 0
+
+        audio_data = np.concatenate(self.frames, axis=0).flatten()
+        segments = segment_utterances(
+            audio_data, SAMPLE_RATE,
+            snr_db=SEGMENT_SNR_DB, min_gap=SEGMENT_MIN_GAP, padding=SEGMENT_PADDING,
+            min_len=SEGMENT_MIN_LEN, max_len=SEGMENT_MAX_LEN, clip_level=CLIP_LEVEL
+        )
+
+        ok = [seg for seg in segments if seg["status"] == "ok"]
+        clips = [audio_data[seg["start"]:seg["end"]] for seg in ok]
+
+        # Semua ucapan sesi ditingkatkan kualitasnya sekaligus (reduksi noise paralel)
+        try:
+            clips = enhance_batch(clips, SAMPLE_RATE)
+        except:
+            pass  # Fallback jika enhancement gagal
+
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        for i, clip in enumerate(clips):
+            self._write_wav(clip, os.path.join(target_dir, f"{label}_{stamp}_{i:02d}.wav"))
+
+        return len(clips), len(segments) - len(ok)
+
+    def _save_clip(self, audio_data, filename):
+        """Meningkatkan kualitas audio lalu menyimpannya sebagai WAV int16."""
         # Perbaikan kualitas audio
         try:
             audio_data = enhance_audio(audio_data, SAMPLE_RATE)
         except:
             pass  # Fallback jika enhancement gagal
 
+        self._write_wav(audio_data, filename)
+
+    def _write_wav(self, audio_data, filename):
+        """Menyimpan audio float sebagai WAV int16 mono."""
         # Konversi ke format int16 untuk WAV
         audio_data_int16 = (audio_data * 32767).astype(np.int16)
 
@@ -96,8 +149,6 @@ class AudioRecorder:
             wf.setsampwidth(2)
             wf.setframerate(SAMPLE_RATE)
             wf.writeframes(audio_data_int16.tobytes())
-        
-        return True
 
 class RoundedFrame(tk.Canvas):
     """Frame kustom dengan sudut membulat menggunakan Canvas."""
@@ -134,6 +185,7 @@ class VoiceCollectorGUI:
         self.recorder = AudioRecorder()  # Instance perekam audio
         self.pulse_val = 0               # Nilai untuk animasi pulse
         self.pulse_dir = 1               # Arah animasi pulse
+        self.enroll_queue = queue.Queue()  # Hasil enroll dari thread pekerja, dibaca di update_loop
         
         self.setup_ui()
         self.load_devices()
@@ -204,6 +256,10 @@ class VoiceCollectorGUI:
         tk.Radiobutton(cfg_card, text="APP (.LNK)", variable=self.action_type, value="app", bg=BG_CARD, fg=TEXT_MAIN, activebackground=BG_CARD, selectcolor=BG_DARK, command=self.update_ui_mode).place(x=20, y=170)
         tk.Radiobutton(cfg_card, text="KEYBOARD (KEY:)", variable=self.action_type, value="key", bg=BG_CARD, fg=TEXT_MAIN, activebackground=BG_CARD, selectcolor=BG_DARK, command=self.update_ui_mode).place(x=130, y=170)
 
+        # Mode sesi: satu rekaman panjang dipecah otomatis per ucapan
+        self.session_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(cfg_card, text="SESSION MODE (AUTO-SEGMENT)", variable=self.session_mode, bg=BG_CARD, fg=TEXT_MAIN, activebackground=BG_CARD, selectcolor=BG_DARK).place(x=280, y=170)
+
         # Bagian Visualisasi Waveform
         self.wf_container = RoundedFrame(self.left_col, radius=15)
         self.wf_container.place(relx=0, rely=0.47, relwidth=1, height=180)
@@ -220,7 +276,11 @@ class VoiceCollectorGUI:
         self.rec_section.place(relx=0, rely=0.74, relwidth=1, height=120)
 
         self.btn_record = tk.Button(self.rec_section, text="START ACQUISITION", font=("Segoe UI", 12, "bold"), bg=ACCENT_GREEN, fg=BG_DARK, activebackground=ACCENT_CYAN, relief=tk.FLAT, command=self.toggle_recording)
-        self.btn_record.place(relx=0.05, rely=0.2, relwidth=0.9, relheight=0.6)
+        self.btn_record.place(relx=0.05, rely=0.2, relwidth=0.62, relheight=0.6)
+
+        # Pendaftaran cepat: tambah prototipe embedding tanpa pelatihan ulang
+        self.btn_enroll = tk.Button(self.rec_section, text="ENROLL", font=("Segoe UI", 12, "bold"), bg=ACCENT_BLUE, fg=BG_DARK, activebackground=ACCENT_CYAN, relief=tk.FLAT, command=self.enroll_command)
+        self.btn_enroll.place(relx=0.7, rely=0.2, relwidth=0.25, relheight=0.6)
         
         self.status_var = tk.StringVar(value="SYSTEM READY")
         self.status_label = tk.Label(self.left_col, textvariable=self.status_var, font=("Consolas", 9), fg=TEXT_MUTED, bg=BG_DARK)
@@ -271,6 +331,11 @@ class VoiceCollectorGUI:
         """Loop update untuk animasi dan visualisasi."""
         # Update waveform
         self.draw_waveform()
+
+        # Hasil enroll dari thread pekerja
+        while not self.enroll_queue.empty():
+            self.status_var.set(self.enroll_queue.get())
+            self.btn_enroll.configure(state="normal")
         
         # Animasi pulse saat recording
         if self.recorder.is_recording:
@@ -364,13 +429,42 @@ class VoiceCollectorGUI:
             if not os.path.exists(target_dir): 
                 os.makedirs(target_dir)
             
-            filename = os.path.join(target_dir, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav")
-            if self.recorder.stop_recording(filename):
-                self.status_var.set(f"DATA STORED: {label.upper()} +1")
+            if self.session_mode.get():
+                saved, rejected = self.recorder.stop_session(target_dir, label)
+                self.status_var.set(f"DATA STORED: {label.upper()} +{saved} ({rejected} REJECTED)")
+            else:
+                filename = os.path.join(target_dir, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav")
+                if self.recorder.stop_recording(filename):
+                    self.status_var.set(f"DATA STORED: {label.upper()} +1")
             
             self.btn_record.configure(text="START ACQUISITION", bg=ACCENT_GREEN)
             self.refresh_stats()
 
+    def enroll_command(self):
+        """Mendaftarkan label sebagai prototipe embedding (tanpa pelatihan gradien)."""
+        label = self.label_var.get().strip()
+        if not label:
+            messagebox.showwarning("Warning", "Configuration incomplete.")
+            return
+        if self.recorder.is_recording:
+            return
+
+        self.btn_enroll.configure(state="disabled")
+        self.status_var.set(f"ENROLLING: {label.upper()}...")
+
+        def _enroll():
+            try:
+                # Import di sini agar TensorFlow hanya dimuat saat diperlukan
+                from embedding_index import enroll_label
+                n = enroll_label(label)
+                msg = f"ENROLLED: {label.upper()} ({n} SAMPLES)"
+            except Exception as e:
+                msg = f"ENROLL FAILED: {e}"
+            # Tkinter tidak thread-safe: hasil dikirim ke thread utama lewat antrian
+            self.enroll_queue.put(msg)
+
+        threading.Thread(target=_enroll, daemon=True).start()
+
     def update_timer(self):
         """Memperbarui timer saat recording."""
         if self.recorder.is_recording:
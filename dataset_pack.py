@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import librosa
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))      # Direktori aplikasi
+DATASET_PATH = os.path.join(BASE_DIR, 'dataset')           # Jalur folder dataset
+PACK_PATH = os.path.join(BASE_DIR, 'dataset_pack')         # Jalur folder pack
+SAMPLE_RATE = 44100                                        # Tingkat sampling audio
+PACK_VERSION = 1                                           # Versi format pack
+
+DATA_FILE = 'clips.bin'     # Array sampel kontigu (memory-mapped)
+INDEX_FILE = 'index.json'   # Indeks offset/panjang/label per klip
+
+# Faktor skala untuk konversi float <-> int16
+INT16_SCALE = 32767.0
+
+
+def _scan_dataset(dataset_path):
+    """Mengumpulkan semua file WAV di dataset beserta label dan info stat-nya."""
+    entries = {}
+    for label in sorted(os.listdir(dataset_path)):
+        class_path = os.path.join(dataset_path, label)
+        if not os.path.isdir(class_path):
+            continue
+        for file in sorted(os.listdir(class_path)):
+            if not file.endswith('.wav'):
+                continue
+            st = os.stat(os.path.join(class_path, file))
+            rel_path = f"{label}/{file}"
+            entries[rel_path] = {"label": label, "mtime": st.st_mtime, "size": st.st_size}
+    return entries
+
+
+def _encode(audio, dtype):
+    """Mengonversi audio float ke tipe penyimpanan pack."""
+    if dtype == 'int16':
+        return (np.clip(audio, -1.0, 1.0) * INT16_SCALE).astype(np.int16)
+    return audio.astype(np.float16)
+
+
+class DatasetPack:
+    """Pembaca pack dataset: semua klip dalam satu array memory-mapped."""
+    def __init__(self, pack_path=PACK_PATH):
+        self.pack_path = pack_path
+        with open(os.path.join(pack_path, INDEX_FILE), 'r') as f:
+            self.index = json.load(f)
+
+        self.sample_rate = self.index["sample_rate"]
+        self.dtype = np.dtype(self.index["dtype"])
+        self.clips = self.index["clips"]
+        self._by_path = {c["path"]: i for i, c in enumerate(self.clips)}
+
+        # Memetakan file data tanpa membaca isinya ke memori
+        total = self.index["total_samples"]
+        data_path = os.path.join(pack_path, DATA_FILE)
+        self.data = np.memmap(data_path, dtype=self.dtype, mode='r', shape=(total,)) if total > 0 else np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.clips)
+
+    def __contains__(self, rel_path):
+        return rel_path in self._by_path
+
+    def labels(self):
+        """Daftar label unik yang ada di dalam pack."""
+        return sorted({c["label"] for c in self.clips})
+
+    def raw(self, i):
+        """Mengembalikan view (tanpa salinan) sampel mentah klip ke-i."""
+        c = self.clips[i]
+        return self.data[c["offset"]:c["offset"] + c["length"]]
+
+    def audio(self, i):
+        """Mengembalikan klip ke-i sebagai float32 dalam rentang [-1, 1]."""
+        raw = self.raw(i)
+        if self.dtype == np.int16:
+            return raw.astype(np.float32) / INT16_SCALE
+        return raw.astype(np.float32)
+
+    def lookup(self, file_path, dataset_path=DATASET_PATH):
+        """
+        Mencari klip berdasarkan path file di dataset.
+        Mengembalikan None jika tidak ada di pack atau file sudah berubah sejak dipack.
+        """
+        rel_path = os.path.relpath(file_path, dataset_path).replace(os.sep, '/')
+        i = self._by_path.get(rel_path)
+        if i is None:
+            return None
+        st = os.stat(file_path)
+        c = self.clips[i]
+        if st.st_size != c["size"] or st.st_mtime != c["mtime"]:
+            return None
+        return self.audio(i)
+
+    def iter_label(self, label):
+        """Iterasi (path, audio float32) untuk satu label."""
+        for i, c in enumerate(self.clips):
+            if c["label"] == label:
+                yield c["path"], self.audio(i)
+
+
+def open_pack(pack_path=PACK_PATH):
+    """Membuka pack jika tersedia, atau None jika belum pernah dibuat."""
+    if not os.path.exists(os.path.join(pack_path, INDEX_FILE)):
+        return None
+    try:
+        return DatasetPack(pack_path)
+    except Exception as e:
+        print(f"⚠️ Pack dataset tidak dapat dibuka: {e}")
+        return None
+
+
+def pack_dataset(dataset_path=DATASET_PATH, pack_path=PACK_PATH, dtype='int16', rebuild=False):
+    """
+    Menulis/memperbarui pack dataset secara inkremental.
+    Hanya file baru atau yang berubah yang didekode; klip yang dihapus dikeluarkan dari indeks.
+    """
+    if dtype not in ('int16', 'float16'):
+        raise ValueError(f"dtype pack tidak didukung: {dtype}")
+    if not os.path.exists(pack_path):
+        os.makedirs(pack_path)
+
+    index_path = os.path.join(pack_path, INDEX_FILE)
+    data_path = os.path.join(pack_path, DATA_FILE)
+
+    index = None
+    if not rebuild and os.path.exists(index_path):
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        # Format berbeda tidak dapat ditambahkan, bangun ulang
+        if index.get("version") != PACK_VERSION or index.get("dtype") != dtype or index.get("sample_rate") != SAMPLE_RATE:
+            print("⚠️ Format pack berbeda, membangun ulang...")
+            index = None
+
+    if index is None:
+        index = {"version": PACK_VERSION, "sample_rate": SAMPLE_RATE, "dtype": dtype, "total_samples": 0, "clips": []}
+        open(data_path, 'wb').close()
+
+    current = _scan_dataset(dataset_path)
+    kept = []
+    for c in index["clips"]:
+        info = current.get(c["path"])
+        if info is not None and info["mtime"] == c["mtime"] and info["size"] == c["size"]:
+            kept.append(c)
+    known = {c["path"] for c in kept}
+    new_files = [p for p in current if p not in known]
+    removed = len(index["clips"]) - len(kept)
+
+    print(f"📦 Pack: {len(kept)} klip tetap, {len(new_files)} baru/berubah, {removed} dihapus")
+
+    offset = index["total_samples"]
+    with open(data_path, 'ab') as f:
+        for rel_path in new_files:
+            info = current[rel_path]
+            try:
+                audio, _ = librosa.load(os.path.join(dataset_path, rel_path), sr=SAMPLE_RATE)
+            except Exception as e:
+                print(f"Gagal memproses {rel_path}: {e}")
+                continue
+            f.write(_encode(audio, dtype).tobytes())
+            kept.append({
+                "path": rel_path,
+                "label": info["label"],
+                "offset": offset,
+                "length": len(audio),
+                "mtime": info["mtime"],
+                "size": info["size"],
+            })
+            offset += len(audio)
+
+    index["clips"] = kept
+    index["total_samples"] = offset
+
+    # Simpan indeks secara atomik agar pembaca tidak melihat indeks setengah jadi
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    live = sum(c["length"] for c in kept)
+    if offset > 0 and live < offset * 0.7:
+        print(f"ℹ️ {100 - live * 100 / offset:.0f}% isi pack tidak terpakai. Jalankan dengan --rebuild untuk memadatkan.")
+    return index
+
+
+def benchmark(dataset_path=DATASET_PATH, pack_path=PACK_PATH):
+    """Membandingkan waktu muat dan puncak memori: pack vs dekode per file."""
+    pack = open_pack(pack_path)
+    if pack is None:
+        print("Error: Pack belum dibuat. Jalankan 'python dataset_pack.py pack' terlebih dahulu.")
+        return
+
+    files = list(_scan_dataset(dataset_path))
+
+    # Dekode per file (jalur yang sama dengan model.py)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n_samples = 0
+    for rel_path in files:
+        audio, _ = librosa.load(os.path.join(dataset_path, rel_path), sr=SAMPLE_RATE)
+        n_samples += len(audio)
+    t_files = time.perf_counter() - t0
+    _, peak_files = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Pembacaan dari pack
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    pack = DatasetPack(pack_path)
+    n_pack = 0
+    for i in range(len(pack)):
+        n_pack += len(pack.audio(i))
+    t_pack = time.perf_counter() - t0
+    _, peak_pack = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("=" * 60)
+    print(f"{'Metode':<20}{'Klip':>8}{'Waktu (s)':>12}{'Puncak (MB)':>14}")
+    print(f"{'Dekode per file':<20}{len(files):>8}{t_files:>12.2f}{peak_files / 1e6:>14.1f}")
+    print(f"{'Pack memmap':<20}{len(pack):>8}{t_pack:>12.2f}{peak_pack / 1e6:>14.1f}")
+    print("=" * 60)
+    if t_pack > 0:
+        print(f"Percepatan: {t_files / t_pack:.1f}x ({n_samples} vs {n_pack} sampel)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack dataset audio ke satu array memory-mapped.")
+    parser.add_argument('command', nargs='?', default='pack', choices=['pack', 'bench'])
+    parser.add_argument('--dtype', default='int16', choices=['int16', 'float16'], help="Tipe sampel di dalam pack")
+    parser.add_argument('--rebuild', action='store_true', help="Bangun ulang pack dari awal (memadatkan ruang kosong)")
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        pack_dataset(dtype=args.dtype, rebuild=args.rebuild)
+    else:
+        benchmark()
@@ -0,0 +1,209 @@
+import os
+import gzip
+import shutil
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from model import (
+    MODELS_PATH, EPOCHS, BATCH_SIZE, SAMPLE_RATE, DURATION, N_MFCC, load_cached_data, split_by_source, fit_model
+)
+from arch_bench import CANDIDATES, measure_latency, model_size
+from model_bundle import export_bundle, feature_config, bundle_path, source_files
+
+# --- KONFIGURASI ---
+STUDENT_PATH = os.path.join(MODELS_PATH, 'student')   # Direktori artefak model student
+TEMPERATURE = 4.0        # Suhu softmax untuk target lunak
+ALPHA = 0.3              # Bobot loss label asli (sisanya untuk distilasi)
+PRUNE_EPOCHS = 10        # Iterasi fine-tuning setelah pruning
+
+
+def distillation_loss(num_classes, temperature=TEMPERATURE, alpha=ALPHA):
+    """
+    Loss distilasi. y_true berisi [one-hot label asli | target lunak teacher]
+    yang digabung, sehingga model dapat dilatih dengan model.fit biasa.
+    """
+    def loss(y_true, y_pred):
+        hard = y_true[:, :num_classes]
+        soft = y_true[:, num_classes:]
+        ce = tf.keras.losses.categorical_crossentropy(hard, y_pred)
+        # Student mengeluarkan softmax: log-probabilitas setara logit untuk pelunakan
+        log_p = tf.math.log(tf.clip_by_value(y_pred, 1e-7, 1.0)) / temperature
+        kd = tf.keras.losses.kl_divergence(soft, tf.nn.softmax(log_p)) * temperature ** 2
+        return alpha * ce + (1 - alpha) * kd
+    return loss
+
+
+def soften(probs, temperature=TEMPERATURE):
+    """Melunakkan distribusi probabilitas teacher dengan suhu T."""
+    logits = np.log(np.clip(probs, 1e-7, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def packed_accuracy(num_classes):
+    """Metrik akurasi untuk y_true yang digabung (hanya bagian label asli)."""
+    def accuracy(y_true, y_pred):
+        return tf.cast(tf.equal(tf.argmax(y_true[:, :num_classes], axis=1), tf.argmax(y_pred, axis=1)), tf.float32)
+    return accuracy
+
+
+def _compile_standard(model):
+    """Kompilasi ulang dengan loss standar agar artefak dapat dimuat main.py tanpa objek kustom."""
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.0005),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+
+def prunable_layers(model):
+    """Layer dengan kernel yang dipangkas (konvolusi dan Dense)."""
+    return [l for l in model.layers if isinstance(l, (layers.Conv1D, layers.Conv2D, layers.Dense, layers.SeparableConv2D))]
+
+
+class PruningMask(tf.keras.callbacks.Callback):
+    """Menjaga bobot yang sudah dipangkas tetap nol selama fine-tuning."""
+    def __init__(self, masks):
+        super().__init__()
+        self.masks = masks
+
+    def apply(self):
+        for layer, mask in self.masks:
+            weights = layer.get_weights()
+            weights[0] = weights[0] * mask
+            layer.set_weights(weights)
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.apply()
+
+
+def magnitude_prune(model, sparsity):
+    """Memangkas bobot kernel dengan magnitudo terkecil per layer. Mengembalikan callback mask."""
+    masks = []
+    for layer in prunable_layers(model):
+        kernel = layer.get_weights()[0]
+        threshold = np.quantile(np.abs(kernel), sparsity)
+        masks.append((layer, (np.abs(kernel) > threshold).astype(kernel.dtype)))
+    callback = PruningMask(masks)
+    callback.apply()
+    return callback
+
+
+def nonzero_params(model):
+    """Jumlah parameter yang tidak nol (efek pruning)."""
+    return int(sum(np.count_nonzero(w) for w in model.get_weights()))
+
+
+def gzip_size(model):
+    """Ukuran .h5 setelah kompresi gzip (KB), mencerminkan manfaat sparsity di disk."""
+    path = os.path.join(STUDENT_PATH, '_size_probe.h5')
+    model.save(path)
+    with open(path, 'rb') as f:
+        size = len(gzip.compress(f.read()))
+    os.remove(path)
+    return size / 1024
+
+
+def distill(student_name='narrow', epochs=EPOCHS, sparsity=0.0, promote=False):
+    """Mendistilasi voice_model ke model student yang lebih kecil, opsional dengan pruning."""
+    teacher_path = os.path.join(MODELS_PATH, 'voice_model.h5')
+    le_path = os.path.join(MODELS_PATH, 'label_encoder.npy')
+    if not os.path.exists(teacher_path):
+        print("Error: Model teacher belum ada. Jalankan model.py terlebih dahulu.")
+        return
+    if not os.path.exists(STUDENT_PATH):
+        os.makedirs(STUDENT_PATH)
+
+    classes = np.load(le_path, allow_pickle=True)
+    class_index = {str(c): i for i, c in enumerate(classes)}
+    num_classes = len(classes)
+
+    X, y, sources = load_cached_data(with_sources=True)
+    # Label dataset yang belum dikenal teacher (mis. direkam setelah pelatihan) tidak bisa didistilasi
+    known = np.array([str(label) in class_index for label in y])
+    if not known.all():
+        unknown = sorted({str(label) for label in y[~known]})
+        print(f"⚠️ Label tidak dikenal teacher dilewati ({int((~known).sum())} sampel): {unknown}")
+        X, y, sources = X[known], y[known], sources[known]
+    y_encoded = np.array([class_index[str(label)] for label in y])
+
+    # Pembagian per file sumber yang sama dengan model.py, sehingga teacher dinilai
+    # pada rekaman yang tidak dilihatnya saat pelatihan
+    test = split_by_source(sources)
+    X_train, X_test, y_train, y_test = X[~test], X[test], y_encoded[~test], y_encoded[test]
+
+    teacher = tf.keras.models.load_model(teacher_path)
+    _, teacher_acc = teacher.evaluate(X_test, y_test, verbose=0)
+
+    # Target: label asli (one-hot) digabung dengan target lunak teacher
+    def packed_targets(X_part, y_part):
+        hard = np.eye(num_classes, dtype=np.float32)[y_part]
+        soft = soften(teacher.predict(X_part, batch_size=256, verbose=0)).astype(np.float32)
+        return np.concatenate([hard, soft], axis=1)
+
+    Y_train = packed_targets(X_train, y_train)
+    Y_test = packed_targets(X_test, y_test)
+
+    # --- 1. Distilasi ---
+    print(f"\n🎓 Distilasi ke student '{student_name}'...")
+    student = CANDIDATES[student_name]((X_train.shape[1], X_train.shape[2]), num_classes)
+    student.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss=distillation_loss(num_classes),
+        metrics=[packed_accuracy(num_classes)]
+    )
+    fit_model(student, X_train, Y_train, X_test, Y_test, epochs=epochs, batch_size=BATCH_SIZE)
+    _compile_standard(student)
+
+    # --- 2. Pruning Magnitudo + Fine-tuning (opsional) ---
+    if sparsity > 0:
+        print(f"\n✂️ Pruning magnitudo {sparsity * 100:.0f}% lalu fine-tuning...")
+        mask = magnitude_prune(student, sparsity)
+        student.fit(X_train, y_train, validation_data=(X_test, y_test), epochs=PRUNE_EPOCHS,
+                    batch_size=BATCH_SIZE, callbacks=[mask], verbose=1)
+        mask.apply()
+
+    _, student_acc = student.evaluate(X_test, y_test, verbose=0)
+
+    # --- 3. Ekspor dalam format artefak yang sama dengan main.py ---
+    student.save(os.path.join(STUDENT_PATH, 'voice_model.h5'))
+    student.save(os.path.join(STUDENT_PATH, 'voice_model.keras'))
+    shutil.copy(le_path, os.path.join(STUDENT_PATH, 'label_encoder.npy'))
+
+    # --- 4. Laporan ---
+    sample = X_test[:1]
+    rows = [
+        ("Teacher", teacher, teacher_acc),
+        ("Student", student, student_acc),
+    ]
+    print("=" * 78)
+    print(f"{'Model':<10}{'Params':>10}{'Non-nol':>10}{'H5 (KB)':>10}{'Gzip (KB)':>11}{'Latensi(ms)':>13}{'Akurasi':>10}")
+    for name, m, acc in rows:
+        print(f"{name:<10}{m.count_params():>10}{nonzero_params(m):>10}{model_size(m):>10.1f}"
+              f"{gzip_size(m):>11.1f}{measure_latency(m, sample):>13.3f}{acc * 100:>9.2f}%")
+    print("=" * 78)
+    print(f"Penurunan akurasi: {(teacher_acc - student_acc) * 100:.2f} poin")
+    print(f"✅ Student disimpan: {STUDENT_PATH}")
+
+    if promote:
+        shutil.copy(teacher_path, os.path.join(MODELS_PATH, 'voice_model.prev.h5'))
+        shutil.copy(os.path.join(STUDENT_PATH, 'voice_model.h5'), teacher_path)
+        shutil.copy(os.path.join(STUDENT_PATH, 'voice_model.keras'), os.path.join(MODELS_PATH, 'voice_model.keras'))
+        # Bundle ikut diganti agar main.py tidak tetap memuat teacher dari bundle lama
+        export_bundle(student, classes, bundle_path(MODELS_PATH),
+                      feature_config(SAMPLE_RATE, DURATION, N_MFCC, n_frames=student.input_shape[1]),
+                      sources=source_files(MODELS_PATH))
+        print("🚀 Student dipromosikan menjadi model utama (teacher dicadangkan sebagai voice_model.prev.h5)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distilasi dan pruning voice_model menjadi model CPU yang lebih kecil.")
+    parser.add_argument('--student', default='narrow', choices=list(CANDIDATES), help="Arsitektur student")
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help="Iterasi distilasi")
+    parser.add_argument('--sparsity', type=float, default=0.0, help="Proporsi bobot yang dipangkas (0 = tanpa pruning)")
+    parser.add_argument('--promote', action='store_true', help="Ganti model utama dengan student")
+    args = parser.parse_args()
+
+    distill(args.student, args.epochs, args.sparsity, args.promote)
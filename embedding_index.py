@@ -0,0 +1,246 @@
+import os
+import time
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from audio_utils import extract_features
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # Direktori aplikasi
+MODELS_PATH = os.path.join(BASE_DIR, 'models')                 # Direktori model
+DATASET_PATH = os.path.join(BASE_DIR, 'dataset')               # Direktori dataset
+INDEX_PATH = os.path.join(MODELS_PATH, 'prototypes.npz')       # Indeks prototipe kelas
+
+SAMPLE_RATE = 44100          # Tingkat sampling audio
+DURATION = 2.0               # Durasi buffer audio dalam detik
+N_MFCC = 40                  # Jumlah koefisien MFCC
+N_BACKGROUND = 50            # Jumlah noise sintetik untuk prototipe background
+
+
+def build_embedding_model(model, with_softmax=False):
+    """
+    Memakai layer Dense terakhir sebelum output (Dense(64) pada build_compact_model)
+    sebagai embedding. Jika with_softmax=True, model mengeluarkan [embedding, softmax]
+    dalam satu panggilan.
+    """
+    dense_layers = [layer for layer in model.layers[:-1] if isinstance(layer, layers.Dense)]
+    if not dense_layers:
+        raise ValueError("Model tidak memiliki layer Dense sebelum output.")
+    embedding = dense_layers[-1].output
+    outputs = [embedding, model.output] if with_softmax else embedding
+    return tf.keras.Model(inputs=model.inputs, outputs=outputs)
+
+
+def _normalize(vectors):
+    """Normalisasi L2 per baris agar kemiripan kosinus cukup dengan perkalian titik."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class PrototypeIndex:
+    """Indeks kecil prototipe kelas (rata-rata embedding ternormalisasi per label)."""
+    def __init__(self, labels=None, vectors=None, counts=None):
+        self.labels = list(labels) if labels is not None else []
+        self.vectors = np.asarray(vectors, dtype=np.float32) if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.int64) if counts is not None else np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        return label in self.labels
+
+    def add(self, label, embeddings):
+        """Menambahkan (atau memperbarui rata-rata) prototipe sebuah label."""
+        embeddings = _normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        n = len(embeddings)
+        total = embeddings.sum(axis=0)
+
+        if label in self.labels:
+            i = self.labels.index(label)
+            merged = self.vectors[i] * self.counts[i] + total
+            self.vectors[i] = _normalize(merged)
+            self.counts[i] += n
+            return
+
+        proto = _normalize(total / n)
+        if len(self.labels) == 0:
+            self.vectors = proto[np.newaxis, :]
+        else:
+            self.vectors = np.vstack([self.vectors, proto])
+        self.labels.append(label)
+        self.counts = np.append(self.counts, n)
+
+    def remove(self, label):
+        """Menghapus prototipe sebuah label."""
+        i = self.labels.index(label)
+        del self.labels[i]
+        self.vectors = np.delete(self.vectors, i, axis=0)
+        self.counts = np.delete(self.counts, i)
+
+    def similarities(self, embedding):
+        """Kemiripan kosinus embedding terhadap semua prototipe."""
+        return self.vectors @ _normalize(np.asarray(embedding, dtype=np.float32))
+
+    def classify(self, embedding):
+        """Mengembalikan (label, kemiripan) prototipe terdekat."""
+        sims = self.similarities(embedding)
+        top_idx = int(np.argmax(sims))
+        return self.labels[top_idx], float(sims[top_idx])
+
+    def save(self, path=INDEX_PATH):
+        """Menyimpan indeks sebagai .npz tanpa pickle."""
+        np.savez(path, labels=np.array(self.labels, dtype=str), vectors=self.vectors, counts=self.counts)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        """Memuat indeks dari file .npz."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(l) for l in data["labels"]], data["vectors"], data["counts"])
+
+
+def load_model():
+    """Memuat model dan daftar label yang telah dilatih."""
+    model = tf.keras.models.load_model(os.path.join(MODELS_PATH, 'voice_model.h5'))
+    classes = [str(c) for c in np.load(os.path.join(MODELS_PATH, 'label_encoder.npy'), allow_pickle=True)]
+    return model, classes
+
+
+def label_files(label):
+    """Daftar file WAV untuk satu label di dataset."""
+    class_path = os.path.join(DATASET_PATH, label)
+    if not os.path.isdir(class_path):
+        return []
+    return sorted(os.path.join(class_path, f) for f in os.listdir(class_path) if f.endswith('.wav'))
+
+
+def clip_features(files):
+    """Fitur runtime (jalur yang sama dengan main.py) untuk sekumpulan file."""
+    import librosa    # Hanya untuk dekode WAV saat membangun indeks; runtime tidak memerlukannya
+    feats = []
+    for file_path in files:
+        try:
+            audio, _ = librosa.load(file_path, sr=SAMPLE_RATE)
+            feats.append(extract_features(audio, SAMPLE_RATE, DURATION, N_MFCC))
+        except Exception as e:
+            print(f"Gagal memproses {file_path}: {e}")
+    return np.array(feats)
+
+
+def background_features(n=N_BACKGROUND):
+    """Fitur noise putih sintetik, sama seperti kelas background di model.py."""
+    return np.array([
+        extract_features(np.random.normal(0, 0.005, int(SAMPLE_RATE * DURATION)), SAMPLE_RATE, DURATION, N_MFCC)
+        for _ in range(n)
+    ])
+
+
+def build_index(embedder, classes, path=INDEX_PATH):
+    """Membangun indeks prototipe untuk semua kelas model dari dataset."""
+    index = PrototypeIndex()
+    for label in classes:
+        feats = background_features() if label == "background" else clip_features(label_files(label))
+        if len(feats) == 0:
+            print(f"⚠️ Tidak ada sampel untuk {label}, dilewati.")
+            continue
+        index.add(label, embedder.predict(feats, verbose=0))
+        print(f"   {label}: {len(feats)} sampel")
+    index.save(path)
+    print(f"✅ Indeks prototipe disimpan: {path} ({len(index)} kelas)")
+    return index
+
+
+def enroll_label(label, embedder=None, path=INDEX_PATH):
+    """
+    Mendaftarkan perintah baru tanpa pelatihan gradien:
+    embedding rekaman label dihitung lalu ditambahkan sebagai prototipe.
+    """
+    if embedder is None:
+        model, _ = load_model()
+        embedder = build_embedding_model(model)
+    index = PrototypeIndex.load(path) if os.path.exists(path) else PrototypeIndex()
+
+    feats = clip_features(label_files(label))
+    if len(feats) == 0:
+        raise ValueError(f"Tidak ada rekaman untuk label '{label}'.")
+    if label in index:
+        index.remove(label)
+    index.add(label, embedder.predict(feats, verbose=0))
+    index.save(path)
+    return len(feats)
+
+
+def compare(shots=5, seed=42):
+    """
+    Membandingkan akurasi dan latensi head softmax dengan klasifikasi prototipe.
+    Prototipe dibangun dari `shots` rekaman per kelas, sisanya dipakai untuk pengujian.
+    """
+    model, classes = load_model()
+    embedder = build_embedding_model(model)
+    rng = np.random.default_rng(seed)
+
+    index = PrototypeIndex()
+    X_test, y_test = [], []
+    for label in classes:
+        if label == "background":
+            feats = background_features(shots * 2)
+        else:
+            files = label_files(label)
+            rng.shuffle(files)
+            feats = clip_features(files)
+        if len(feats) <= shots:
+            continue
+        index.add(label, embedder.predict(feats[:shots], verbose=0))
+        X_test.append(feats[shots:])
+        y_test.extend([label] * (len(feats) - shots))
+
+    X_test = np.concatenate(X_test)
+    y_test = np.array(y_test)
+
+    # Akurasi (inferensi batch)
+    softmax_pred = np.asarray(classes)[np.argmax(model.predict(X_test, verbose=0), axis=1)]
+    emb = _normalize(embedder.predict(X_test, verbose=0))
+    proto_pred = np.asarray(index.labels)[np.argmax(emb @ index.vectors.T, axis=1)]
+
+    # Latensi satu sampel (seperti main.py)
+    sample = X_test[:1]
+    for _ in range(3):
+        model(sample, training=False)
+        embedder(sample, training=False)
+    runs = 50
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        model(sample, training=False).numpy()
+    t_softmax = (time.perf_counter() - t0) / runs
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        index.classify(embedder(sample, training=False).numpy()[0])
+    t_proto = (time.perf_counter() - t0) / runs
+
+    print("=" * 60)
+    print(f"Kelas: {len(index)} | Sampel uji: {len(y_test)} | Shots per kelas: {shots}")
+    print(f"{'Head':<20}{'Akurasi':>12}{'Latensi (ms)':>16}")
+    print(f"{'Softmax':<20}{np.mean(softmax_pred == y_test) * 100:>11.2f}%{t_softmax * 1000:>16.2f}")
+    print(f"{'Prototipe':<20}{np.mean(proto_pred == y_test) * 100:>11.2f}%{t_proto * 1000:>16.2f}")
+    print("=" * 60)
+    print("Catatan: model softmax dilatih pada seluruh dataset, sehingga akurasinya pada sampel uji ini optimistis.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indeks embedding dan klasifikasi prototipe terdekat.")
+    parser.add_argument('command', choices=['build', 'enroll', 'compare'])
+    parser.add_argument('--label', help="Label yang didaftarkan (untuk 'enroll')")
+    parser.add_argument('--shots', type=int, default=5, help="Rekaman per kelas untuk prototipe (untuk 'compare')")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        model, classes = load_model()
+        build_index(build_embedding_model(model), classes)
+    elif args.command == 'enroll':
+        if not args.label:
+            parser.error("--label wajib untuk 'enroll'")
+        n = enroll_label(args.label)
+        print(f"✅ {args.label} didaftarkan dari {n} rekaman")
+    else:
+        compare(args.shots)
@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import tensorflow as tf
+from dataset_pack import open_pack
+from audio_utils import enhance_batch, enhanced_features, choose_denoise, DENOISE_WORKERS, DENOISE_MODES
+from model import DATASET_PATH, MODELS_PATH, list_labels, list_files, load_audio
+from model_bundle import load_bundle, feature_config, current_bundle
+
+# --- KONFIGURASI ---
+# Sama dengan voice_core.py agar evaluasi mengikuti jalur runtime
+SAMPLE_RATE = 44100          # Tingkat sampling audio
+DURATION = 2.0               # Durasi input model tetap (detik)
+N_MFCC = 40                  # Jumlah koefisien MFCC
+CONFIDENCE_THRESHOLD = 0.8   # Ambang batas runtime saat ini
+VARLEN_BUCKET = 0.25         # Bucket panjang untuk model varlen (input waktu None)
+DENOISE_POLICY = "full"      # Kebijakan reduksi noise runtime saat ini
+
+CHUNK = 256                  # Klip per putaran enhance/fitur (membatasi memori)
+BATCH_SIZE = 256             # Ukuran batch inferensi
+SWEEP = np.round(np.arange(0.50, 0.991, 0.02), 2)   # Ambang yang diuji
+
+# Ablasi reduksi noise (--ablation)
+ABLATION_POLICIES = DENOISE_MODES + ("adaptive",)
+# Kondisi (SNR dB, bagian snapshot yang sudah dikonsumsi): klip asli, noise latar dicampur pada
+# SNR tertentu, dan snapshot yang awalnya dinolkan seperti RingBuffer.snapshot_since saat perintah beruntun
+ABLATION_CONDITIONS = ((None, 0.0), (20.0, 0.0), (10.0, 0.0), (0.0, 0.0), (10.0, 0.5))
+ABLATION_LIMIT = 40          # Klip maksimum per label untuk ablasi (setiap klip diproses 20 kali)
+ABLATION_TOLERANCE = 0.01    # Selisih akurasi rata-rata terhadap "full" yang masih diterima
+
+
+def load_model_dir(model_dir):
+    """
+    Memuat voice_model.bundle, atau voice_model.h5 dan label_encoder.npy, dari direktori model mana pun.
+    Bundle yang basi terhadap h5 di sebelahnya diabaikan agar yang dievaluasi adalah model terbaru.
+    """
+    bundle = current_bundle(model_dir)
+    if bundle is not None:
+        model, classes, _ = load_bundle(bundle, feature_config(SAMPLE_RATE, DURATION, N_MFCC))
+        return model, [str(c) for c in classes]
+    model = tf.keras.models.load_model(os.path.join(model_dir, 'voice_model.h5'))
+    classes = np.load(os.path.join(model_dir, 'label_encoder.npy'), allow_pickle=True)
+    return model, [str(c) for c in classes]
+
+
+def collect_clips(limit=None, include_background=True):
+    """Daftar (path, label, offset) klip mentah tanpa augmentasi; noise latar dipotong per DURATION."""
+    clips = []
+    for label in sorted(list_labels()):
+        files = list_files(label, max_files=limit)
+        clips += [(f, label, None) for f in files]
+
+    bg_path = os.path.join(DATASET_PATH, '_background_noise')
+    if include_background and os.path.exists(bg_path):
+        pack = open_pack()
+        target = int(SAMPLE_RATE * DURATION)
+        for f in sorted(os.listdir(bg_path)):
+            if f.endswith('.wav'):
+                path = os.path.join(bg_path, f)
+                n = len(load_audio(path, pack))
+                clips += [(path, "background", i) for i in range(0, n - target, target)]
+    return clips
+
+
+def preprocess(clips, bucket=None, workers=DENOISE_WORKERS, policy=DENOISE_POLICY, transform=None):
+    """
+    Jalur praproses yang sama dengan main.py (enhance -> durasi -> normalisasi -> MFCC),
+    dengan reduksi noise paralel lewat enhance_batch dan ekstraksi fitur di thread pool.
+    `transform(audio, label, index)` mengubah audio mentah sebelum praproses (ablasi).
+    Mengembalikan (fitur, jalur reduksi noise per klip).
+    """
+    pack = open_pack()
+    target = int(SAMPLE_RATE * DURATION)
+    features, modes = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(clips), CHUNK):
+            audios = []
+            for j, (path, label, offset) in enumerate(clips[i:i + CHUNK], start=i):
+                audio = load_audio(path, pack)
+                audio = audio[offset:offset + target] if offset is not None else audio
+                audios.append(transform(audio, label, j) if transform else audio)
+            chunk_modes = [choose_denoise(a, policy)[0] for a in audios]
+            enhanced = enhance_batch(audios, SAMPLE_RATE, workers=workers, modes=chunk_modes)
+            features += pool.map(lambda a: enhanced_features(a, SAMPLE_RATE, DURATION, N_MFCC, bucket), enhanced)
+            modes += chunk_modes
+    return features, modes
+
+
+def predict_batched(model, features):
+    """Inferensi batch besar; fitur dengan bentuk berbeda (model varlen) dikelompokkan per bentuk."""
+    probs = np.zeros((len(features), model.output_shape[-1]), dtype=np.float32)
+    groups = {}
+    for i, f in enumerate(features):
+        groups.setdefault(f.shape, []).append(i)
+    for idx in groups.values():
+        batch = np.stack([features[i] for i in idx]).astype(np.float32)
+        probs[idx] = model.predict(batch, batch_size=BATCH_SIZE, verbose=0)
+    return probs
+
+
+def per_class_metrics(confusion, classes):
+    """Precision, recall, F1 dan support per kelas dari matriks konfusi (baris = label asli)."""
+    metrics = {}
+    for i, label in enumerate(classes):
+        tp = confusion[i, i]
+        predicted = confusion[:, i].sum()
+        support = confusion[i].sum()
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        metrics[label] = {"precision": float(precision), "recall": float(recall), "f1": float(f1), "support": int(support)}
+    return metrics
+
+
+def threshold_sweep(y_true, y_pred, confidence, background):
+    """
+    Aturan runtime per ambang: hasil diterima jika bukan background dan confidence >= ambang.
+    recall = perintah yang diterima dengan label benar; false_accept = aksi salah per klip.
+    """
+    is_command = y_true != background
+    rows = []
+    for t in SWEEP:
+        accepted = (y_pred != background) & (confidence >= t)
+        correct = accepted & (y_pred == y_true)
+        rows.append({
+            "threshold": float(t),
+            "recall": float(correct[is_command].mean()) if is_command.any() else 0.0,
+            "false_accept": float((accepted & ~correct).mean()),
+            "false_accept_background": float(accepted[~is_command].mean()) if (~is_command).any() else 0.0,
+            "rejected": float((~accepted[is_command]).mean()) if is_command.any() else 0.0,
+        })
+    return rows
+
+
+def evaluate(model_dir=MODELS_PATH, limit=None, include_background=True, workers=DENOISE_WORKERS, output=None,
+             policy=DENOISE_POLICY):
+    """Mengevaluasi satu model pada klip mentah dan menulis laporan JSON."""
+    model, classes = load_model_dir(model_dir)
+    bucket = VARLEN_BUCKET if model.input_shape[1] is None else None
+    class_index = {c: i for i, c in enumerate(classes)}
+
+    clips = collect_clips(limit, include_background)
+    skipped = sorted({label for _, label, _ in clips if label not in class_index})
+    clips = [c for c in clips if c[1] in class_index]
+    print(f"📂 {len(clips)} klip mentah | Model: {model_dir}" + (f" | Label tidak dikenal model: {skipped}" if skipped else ""))
+
+    t0 = time.perf_counter()
+    features, modes = preprocess(clips, bucket, workers, policy)
+    t_pre = time.perf_counter() - t0
+
+    predict_batched(model, features[:1])    # Pemanasan
+    t0 = time.perf_counter()
+    probs = predict_batched(model, features)
+    t_inf = time.perf_counter() - t0
+
+    y_true = np.array([class_index[label] for _, label, _ in clips])
+    y_pred = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    np.add.at(confusion, (y_true, y_pred), 1)
+    background = class_index.get("background", -1)
+
+    report = {
+        "model": os.path.abspath(model_dir),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "clips": len(clips),
+        "variable_length": bucket is not None,
+        "denoise": {"policy": policy, "paths": {m: modes.count(m) for m in DENOISE_MODES}},
+        "accuracy": float((y_true == y_pred).mean()),
+        "per_class": per_class_metrics(confusion, classes),
+        "confusion": {"labels": classes, "matrix": confusion.tolist()},
+        "threshold_sweep": threshold_sweep(y_true, y_pred, confidence, background),
+        "throughput": {
+            "preprocess_clips_per_sec": len(clips) / t_pre,
+            "inference_clips_per_sec": len(clips) / t_inf,
+            "total_clips_per_sec": len(clips) / (t_pre + t_inf),
+            "workers": workers,
+        },
+    }
+
+    output = output or os.path.join(model_dir, 'evaluation.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"✅ Laporan disimpan: {output}")
+    return report
+
+
+def mix_at_snr(audio, noise, snr_db, rng):
+    """Mencampur potongan acak `noise` ke audio pada SNR tertentu (daya seluruh klip)."""
+    start = rng.integers(0, max(len(noise) - len(audio), 1))
+    segment = noise[start:start + len(audio)]
+    if len(segment) < len(audio):
+        segment = np.resize(segment, len(audio))
+    p_audio = float(np.mean(np.square(audio, dtype=np.float64)))
+    p_noise = max(float(np.mean(np.square(segment, dtype=np.float64))), 1e-12)
+    return (audio + segment * np.sqrt(p_audio / (p_noise * 10 ** (snr_db / 10)))).astype(np.float32)
+
+
+def load_noise_bed(seed=0):
+    """Seluruh rekaman _background_noise disambung; noise putih jika belum ada."""
+    bg_path = os.path.join(DATASET_PATH, '_background_noise')
+    if os.path.exists(bg_path):
+        pack = open_pack()
+        parts = [load_audio(os.path.join(bg_path, f), pack) for f in sorted(os.listdir(bg_path)) if f.endswith('.wav')]
+        if parts:
+            return np.concatenate(parts).astype(np.float32)
+    return np.random.default_rng(seed).normal(0, 0.1, SAMPLE_RATE * 60).astype(np.float32)
+
+
+def ablation(model_dir=MODELS_PATH, limit=ABLATION_LIMIT, workers=DENOISE_WORKERS, output=None, seed=0):
+    """
+    Ablasi kebijakan reduksi noise: setiap kebijakan (none/light/full/adaptive) diuji pada
+    klip asli dan klip perintah yang dicampur noise latar pada beberapa SNR. Melaporkan
+    akurasi, recall perintah pada CONFIDENCE_THRESHOLD, aksi salah pada noise latar,
+    waktu CPU praproses per klip dan jalur yang dipilih, lalu merekomendasikan kebijakan
+    termurah yang akurasi rata-ratanya dalam ABLATION_TOLERANCE dari "full".
+    """
+    model, classes = load_model_dir(model_dir)
+    bucket = VARLEN_BUCKET if model.input_shape[1] is None else None
+    class_index = {c: i for i, c in enumerate(classes)}
+    clips = [c for c in collect_clips(limit, True) if c[1] in class_index]
+    y_true = np.array([class_index[label] for _, label, _ in clips])
+    background = class_index.get("background", -1)
+    is_command = y_true != background
+    noise = load_noise_bed(seed)
+    print(f"📂 {len(clips)} klip | Model: {model_dir} | Kondisi: {len(ABLATION_CONDITIONS)} | Kebijakan: {len(ABLATION_POLICIES)}")
+
+    predict_batched(model, preprocess(clips[:1], bucket, workers)[0])    # Pemanasan
+    rows = []
+    for snr_db, consumed in ABLATION_CONDITIONS:
+        def transform(audio, label, index):
+            if snr_db is not None and label != "background":
+                audio = mix_at_snr(audio, noise, snr_db, np.random.default_rng(seed + index))
+            if consumed:
+                # Awal snapshot berisi ucapan sebelumnya yang sudah dikenali (dinolkan)
+                audio = np.concatenate([np.zeros(int(len(audio) * consumed), dtype=np.float32), audio])
+            return audio
+
+        for policy in ABLATION_POLICIES:
+            cpu0 = time.process_time()
+            features, modes = preprocess(clips, bucket, workers, policy, transform)
+            cpu = time.process_time() - cpu0
+            probs = predict_batched(model, features)
+            y_pred, confidence = probs.argmax(axis=1), probs.max(axis=1)
+            accepted = (y_pred != background) & (confidence >= CONFIDENCE_THRESHOLD)
+            rows.append({
+                "condition": ("asli" if snr_db is None else f"{snr_db:.0f} dB") + (f"+{consumed:.0%}nol" if consumed else ""),
+                "snr_db": snr_db,
+                "consumed": consumed,
+                "policy": policy,
+                "accuracy": float((y_pred == y_true).mean()),
+                "recall": float((accepted & (y_pred == y_true))[is_command].mean()) if is_command.any() else 0.0,
+                "false_accept_background": float(accepted[~is_command].mean()) if (~is_command).any() else 0.0,
+                "cpu_ms_per_clip": cpu / len(clips) * 1000,
+                "paths": {m: modes.count(m) for m in DENOISE_MODES},
+            })
+            print(f"  {rows[-1]['condition']:<13} {policy:<9} akurasi {rows[-1]['accuracy'] * 100:.1f}%")
+
+    summary = {}
+    for policy in ABLATION_POLICIES:
+        own = [r for r in rows if r["policy"] == policy]
+        summary[policy] = {
+            "accuracy": float(np.mean([r["accuracy"] for r in own])),
+            "cpu_ms_per_clip": float(np.mean([r["cpu_ms_per_clip"] for r in own])),
+        }
+    eligible = [p for p in ABLATION_POLICIES
+                if summary[p]["accuracy"] >= summary["full"]["accuracy"] - ABLATION_TOLERANCE]
+    recommended = min(eligible, key=lambda p: summary[p]["cpu_ms_per_clip"])
+
+    report = {
+        "model": os.path.abspath(model_dir),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "clips": len(clips),
+        "rows": rows,
+        "summary": summary,
+        "recommended": recommended,
+    }
+    output = output or os.path.join(model_dir, 'denoise_ablation.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 97)
+    print(f"{'Kondisi':<14}{'Kebijakan':<11}{'Akurasi':>9}{'Recall':>9}{'FA latar':>10}{'CPU ms/klip':>13}   Jalur none/light/full")
+    for r in rows:
+        paths = "/".join(str(r["paths"][m]) for m in DENOISE_MODES)
+        print(f"{r['condition']:<14}{r['policy']:<11}{r['accuracy'] * 100:>8.1f}%{r['recall'] * 100:>8.1f}%"
+              f"{r['false_accept_background'] * 100:>9.2f}%{r['cpu_ms_per_clip']:>13.2f}   {paths}")
+    print("-" * 97)
+    for policy, m in summary.items():
+        print(f"Rata-rata {policy:<9} akurasi {m['accuracy'] * 100:5.1f}% | CPU {m['cpu_ms_per_clip']:.2f} ms/klip")
+    print(f"Rekomendasi DENOISE_POLICY: \"{recommended}\" (termurah dalam {ABLATION_TOLERANCE * 100:.0f} poin dari \"full\")")
+    print("=" * 97)
+    print(f"✅ Laporan disimpan: {output}")
+    return report
+
+
+def print_report(report):
+    """Ringkasan laporan di terminal."""
+    print("=" * 72)
+    print(f"Akurasi: {report['accuracy'] * 100:.2f}% pada {report['clips']} klip mentah")
+    print(f"{'Kelas':<18}{'Precision':>11}{'Recall':>9}{'F1':>8}{'Support':>9}")
+    for label, m in report["per_class"].items():
+        print(f"{label:<18}{m['precision'] * 100:>10.1f}%{m['recall'] * 100:>8.1f}%{m['f1'] * 100:>7.1f}%{m['support']:>9}")
+
+    labels = report["confusion"]["labels"]
+    width = max(6, max(len(l) for l in labels) + 1)
+    print("\nMatriks konfusi (baris = label asli, kolom = prediksi):")
+    print(" " * width + "".join(f"{i:>5}" for i in range(len(labels))))
+    for i, (label, row) in enumerate(zip(labels, report["confusion"]["matrix"])):
+        print(f"{label:<{width}}" + "".join(f"{v:>5}" for v in row) + f"  [{i}]")
+
+    print(f"\n{'Ambang':>7}{'Recall':>9}{'Aksi salah':>12}{'FA background':>15}{'Ditolak':>10}")
+    for r in report["threshold_sweep"]:
+        marker = "  <- CONFIDENCE_THRESHOLD" if abs(r["threshold"] - CONFIDENCE_THRESHOLD) < 1e-6 else ""
+        print(f"{r['threshold']:>7.2f}{r['recall'] * 100:>8.1f}%{r['false_accept'] * 100:>11.2f}%"
+              f"{r['false_accept_background'] * 100:>14.2f}%{r['rejected'] * 100:>9.1f}%{marker}")
+
+    d = report["denoise"]
+    print(f"\nReduksi noise: {d['policy']} | Jalur " + ", ".join(f"{m}: {n}" for m, n in d["paths"].items()))
+
+    t = report["throughput"]
+    print(f"\nThroughput: praproses {t['preprocess_clips_per_sec']:.1f} | inferensi {t['inference_clips_per_sec']:.1f} | "
+          f"total {t['total_clips_per_sec']:.1f} klip/detik ({t['workers']} worker)")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluasi model tersimpan pada klip mentah dengan praproses runtime.")
+    parser.add_argument('--model-dir', default=MODELS_PATH, help="Direktori berisi voice_model.h5 dan label_encoder.npy")
+    parser.add_argument('--limit', type=int, default=None, help="Maksimum klip per label")
+    parser.add_argument('--no-background', action='store_true', help="Jangan sertakan potongan noise latar")
+    parser.add_argument('--workers', type=int, default=DENOISE_WORKERS, help="Thread praproses")
+    parser.add_argument('--output', default=None, help="Jalur laporan JSON (default: <model-dir>/evaluation.json)")
+    parser.add_argument('--denoise', default=DENOISE_POLICY, choices=ABLATION_POLICIES, help="Kebijakan reduksi noise")
+    parser.add_argument('--ablation', action='store_true',
+                        help="Bandingkan akurasi dan CPU semua kebijakan reduksi noise pada beberapa SNR")
+    args = parser.parse_args()
+
+    if args.ablation:
+        ablation(args.model_dir, args.limit or ABLATION_LIMIT, args.workers, args.output)
+    else:
+        evaluate(args.model_dir, args.limit, not args.no_background, args.workers, args.output, args.denoise)
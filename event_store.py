@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+import numpy as np
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))       # Direktori aplikasi
+EVENTS_PATH = os.path.join(BASE_DIR, 'logs', 'events.db')   # Basis data event pengenalan
+QUEUE_SIZE = 10000           # Batas event yang menunggu ditulis (event baru dibuang jika penuh)
+FLUSH_INTERVAL = 0.5         # Jeda maksimum sebelum event ditulis ke disk (detik)
+FLUSH_BATCH = 200            # Jumlah event maksimum per transaksi
+
+# Hasil yang dianggap trigger palsu (tidak berakhir sebagai perintah)
+FALSE_OUTCOMES = ("background", "low_confidence", "ignored", "gated")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,             -- Waktu trigger (epoch detik)
+    source TEXT,                  -- Nama sumber audio
+    awake INTEGER,                -- Status wake saat trigger
+    label TEXT,                   -- Prediksi teratas (NULL jika ditolak sebelum model)
+    confidence REAL,
+    top_k TEXT,                   -- JSON [[label, skor], ...]
+    rms REAL,                     -- RMS saat trigger
+    snr_db REAL,                  -- SNR terhadap noise floor saat trigger
+    features_ms REAL,
+    inference_ms REAL,
+    denoise TEXT,                 -- Jalur reduksi noise (none/light/full)
+    latency_ms REAL,              -- Dari trigger hingga hasil ditangani
+    outcome TEXT NOT NULL,        -- wake/sleep/action/debounced/ignored/background/low_confidence/gated
+    audio BLOB                    -- Snapshot int16 (opsional)
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+"""
+
+COLUMNS = ("ts", "source", "awake", "label", "confidence", "top_k", "rms", "snr_db",
+           "features_ms", "inference_ms", "denoise", "latency_ms", "outcome", "audio")
+
+
+def connect(path=EVENTS_PATH):
+    """Membuka basis data event dalam mode WAL (pembaca tidak memblokir penulis)."""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Basis data dari versi sebelumnya belum memiliki kolom jalur reduksi noise
+    if "denoise" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+        conn.execute("ALTER TABLE events ADD COLUMN denoise TEXT")
+    return conn
+
+
+class EventStore:
+    """
+    Penyimpanan event pengenalan append-only. record() hanya memasukkan event ke
+    antrian; thread penulis latar menulisnya per batch dalam satu transaksi,
+    sehingga thread inferensi tidak pernah menunggu disk.
+    """
+    def __init__(self, path=EVENTS_PATH, keep_audio=False):
+        self.path = path
+        self.keep_audio = keep_audio
+        self.n_dropped = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record(self, outcome, ts=None, source=None, awake=False, result=None, rms=None,
+               snr_db=None, latency_ms=None, audio=None):
+        """Mencatat satu trigger. `result` adalah Recognition (None jika ditolak sebelum model)."""
+        timings = result.timings if result is not None else {}
+        blob = None
+        if self.keep_audio and audio is not None:
+            blob = (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+        row = (
+            time.time() if ts is None else ts,
+            source,
+            int(bool(awake)),
+            result.label if result is not None else None,
+            result.confidence if result is not None else None,
+            json.dumps([[l, float(c)] for l, c in result.top_k]) if result is not None else None,
+            rms,
+            snr_db,
+            timings.get("features_ms"),
+            timings.get("inference_ms"),
+            result.denoise if result is not None else None,
+            latency_ms,
+            outcome,
+            blob,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.n_dropped += 1
+
+    def close(self, timeout=2.0):
+        """Menulis event yang tersisa lalu menghentikan thread penulis."""
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        """Thread penulis: kumpulkan event hingga FLUSH_INTERVAL/FLUSH_BATCH lalu tulis sekaligus."""
+        conn = connect(self.path)
+        sql = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            rows = []
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while item is not None:
+                rows.append(item)
+                if len(rows) >= FLUSH_BATCH:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if item is None:
+                running = False
+            if rows:
+                with conn:
+                    conn.executemany(sql, rows)
+        conn.close()
+
+
+def load_rows(conn, since_hours=None, columns="*"):
+    """Baris event (opsional hanya `since_hours` jam terakhir)."""
+    if since_hours:
+        return conn.execute(f"SELECT {columns} FROM events WHERE ts >= ? ORDER BY ts",
+                            (time.time() - since_hours * 3600,)).fetchall()
+    return conn.execute(f"SELECT {columns} FROM events ORDER BY ts").fetchall()
+
+
+def latency_report(conn, since_hours=None):
+    """Persentil latensi per label untuk trigger yang sampai ke model."""
+    rows = load_rows(conn, since_hours, "label, features_ms, inference_ms, latency_ms, denoise")
+    per_label, per_denoise = {}, {}
+    for label, features_ms, inference_ms, latency_ms, denoise in rows:
+        if label is None or latency_ms is None:
+            continue
+        per_label.setdefault(label, []).append((features_ms or 0.0, inference_ms or 0.0, latency_ms))
+        if denoise is not None:
+            per_denoise.setdefault(denoise, []).append(features_ms or 0.0)
+
+    print("=" * 84)
+    print(f"{'Label':<16}{'N':>6}{'Fitur p50':>11}{'Model p50':>11}{'Total p50':>11}{'p95':>9}{'p99':>9}{'Maks':>9}")
+    for label, values in sorted(per_label.items()):
+        v = np.array(values)
+        total = v[:, 2]
+        print(f"{label:<16}{len(v):>6}{np.percentile(v[:, 0], 50):>11.1f}{np.percentile(v[:, 1], 50):>11.1f}"
+              f"{np.percentile(total, 50):>11.1f}{np.percentile(total, 95):>9.1f}{np.percentile(total, 99):>9.1f}"
+              f"{total.max():>9.1f}")
+    if per_denoise:
+        print("-" * 84)
+        n = sum(len(v) for v in per_denoise.values())
+        for mode in ("none", "light", "full"):
+            if mode in per_denoise:
+                v = per_denoise[mode]
+                print(f"Reduksi noise {mode:<6}{len(v):>6} ({len(v) / n * 100:4.0f}%)  Fitur p50 {np.percentile(v, 50):>7.1f}  p95 {np.percentile(v, 95):>7.1f}")
+    print("=" * 84)
+    print("Satuan: ms. Total = dari trigger hingga hasil ditangani (termasuk TRIGGER_DELAY).")
+
+
+def false_trigger_report(conn, since_hours=None):
+    """Jumlah trigger per jam, dipisah menjadi perintah dan trigger palsu per jenis hasil."""
+    rows = load_rows(conn, since_hours, "ts, outcome")
+    hours = {}
+    for ts, outcome in rows:
+        hour = time.strftime("%Y-%m-%d %H:00", time.localtime(ts))
+        counts = hours.setdefault(hour, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    print("=" * 84)
+    print(f"{'Jam':<18}{'Trigger':>9}{'Perintah':>10}{'Palsu':>8}  " + "".join(f"{o:>15}" for o in FALSE_OUTCOMES))
+    for hour, counts in sorted(hours.items()):
+        total = sum(counts.values())
+        false = sum(counts.get(o, 0) for o in FALSE_OUTCOMES)
+        print(f"{hour:<18}{total:>9}{total - false:>10}{false:>8}  " + "".join(f"{counts.get(o, 0):>15}" for o in FALSE_OUTCOMES))
+    print("=" * 84)
+
+
+def tail(conn, n=20):
+    """Menampilkan n event terakhir."""
+    rows = conn.execute("SELECT ts, source, awake, label, confidence, rms, latency_ms, outcome, audio IS NOT NULL "
+                        "FROM events ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+    for ts, source, awake, label, confidence, rms, latency_ms, outcome, has_audio in reversed(rows):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+        conf = f"{confidence * 100:5.1f}%" if confidence is not None else "   -  "
+        lat = f"{latency_ms:7.1f} ms" if latency_ms is not None else "      -   "
+        print(f"{stamp} [{source}] {'AKTIF ' if awake else 'STANDBY'} {str(label):<16}{conf} "
+              f"RMS {rms or 0:.3f} {lat} {outcome}{' 🎙' if has_audio else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kueri event pengenalan yang tersimpan.")
+    parser.add_argument('command', choices=['latency', 'false-triggers', 'tail'])
+    parser.add_argument('--db', default=EVENTS_PATH, help="Jalur basis data event")
+    parser.add_argument('--since', type=float, default=None, help="Hanya N jam terakhir")
+    parser.add_argument('-n', type=int, default=20, help="Jumlah event untuk 'tail'")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Basis data event belum ada: {args.db}")
+        raise SystemExit(1)
+    connection = connect(args.db)
+    if args.command == 'latency':
+        latency_report(connection, args.since)
+    elif args.command == 'false-triggers':
+        false_trigger_report(connection, args.since)
+    else:
+        tail(connection, args.n)
@@ -0,0 +1,312 @@
+import os
+import time
+import argparse
+import threading
+import numpy as np
+
+# --- KONFIGURASI ---
+# Parameter identik dengan librosa.feature.mfcc (bawaan) yang dipakai sejak awal
+SAMPLE_RATE = 44100          # Tingkat sampling audio
+N_MFCC = 40                  # Jumlah koefisien MFCC
+N_FFT = 2048                 # Panjang jendela FFT
+HOP_LENGTH = 512             # Jarak antar frame
+N_MELS = 128                 # Jumlah filter mel (Slaney)
+TOP_DB = 80.0                # Batas rentang dinamis power_to_db
+AMIN = 1e-10                 # Nilai minimum sebelum log
+DELTA_WIDTH = 9              # Lebar jendela delta (Savitzky-Golay)
+
+
+def hann_window(n_fft=N_FFT):
+    """Jendela Hann periodik (sama dengan scipy.signal.get_window('hann', fftbins=True))."""
+    n = np.arange(n_fft)
+    return (0.5 - 0.5 * np.cos(2 * np.pi * n / n_fft)).astype(np.float32)
+
+
+def hz_to_mel(freqs):
+    """Skala mel Slaney: linear di bawah 1 kHz, logaritmik di atasnya."""
+    freqs = np.asanyarray(freqs, dtype=np.float64)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_mels = min_log_mel + np.log(np.maximum(freqs, min_log_hz) / min_log_hz) / logstep
+    return np.where(freqs >= min_log_hz, log_mels, freqs / f_sp)
+
+
+def mel_to_hz(mels):
+    """Kebalikan hz_to_mel."""
+    mels = np.asanyarray(mels, dtype=np.float64)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_freqs = min_log_hz * np.exp(logstep * (np.maximum(mels, min_log_mel) - min_log_mel))
+    return np.where(mels >= min_log_mel, log_freqs, f_sp * mels)
+
+
+def mel_filterbank(sample_rate=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS):
+    """Filterbank mel segitiga dengan normalisasi area Slaney, bentuk (n_mels, 1 + n_fft // 2)."""
+    fft_freqs = np.linspace(0, sample_rate / 2, 1 + n_fft // 2)
+    mel_f = mel_to_hz(np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2))
+    fdiff = np.diff(mel_f)
+    ramps = mel_f[:, np.newaxis] - fft_freqs[np.newaxis, :]
+
+    lower = -ramps[:-2] / fdiff[:-1, np.newaxis]
+    upper = ramps[2:] / fdiff[1:, np.newaxis]
+    weights = np.maximum(0, np.minimum(lower, upper))
+
+    enorm = 2.0 / (mel_f[2:n_mels + 2] - mel_f[:n_mels])
+    return (weights * enorm[:, np.newaxis]).astype(np.float32)
+
+
+def dct_matrix(n_mfcc=N_MFCC, n_mels=N_MELS):
+    """Matriks DCT-II ortonormal (baris pertama saja), bentuk (n_mfcc, n_mels)."""
+    k = np.arange(n_mfcc)[:, np.newaxis]
+    n = np.arange(n_mels)[np.newaxis, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+def delta_kernel(order, width=DELTA_WIDTH):
+    """
+    Koefisien Savitzky-Golay untuk turunan ke-`order` (polyorder = order):
+    orde 1 -> k / sum(k^2), orde 2 -> 2 (k^2 - mean(k^2)) / sum((k^2 - mean(k^2))^2).
+    Untuk width 9: k / 60 dan 2 (k^2 - 20/3) / 308.
+    """
+    k = np.arange(width) - width // 2
+    if order == 1:
+        return (k / np.sum(k ** 2)).astype(np.float32)
+    if order == 2:
+        centered = k ** 2 - np.mean(k ** 2)
+        return (2 * centered / np.sum(centered ** 2)).astype(np.float32)
+    raise ValueError(f"Orde delta tidak didukung: {order}")
+
+
+class MFCCExtractor:
+    """
+    MFCC + Delta + Delta2 berbasis NumPy, setara librosa.feature.mfcc dan
+    librosa.feature.delta (mode 'interp'). Jendela, filterbank mel, matriks DCT dan
+    kernel delta dihitung sekali; buffer kerja dialokasikan sekali per panjang input
+    dan per thread sehingga aman dipakai paralel oleh pool analisis.
+    """
+    def __init__(self, sample_rate=SAMPLE_RATE, n_mfcc=N_MFCC, n_fft=N_FFT, hop_length=HOP_LENGTH,
+                 n_mels=N_MELS, top_db=TOP_DB, width=DELTA_WIDTH):
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        self.width = width
+
+        self.window = hann_window(n_fft)
+        self.mel_basis_t = np.ascontiguousarray(mel_filterbank(sample_rate, n_fft, n_mels).T)
+        self.dct = dct_matrix(n_mfcc, n_mels)
+        self.kernels = (delta_kernel(1, width), delta_kernel(2, width))
+        self._local = threading.local()
+
+    def n_frames(self, n_samples):
+        """Jumlah frame untuk STFT ber-center (padding n_fft // 2 di kedua sisi)."""
+        return 1 + n_samples // self.hop_length
+
+    def _buffers(self, n_samples):
+        """Buffer kerja per thread untuk satu panjang input (dipakai ulang antar panggilan)."""
+        cache = getattr(self._local, 'buffers', None)
+        if cache is None:
+            cache = self._local.buffers = {}
+        buffers = cache.get(n_samples)
+        if buffers is None:
+            n_frames = self.n_frames(n_samples)
+            n_bins = 1 + self.n_fft // 2
+            buffers = {
+                "padded": np.zeros(n_samples + self.n_fft, dtype=np.float32),
+                "frames": np.empty((n_frames, self.n_fft), dtype=np.float32),
+                "power": np.empty((n_frames, n_bins), dtype=np.float32),
+                "scratch": np.empty((n_frames, n_bins), dtype=np.float32),
+                "mel": np.empty((n_frames, self.mel_basis_t.shape[1]), dtype=np.float32),
+            }
+            # Batasi jumlah panjang yang di-cache (model varlen memakai beberapa bucket)
+            if len(cache) >= 16:
+                cache.pop(next(iter(cache)))
+            cache[n_samples] = buffers
+        return buffers
+
+    def mfcc(self, audio, out=None):
+        """MFCC bentuk (n_mfcc, frames), ditulis ke `out` jika diberikan."""
+        n_samples = len(audio)
+        b = self._buffers(n_samples)
+        pad = self.n_fft // 2
+
+        # STFT ber-center dengan padding konstan (nol); bagian padding buffer tetap nol
+        b["padded"][pad:pad + n_samples] = audio
+        n_frames = b["frames"].shape[0]
+        stride = b["padded"].strides[0]
+        frames = np.lib.stride_tricks.as_strided(
+            b["padded"], shape=(n_frames, self.n_fft), strides=(self.hop_length * stride, stride), writeable=False
+        )
+        np.multiply(frames, self.window, out=b["frames"])
+        spectrum = np.fft.rfft(b["frames"], axis=1)
+
+        # Spektrum daya -> mel -> dB (ref=1.0, top_db dari nilai maksimum global)
+        power = b["power"]
+        np.square(spectrum.real, out=power)
+        np.square(spectrum.imag, out=b["scratch"])
+        power += b["scratch"]
+        mel = b["mel"]
+        np.dot(power, self.mel_basis_t, out=mel)
+        np.maximum(mel, AMIN, out=mel)
+        np.log10(mel, out=mel)
+        mel *= 10.0
+        np.maximum(mel, mel.max() - self.top_db, out=mel)
+
+        # DCT-II ortonormal sepanjang sumbu mel
+        if out is None:
+            out = np.empty((self.n_mfcc, n_frames), dtype=np.float32)
+        np.dot(self.dct, mel.T, out=out)
+        return out
+
+    def delta(self, data, order, out=None):
+        """
+        Delta sepanjang waktu (sumbu terakhir), setara librosa.feature.delta(mode='interp'):
+        frame tepi mengambil nilai turunan polinomial dari jendela pertama/terakhir,
+        yang untuk polyorder = order sama dengan nilai di t = half dan t = T - half - 1.
+        Untuk kurang dari `width` frame (librosa menolak input ini) tepi direplikasi (mode 'nearest').
+        """
+        kernel = self.kernels[order - 1]
+        half = self.width // 2
+        n_frames = data.shape[-1]
+        if out is None:
+            out = np.empty_like(data)
+
+        if n_frames < self.width:
+            padded = np.pad(data, ((0, 0), (half, half)), mode='edge')
+            out[:] = 0
+            for i, c in enumerate(kernel):
+                out += c * padded[:, i:i + n_frames]
+            return out
+
+        inner = out[:, half:n_frames - half]
+        np.multiply(data[:, 0:n_frames - 2 * half], kernel[0], out=inner)
+        for i in range(1, self.width):
+            if kernel[i] != 0:
+                inner += kernel[i] * data[:, i:i + n_frames - 2 * half]
+        out[:, :half] = out[:, half:half + 1]
+        out[:, n_frames - half:] = out[:, n_frames - half - 1:n_frames - half]
+        return out
+
+    def __call__(self, audio):
+        """MFCC + Delta + Delta2 dengan bentuk (Frames, 3 * n_mfcc), sama seperti extract_mfcc lama."""
+        audio = np.asarray(audio, dtype=np.float32)
+        n_frames = self.n_frames(len(audio))
+        combined = np.empty((3 * self.n_mfcc, n_frames), dtype=np.float32)
+        mfcc = self.mfcc(audio, out=combined[:self.n_mfcc])
+        self.delta(mfcc, 1, out=combined[self.n_mfcc:2 * self.n_mfcc])
+        self.delta(mfcc, 2, out=combined[2 * self.n_mfcc:])
+        # Transpose agar dimensi sesuai dengan input CNN (Frames, Fitur)
+        return combined.T
+
+
+_extractors = {}
+_extractors_lock = threading.Lock()
+
+
+def mfcc_features(audio, sample_rate=SAMPLE_RATE, n_mfcc=N_MFCC):
+    """MFCC + Delta + Delta2 (Frames, Fitur) memakai extractor bersama per (sample_rate, n_mfcc)."""
+    key = (sample_rate, n_mfcc)
+    extractor = _extractors.get(key)
+    if extractor is None:
+        with _extractors_lock:
+            extractor = _extractors.setdefault(key, MFCCExtractor(sample_rate, n_mfcc))
+    return extractor(audio)
+
+
+def librosa_features(audio, sample_rate=SAMPLE_RATE, n_mfcc=N_MFCC):
+    """Implementasi referensi librosa (jalur lama extract_mfcc) untuk uji kesetaraan."""
+    import librosa
+    mfcc = librosa.feature.mfcc(y=audio, sr=sample_rate, n_mfcc=n_mfcc)
+    mfcc_delta = librosa.feature.delta(mfcc)
+    mfcc_delta2 = librosa.feature.delta(mfcc, order=2)
+    return np.concatenate([mfcc, mfcc_delta, mfcc_delta2], axis=0).T
+
+
+def dataset_clips(limit=None):
+    """Klip dataset yang sudah disesuaikan ke 2 detik (prepare_clip), sama seperti input pelatihan."""
+    from dataset_pack import open_pack
+    from model import list_labels, list_files, load_audio, prepare_clip
+    pack = open_pack()
+    clips = []
+    for label in sorted(list_labels()):
+        for file_path in list_files(label):
+            clips.append((file_path, prepare_clip(load_audio(file_path, pack)).astype(np.float32)))
+            if limit and len(clips) >= limit:
+                return clips
+    return clips
+
+
+def check_parity(limit=None, tolerance=1e-3):
+    """
+    Membandingkan fitur NumPy dengan librosa untuk setiap klip dataset.
+    Galat dilaporkan per blok (MFCC, Delta, Delta2) relatif terhadap rentang nilai blok.
+    """
+    clips = dataset_clips(limit)
+    worst = np.zeros(3)
+    failed = []
+    for file_path, audio in clips:
+        ours = mfcc_features(audio)
+        ref = librosa_features(audio)
+        if ours.shape != ref.shape:
+            failed.append((file_path, f"bentuk {ours.shape} vs {ref.shape}"))
+            continue
+        for i in range(3):
+            block = slice(i * N_MFCC, (i + 1) * N_MFCC)
+            scale = max(float(np.ptp(ref[:, block])), 1e-6)
+            err = float(np.max(np.abs(ours[:, block] - ref[:, block]))) / scale
+            worst[i] = max(worst[i], err)
+            if err > tolerance:
+                failed.append((file_path, f"blok {['mfcc', 'delta', 'delta2'][i]} galat relatif {err:.2e}"))
+
+    print("=" * 60)
+    print(f"Klip diuji: {len(clips)} | Toleransi relatif: {tolerance:.0e}")
+    print(f"Galat relatif maks: MFCC {worst[0]:.2e} | Delta {worst[1]:.2e} | Delta2 {worst[2]:.2e}")
+    for file_path, reason in failed[:10]:
+        print(f"   ❌ {os.path.basename(file_path)}: {reason}")
+    print("✅ Setara dengan librosa" if not failed else f"❌ {len(failed)} ketidaksesuaian")
+    print("=" * 60)
+    return not failed
+
+
+def benchmark(limit=200, repeats=3):
+    """Klip/detik ekstraksi fitur: librosa vs NumPy, pada klip dataset yang sama."""
+    clips = [audio for _, audio in dataset_clips(limit)]
+    mfcc_features(clips[0])
+    librosa_features(clips[0])
+
+    results = {}
+    for name, fn in (("librosa", librosa_features), ("numpy", mfcc_features)):
+        best = float('inf')
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            for audio in clips:
+                fn(audio)
+            best = min(best, time.perf_counter() - t0)
+        results[name] = best
+
+    print("=" * 60)
+    print(f"Klip: {len(clips)} (2 detik, {SAMPLE_RATE} Hz) | Terbaik dari {repeats} putaran")
+    for name, elapsed in results.items():
+        print(f"{name:<10}{len(clips) / elapsed:>10.1f} klip/detik{elapsed / len(clips) * 1000:>10.2f} ms/klip")
+    print(f"Percepatan: {results['librosa'] / results['numpy']:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstraksi MFCC berbasis NumPy: uji kesetaraan dan kecepatan terhadap librosa.")
+    parser.add_argument('command', choices=['check', 'bench'], help="check = kesetaraan, bench = kecepatan")
+    parser.add_argument('--limit', type=int, default=0, help="Batasi jumlah klip (0 = semua untuk check, 200 untuk bench)")
+    parser.add_argument('--tolerance', type=float, default=1e-3, help="Toleransi galat relatif untuk check")
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        ok = check_parity(args.limit or None, args.tolerance)
+        raise SystemExit(0 if ok else 1)
+    benchmark(args.limit or 200)
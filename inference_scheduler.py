@@ -0,0 +1,237 @@
+import os
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+# --- KONFIGURASI ---
+MAX_BATCH = 16               # Ukuran batch maksimum per panggilan model
+LATENCY_BUDGET = 0.010       # Tambahan latensi maksimum untuk mengumpulkan batch (detik)
+
+
+class _Request:
+    """Satu permintaan inferensi yang menunggu di antrian."""
+    __slots__ = ("features", "future", "submitted")
+
+    def __init__(self, features):
+        self.features = features
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+
+class InferenceScheduler:
+    """
+    Penjadwal inferensi bersama untuk banyak sumber audio.
+    Permintaan yang masuk dalam rentang LATENCY_BUDGET digabung menjadi satu
+    panggilan model (micro-batching), sehingga satu model dapat melayani banyak stream.
+    """
+    def __init__(self, predict_fn, max_batch=MAX_BATCH, latency_budget=LATENCY_BUDGET):
+        self.predict_fn = predict_fn          # Fungsi batch fitur -> output model
+        self.max_batch = max_batch
+        self.latency_budget = latency_budget
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self.is_running = False
+
+        # Statistik
+        self._lock = threading.Lock()
+        self.n_batches = 0
+        self.n_items = 0
+        self.wait_total = 0.0                 # Total waktu tunggu di antrian (detik)
+        self.wait_max = 0.0
+
+    def start(self):
+        """Memulai thread penjadwal."""
+        if self.is_running:
+            return self
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Menghentikan thread penjadwal."""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+    def submit(self, features):
+        """Mengirim fitur satu ucapan. Mengembalikan Future berisi output model untuk sampel tersebut."""
+        request = _Request(features)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, features):
+        """Versi sinkron dari submit()."""
+        return self.submit(features).result()
+
+    def stats(self):
+        """Ringkasan statistik batching."""
+        with self._lock:
+            return {
+                "batches": self.n_batches,
+                "items": self.n_items,
+                "mean_batch": self.n_items / self.n_batches if self.n_batches else 0.0,
+                "mean_wait_ms": self.wait_total / self.n_items * 1000 if self.n_items else 0.0,
+                "max_wait_ms": self.wait_max * 1000,
+            }
+
+    def _run(self):
+        """Loop penjadwal: tunggu permintaan pertama, lalu kumpulkan sisanya hingga batas waktu."""
+        while self.is_running:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = first.submitted + self.latency_budget
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.is_running = False
+                    break
+                batch.append(item)
+
+            self._execute(batch)
+
+        # Batalkan permintaan yang tersisa saat berhenti
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item.future.cancel()
+
+    def _execute(self, batch):
+        """Menjalankan model untuk satu batch (dikelompokkan per bentuk fitur)."""
+        start = time.perf_counter()
+        groups = {}
+        for item in batch:
+            groups.setdefault(item.features.shape, []).append(item)
+
+        for items in groups.values():
+            try:
+                outputs = self.predict_fn(np.stack([item.features for item in items]))
+            except Exception as e:
+                for item in items:
+                    item.future.set_exception(e)
+                continue
+            for i, item in enumerate(items):
+                # Model dengan beberapa output mengembalikan tuple per sampel
+                if isinstance(outputs, (list, tuple)):
+                    item.future.set_result(tuple(np.asarray(o)[i] for o in outputs))
+                else:
+                    item.future.set_result(np.asarray(outputs)[i])
+
+        with self._lock:
+            self.n_batches += 1
+            self.n_items += len(batch)
+            for item in batch:
+                wait = start - item.submitted
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+
+def keras_predict_fn(model):
+    """Membungkus model Keras sebagai fungsi batch (pemanggilan langsung, tanpa overhead predict())."""
+    def predict(batch):
+        outputs = model(batch, training=False)
+        if isinstance(outputs, (list, tuple)):
+            return [o.numpy() for o in outputs]
+        return outputs.numpy()
+    return predict
+
+
+def benchmark(source_counts=(1, 2, 4, 8, 16), duration=5.0, latency_budget=LATENCY_BUDGET, trigger_rate=1.0):
+    """
+    Mengukur throughput dan latensi tambahan saat jumlah sumber bertambah.
+    Setiap sumber mengirim ucapan secepat mungkin (loop tertutup) dari fitur dataset.
+    """
+    import librosa
+    import tensorflow as tf
+    from audio_utils import extract_features
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    model = tf.keras.models.load_model(os.path.join(base_dir, 'models', 'voice_model.h5'))
+    predict_fn = keras_predict_fn(model)
+
+    # Beberapa klip dataset sebagai "stream rekaman"
+    dataset = os.path.join(base_dir, 'dataset')
+    clips = []
+    for label in sorted(os.listdir(dataset)):
+        class_path = os.path.join(dataset, label)
+        if os.path.isdir(class_path):
+            wavs = [f for f in os.listdir(class_path) if f.endswith('.wav')]
+            if wavs:
+                audio, _ = librosa.load(os.path.join(class_path, wavs[0]), sr=44100)
+                clips.append(extract_features(audio))
+        if len(clips) >= 16:
+            break
+
+    # Referensi: inferensi satu sampel tanpa penjadwal
+    for _ in range(5):
+        predict_fn(clips[0][np.newaxis, ...])
+    t0 = time.perf_counter()
+    for i in range(50):
+        predict_fn(clips[i % len(clips)][np.newaxis, ...])
+    single_ms = (time.perf_counter() - t0) / 50 * 1000
+
+    print("=" * 78)
+    print(f"Inferensi tunggal tanpa penjadwal: {single_ms:.2f} ms | Budget batching: {latency_budget * 1000:.0f} ms")
+    print(f"{'Sumber':>7}{'Inferensi/dtk':>15}{'Batch rata2':>13}{'Latensi p50':>13}{'Latensi p95':>13}{'Stream/core':>14}")
+
+    for n_sources in source_counts:
+        scheduler = InferenceScheduler(predict_fn, latency_budget=latency_budget).start()
+        latencies = []
+        lock = threading.Lock()
+        stop_at = time.perf_counter() + duration
+
+        def source_loop(idx):
+            i = idx
+            while time.perf_counter() < stop_at:
+                t = time.perf_counter()
+                scheduler.predict(clips[i % len(clips)])
+                with lock:
+                    latencies.append(time.perf_counter() - t)
+                i += 1
+
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        threads = [threading.Thread(target=source_loop, args=(i,)) for i in range(n_sources)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+        scheduler.stop()
+
+        throughput = len(latencies) / wall
+        cores_used = max(cpu / wall, 1e-6)
+        # Satu stream menghasilkan sekitar trigger_rate ucapan per detik
+        streams_per_core = throughput / trigger_rate / cores_used
+        lat = np.array(latencies) * 1000
+        print(f"{n_sources:>7}{throughput:>15.1f}{scheduler.stats()['mean_batch']:>13.2f}"
+              f"{np.percentile(lat, 50):>11.2f}ms{np.percentile(lat, 95):>11.2f}ms{streams_per_core:>14.1f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark penjadwal inferensi micro-batching.")
+    parser.add_argument('--sources', type=int, nargs='+', default=[1, 2, 4, 8, 16], help="Jumlah sumber yang diuji")
+    parser.add_argument('--duration', type=float, default=5.0, help="Durasi tiap pengujian (detik)")
+    parser.add_argument('--budget-ms', type=float, default=LATENCY_BUDGET * 1000, help="Budget latensi batching (ms)")
+    parser.add_argument('--trigger-rate', type=float, default=1.0, help="Ucapan per detik per stream untuk estimasi stream/core")
+    args = parser.parse_args()
+
+    benchmark(args.sources, args.duration, args.budget_ms / 1000, args.trigger_rate)
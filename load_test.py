@@ -0,0 +1,138 @@
+import os
+import time
+import wave
+import random
+import asyncio
+import argparse
+import numpy as np
+import aiohttp
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))      # Direktori aplikasi
+DATASET_PATH = os.path.join(BASE_DIR, 'dataset')           # Jalur folder dataset
+SERVER_URL = 'http://127.0.0.1:8765'                       # Alamat server.py
+SAMPLE_RATE = 44100                                        # Tingkat sampling audio
+CHUNK = 1024                                               # Sampel per pesan WebSocket
+SILENCE = 1.0                                              # Sunyi sebelum/sesudah klip pada mode stream (detik)
+
+
+def load_clips(limit=None, seed=42):
+    """Daftar (label, path) klip dataset dalam urutan acak."""
+    clips = []
+    for label in sorted(os.listdir(DATASET_PATH)):
+        class_path = os.path.join(DATASET_PATH, label)
+        if os.path.isdir(class_path) and not label.startswith('_'):
+            clips += [(label, os.path.join(class_path, f)) for f in sorted(os.listdir(class_path)) if f.endswith('.wav')]
+    random.Random(seed).shuffle(clips)
+    return clips[:limit] if limit else clips
+
+
+def read_pcm(path):
+    """Membaca WAV int16 mono dari dataset sebagai bytes PCM."""
+    with wave.open(path, 'rb') as wf:
+        return wf.readframes(wf.getnframes())
+
+
+async def http_worker(session, url, jobs, results):
+    """Mengirim klip utuh ke POST /recognize satu per satu."""
+    while True:
+        try:
+            label, path = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        t0 = time.perf_counter()
+        async with session.post(f"{url}/recognize", data=body, headers={'Content-Type': 'audio/wav'}) as resp:
+            payload = await resp.json()
+        results.append((label, payload, time.perf_counter() - t0, resp.status))
+
+
+async def ws_worker(session, url, jobs, results):
+    """
+    Mengalirkan klip (diapit sunyi) ke /ws secepat mungkin.
+    Latensi diukur dari blok terakhir ucapan terkirim hingga hasil diterima
+    (0 bila hasil sudah tiba sebelum ucapan selesai dikirim).
+    """
+    silence = np.zeros(int(SILENCE * SAMPLE_RATE), dtype=np.int16).tobytes()
+    ws_url = url.replace('http', 'ws', 1) + '/ws'
+    try:
+        ws = await session.ws_connect(ws_url)
+    except aiohttp.WSServerHandshakeError as e:
+        # Sesi stream penuh (MAX_SESSIONS): dicatat sebagai penolakan
+        results.append((None, None, None, e.status))
+        return
+    async with ws:
+        while True:
+            try:
+                label, path = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            pcm = silence + read_pcm(path) + silence
+            speech_end = len(pcm) - len(silence)
+            sent_at = received_at = None
+            payload = None
+            for i in range(0, len(pcm), CHUNK * 2):
+                await ws.send_bytes(pcm[i:i + CHUNK * 2])
+                if sent_at is None and i + CHUNK * 2 >= speech_end:
+                    sent_at = time.perf_counter()
+                # Ambil hasil yang sudah tersedia tanpa menunggu
+                try:
+                    msg = await ws.receive(timeout=0.001)
+                    if msg.type == aiohttp.WSMsgType.TEXT and payload is None:
+                        payload, received_at = msg.json(), time.perf_counter()
+                except asyncio.TimeoutError:
+                    pass
+            if payload is None:
+                try:
+                    msg = await ws.receive(timeout=2.0)
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        payload, received_at = msg.json(), time.perf_counter()
+                except asyncio.TimeoutError:
+                    pass
+            latency = None
+            if payload is not None:
+                latency = max(received_at - sent_at, 0.0) if sent_at is not None else 0.0
+            results.append((label, payload, latency, 200))
+
+
+async def run(mode, concurrency, limit, url):
+    """Menjalankan uji beban dan mencetak ringkasan requests/detik serta latensi ekor."""
+    clips = load_clips(limit)
+    jobs = asyncio.Queue()
+    for clip in clips:
+        jobs.put_nowait(clip)
+    results = []
+
+    worker = http_worker if mode == 'http' else ws_worker
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(session, url, jobs, results) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    ok = [r for r in results if r[3] == 200 and r[1] is not None and r[2] is not None]
+    rejected = sum(1 for r in results if r[3] == 503)
+    latencies = np.array([r[2] for r in ok]) * 1000
+    correct = sum(1 for label, payload, _, _ in ok if payload.get("label") == label)
+
+    print("=" * 60)
+    print(f"Mode: {mode} | Klien paralel: {concurrency} | Klip: {len(clips)}")
+    print(f"Berhasil: {len(ok)} | Ditolak (503): {rejected} | Tanpa hasil: {len(results) - len(ok) - rejected}")
+    print(f"Throughput: {len(ok) / elapsed:.1f} req/detik ({elapsed:.1f} s)")
+    if len(latencies):
+        print(f"Latensi p50/p95/p99: {np.percentile(latencies, 50):.1f} / {np.percentile(latencies, 95):.1f} / "
+              f"{np.percentile(latencies, 99):.1f} ms (maks {latencies.max():.1f} ms)")
+        print(f"Akurasi label: {correct / len(ok) * 100:.1f}%")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uji beban server.py dengan memutar ulang klip dataset.")
+    parser.add_argument('--mode', choices=['http', 'ws'], default='http', help="HTTP (klip utuh) atau WebSocket (stream)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Jumlah klien paralel")
+    parser.add_argument('--limit', type=int, default=200, help="Jumlah klip yang diputar (0 = semua)")
+    parser.add_argument('--url', default=SERVER_URL)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.mode, args.concurrency, args.limit or None, args.url))
@@ -1,33 +1,12 @@
-import os
-import json
 import time
 import threading
 import queue
-import numpy as np
-import librosa
-import sounddevice as sd
-import tensorflow as tf
-from sklearn.preprocessing import LabelEncoder
 import pyautogui
-import ctypes
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-from audio_utils import enhance_audio
-
-# --- KONFIGURASI ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # Direktori aplikasi
-MODELS_PATH = os.path.join(BASE_DIR, 'models')                 # Direktori model
-COMMAND_MAP_PATH = os.path.join(BASE_DIR, 'command_map.json')  # Peta perintah
-APPS_PATH = os.path.join(BASE_DIR, 'apps')                     # Direktori aplikasi
-SOUNDS_PATH = os.path.join(BASE_DIR, 'sound')                  # Direktori suara feedback
-
-SAMPLE_RATE = 44100          # Tingkat sampling audio
-DURATION = 2.0               # Durasi buffer audio dalam detik
-N_MFCC = 40                  # Jumlah koefisien MFCC
-RMS_THRESHOLD = 0.05         # Ambang batas deteksi suara
-CONFIDENCE_THRESHOLD = 0.8   # Ambang batas kepercayaan prediksi
-COOLDOWN_PERIOD = 1.5        # Jeda waktu antar perintah (detik)
+from voice_core import VoiceAssistantCore, MODELS_PATH
+from profiles import list_profiles
 
 # WARNA UI (Tema HUD)
 BG_DARK = "#0F172A"          # Latar belakang gelap
@@ -77,230 +56,6 @@ class HUDPanel(tk.Canvas):
             self.create_rectangle(10, 0, 10 + (len(self.title)*8), 15, fill=BG_DARK, outline="", tags="hud")
             self.create_text(15, 7, text=self.title.upper(), fill=ACCENT_BLUE, font=("Consolas", 8, "bold"), anchor="w", tags="hud")
 
-class VoiceAssistantCore:
-    """Inti sistem asisten suara (logika AI dan deteksi)."""
-    def __init__(self, log_queue, history_queue, state_callback):
-        self.log_queue = log_queue              # Antrian untuk log
-        self.history_queue = history_queue      # Antrian untuk riwayat perintah
-        self.state_callback = state_callback    # Callback untuk update status UI
-        
-        self.is_running = False    # Status sistem berjalan
-        self.is_awake = False      # Status sistem aktif/standby
-        self.model = None          # Model TensorFlow
-        self.le = None             # Label Encoder
-        self.command_map = {}      # Peta perintah ke aksi
-        
-        self.audio_buffer = np.zeros(int(DURATION * SAMPLE_RATE))  # Buffer audio
-        self.waveform_data = np.zeros(100)  # Data untuk visualisasi waveform
-        self.last_action_time = 0  # Waktu aksi terakhir (untuk cooldown)
-        self.held_keys = set()     # Menyimpan tombol yang sedang ditekan
-
-    def log(self, message, type="info"):
-        """Mengirim pesan log ke antrian."""
-        self.log_queue.put((message, type))
-
-    def load_resources(self):
-        """Memuat model AI dan konfigurasi perintah."""
-        self.log("📦 Memuat model AI dan konfigurasi...")
-        try:
-            model_path = os.path.join(MODELS_PATH, 'voice_model.h5')
-            le_path = os.path.join(MODELS_PATH, 'label_encoder.npy')
-            
-            # Validasi keberadaan file model
-            if not os.path.exists(model_path) or not os.path.exists(le_path):
-                raise Exception("File model tidak ditemukan. Jalankan model.py terlebih dahulu.")
-                
-            # Memuat model dan label encoder
-            self.model = tf.keras.models.load_model(model_path)
-            self.le = LabelEncoder()
-            self.le.classes_ = np.load(le_path, allow_pickle=True)
-            
-            # Memuat peta perintah
-            if not os.path.exists(COMMAND_MAP_PATH):
-                raise Exception(f"{COMMAND_MAP_PATH} tidak ditemukan.")
-                
-            with open(COMMAND_MAP_PATH, 'r') as f:
-                self.command_map = json.load(f)
-            
-            self.log("✅ Sumber daya berhasil dimuat.")
-            return True
-        except Exception as e:
-            self.log(f"❌ Kesalahan Inisialisasi: {e}", "error")
-            return False
-
-    def play_feedback(self, filename):
-        """Memutar file audio feedback menggunakan MCI."""
-        def _play():
-            path = os.path.join(SOUNDS_PATH, filename)
-            if not os.path.exists(path): return
-            alias = f"sound_{int(time.time() * 1000)}"
-            try:
-                # Menggunakan Windows MCI untuk memutar audio
-                ctypes.windll.winmm.mciSendStringW(f'open "{path}" type mpegvideo alias {alias}', None, 0, 0)
-                ctypes.windll.winmm.mciSendStringW(f'play {alias} wait', None, 0, 0)
-                ctypes.windll.winmm.mciSendStringW(f'close {alias}', None, 0, 0)
-            except: pass
-        threading.Thread(target=_play, daemon=True).start()
-
-    def extract_features(self, audio):
-        """Mengekstrak fitur MFCC dari audio."""
-        # Perbaikan kualitas audio
-        audio = enhance_audio(audio, SAMPLE_RATE)
-        
-        # Penyesuaian durasi
-        target_samples = int(SAMPLE_RATE * DURATION)
-        if len(audio) < target_samples:
-            audio = np.pad(audio, (0, target_samples - len(audio)))
-        else:
-            audio = audio[:target_samples]
-        
-        # Normalisasi
-        if np.max(np.abs(audio)) > 0:
-            audio = audio / np.max(np.abs(audio))
-        
-        # Ekstraksi MFCC + Delta + Delta2
-        mfcc = librosa.feature.mfcc(y=audio, sr=SAMPLE_RATE, n_mfcc=N_MFCC)
-        mfcc_delta = librosa.feature.delta(mfcc)
-        mfcc_delta2 = librosa.feature.delta(mfcc, order=2)
-        combined = np.concatenate([mfcc, mfcc_delta, mfcc_delta2], axis=0)
-        return combined.T
-
-    def execute_action(self, label):
-        """Menjalankan aksi berdasarkan label perintah."""
-        if label in self.command_map:
-            action = self.command_map[label]
-            if not action or action.lower() == "none": return
-            
-            # Jika aksi adalah shortcut keyboard
-            if action.startswith("key:"):
-                keys_str = action[4:].strip()
-                keys = keys_str.split('+')
-                self.log(f"⌨️ [AUTO] Shortcut Keyboard: {keys_str}", "success")
-                try: 
-                    pyautogui.hotkey(*keys)
-                except Exception as e: 
-                    self.log(f"❌ Kesalahan Keyboard: {e}", "error")
-                return
-
-            # Jika aksi adalah perintah khusus (Internal Command)
-            if action.startswith("cmd:"):
-                cmd = action[4:].strip()
-                self.log(f"⚙️ [SYSTEM] Perintah Internal: {cmd}", "info")
-                try:
-                    if cmd == "alt_tab_start":
-                        if 'alt' not in self.held_keys:
-                            pyautogui.keyDown('alt')
-                            self.held_keys.add('alt')
-                        pyautogui.press('tab')
-                        self.log("🔀 Alt+Tab Aktif (Alt ditahan)", "success")
-                    elif cmd == "alt_tab_stop":
-                        for key in list(self.held_keys):
-                            pyautogui.keyUp(key)
-                            self.log(f"🔓 Melepas tombol: {key}", "info")
-                        self.held_keys.clear()
-                        self.log("✅ Semua tombol dilepas", "success")
-                except Exception as e:
-                    self.log(f"❌ Kesalahan Perintah: {e}", "error")
-                return
-
-            # Jika aksi adalah membuka aplikasi
-            app_name = action
-            app_path = os.path.join(APPS_PATH, app_name)
-            if os.path.exists(app_path):
-                self.log(f"🚀 [AUTO] Membuka aplikasi: {app_name}", "success")
-                try: 
-                    os.startfile(app_path)
-                except Exception as e: 
-                    self.log(f"❌ Kesalahan Membuka: {e}", "error")
-            else:
-                self.log(f"⚠️ File shortcut tidak ditemukan: {app_name}", "warning")
-
-    def audio_callback(self, indata, frames, time_info, status):
-        """Callback untuk menerima data audio dari microphone."""
-        # Geser buffer dan tambahkan data baru
-        self.audio_buffer = np.roll(self.audio_buffer, -frames)
-        self.audio_buffer[-frames:] = indata.flatten()
-        # Update data visualisasi waveform
-        self.waveform_data = indata[::len(indata)//100, 0] if len(indata) > 100 else indata[:, 0]
-
-    def run_inference_loop(self):
-        """Loop utama untuk deteksi dan inferensi perintah suara."""
-        self.is_running = True
-        self.play_feedback('standby.mp3')
-        
-        try:
-            # Membuka stream audio dari microphone
-            with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, callback=self.audio_callback):
-                while self.is_running:
-                    current_time = time.time()
-                    # Cooldown untuk mencegah deteksi berulang
-                    if current_time - self.last_action_time < COOLDOWN_PERIOD:
-                        time.sleep(0.1)
-                        continue
-
-                    # Hitung RMS (Root Mean Square) untuk deteksi suara
-                    check_len = int(0.15 * SAMPLE_RATE)
-                    rms = np.sqrt(np.mean(self.audio_buffer[-check_len:]**2))
-                    
-                    # Jika terdeteksi suara di atas threshold
-                    if rms > RMS_THRESHOLD:
-                        if self.is_awake:
-                            self.log(f"✨ Suara Terdeteksi (RMS: {rms:.3f}) - Menganalisis...", "debug")
-                        
-                        # Tunggu sedikit untuk memastikan audio lengkap
-                        time.sleep(0.6) 
-                        snapshot = self.audio_buffer.copy()
-                        
-                        try:
-                            # Ekstraksi fitur dan prediksi
-                            features = self.extract_features(snapshot)
-                            input_data = features[np.newaxis, ...]
-                            predictions = self.model.predict(input_data, verbose=0)
-                            top_idx = np.argmax(predictions[0])
-                            confidence = predictions[0][top_idx]
-                            label = self.le.classes_[top_idx]
-                            
-                            # Abaikan jika background noise
-                            if label == "background":
-                                pass
-                            # Abaikan jika confidence rendah
-                            elif confidence < CONFIDENCE_THRESHOLD:
-                                if self.is_awake:
-                                    self.log(f"❓ Deteksi confidence rendah: {label} ({confidence*100:.1f}%)", "warning")
-                            else:
-                                # Jika sistem dalam mode standby
-                                if not self.is_awake:
-                                    # Perintah wake-up
-                                    if label == "hello_voicecmd":
-                                        self.is_awake = True
-                                        self.state_callback(True)
-                                        self.log("💡 Sistem AKTIF", "success")
-                                        self.play_feedback('active.mp3')
-                                        self.last_action_time = time.time()
-                                # Jika sistem sudah aktif
-                                else:
-                                    # Perintah sleep
-                                    if label == "sleep_cmd":
-                                        self.is_awake = False
-                                        self.state_callback(False)
-                                        self.log("😴 Sistem STANDBY", "info")
-                                        self.play_feedback('standby.mp3')
-                                        self.last_action_time = time.time()
-                                    # Perintah lainnya
-                                    else:
-                                        self.log(f"🎯 COCOK: {label.upper()} ({confidence*100:.1f}%)", "success")
-                                        self.history_queue.put((label, confidence))
-                                        self.execute_action(label)
-                                        self.last_action_time = time.time()
-                        
-                        except Exception as e:
-                            self.log(f"❌ Kesalahan Prediksi: {e}", "error")
-                    
-                    time.sleep(0.05)
-        except Exception as e:
-            self.log(f"💥 Kesalahan Fatal Audio: {e}", "error")
-            self.is_running = False
-
 class VoiceAssistantGUI:
     """Antarmuka pengguna grafis (GUI) untuk asisten suara."""
     def __init__(self, root):
@@ -331,6 +86,15 @@ class VoiceAssistantGUI:
         self.header.pack(fill=tk.X, padx=10, pady=(10, 5))
         self.header.create_text(20, 30, text="DEEPVOICE HUD v2.0", fill=ACCENT_BLUE, font=("Consolas", 16, "bold"), anchor="w")
         self.uptime_id = self.header.create_text(980, 30, text="UPTIME: 00:00:00", fill=TEXT_DIM, font=("Consolas", 10), anchor="e")
+        self.trigger_id = self.header.create_text(820, 30, text="", fill=TEXT_DIM, font=("Consolas", 10), anchor="e")
+
+        # Pemilih profil pengguna (profil dingin dimuat di latar, lihat switch_profile)
+        self.profile_var = tk.StringVar(value=self.core.profile_name or "default")
+        profiles = list_profiles(MODELS_PATH)
+        self.profile_menu = tk.OptionMenu(self.header, self.profile_var, *profiles, command=self.core.switch_profile)
+        self.profile_menu.config(bg=BG_PANEL, fg=TEXT_PRIMARY, activebackground=BG_DARK, activeforeground=ACCENT_BLUE,
+                                 highlightthickness=0, relief=tk.FLAT, font=("Consolas", 9))
+        self.header.create_window(260, 30, window=self.profile_menu, anchor="w")
         self.start_time = time.time()
 
         # Layout Utama (Kiri: Status/Visualisasi, Kanan: Riwayat)
@@ -425,7 +189,8 @@ class VoiceAssistantGUI:
         else:
             self.vis_panel.coords(self.scan_line, scan_x, 0, scan_x, h_vis)
         
-        self.root.after(40, self.animate_wf)
+        # Standby hemat daya: animasi 5 fps alih-alih 25 fps
+        self.root.after(200 if self.core.low_power() else 40, self.animate_wf)
 
     def process_queues(self):
         """Memproses antrian log dan riwayat untuk ditampilkan di UI."""
@@ -454,7 +219,20 @@ class VoiceAssistantGUI:
         except queue.Empty:
             pass
 
-        self.root.after(100, self.process_queues)
+        # Statistik trigger: inferensi yang terbuang dan noise floor
+        stats = self.core.trigger_stats()
+        text = f"INFER: {stats['inferences']} | BUANG: {stats['discard_rate'] * 100:.0f}%"
+        if stats['noise_floor_db'] is not None:
+            text += f" | NOISE: {stats['noise_floor_db']:.0f} dB"
+        if stats['overflows'] or stats['dropped_seconds']:
+            text += f" | HILANG: {stats['dropped_seconds']:.1f} dtk ({stats['overflows']} overflow)"
+        self.header.itemconfig(self.trigger_id, text=text)
+
+        # Sinkronkan pemilih profil dengan profil aktif (termasuk perpindahan lewat suara)
+        if self.core.pending_profile is None and self.core.profile_name and self.profile_var.get() != self.core.profile_name:
+            self.profile_var.set(self.core.profile_name)
+
+        self.root.after(250 if self.core.low_power() else 100, self.process_queues)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -466,7 +244,7 @@ if __name__ == "__main__":
         if hasattr(app.core, 'held_keys'):
             for key in list(app.core.held_keys):
                 pyautogui.keyUp(key)
-        app.core.is_running = False
+        app.core.shutdown()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
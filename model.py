@@ -1,11 +1,17 @@
 import os
+import time
+import hashlib
+import argparse
 import numpy as np
 import librosa
 import tensorflow as tf
 from tensorflow.keras import layers, models, regularizers
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from dataset_pack import open_pack
+from features import mfcc_features
+from streaming_model import build_streaming_model, export_streaming, streaming_paths
+from model_bundle import export_bundle, feature_config, bundle_path, source_files
 
 # --- KONFIGURASI ---
 DATASET_PATH = 'dataset'        # Jalur folder dataset
@@ -15,44 +21,99 @@ DURATION = 2.0                  # Durasi audio dalam detik
 N_MFCC = 40                     # Jumlah koefisien MFCC yang diekstrak
 EPOCHS = 70                     # Jumlah iterasi pelatihan
 BATCH_SIZE = 32                 # Ukuran batch untuk pelatihan
+FEATURE_CACHE = os.path.join(MODELS_PATH, 'features_cache.npz')  # Cache fitur untuk benchmark
+TEST_SPLIT = 0.2                # Proporsi file sumber untuk data uji
+SPLIT_SEED = 42                 # Seed pembagian train/test per file (sama untuk model.py dan distill.py)
 
 # Membuat direktori model jika belum ada
 if not os.path.exists(MODELS_PATH):
     os.makedirs(MODELS_PATH)
 
-def load_data():
-    """Memuat data audio dari dataset dan menerapkan augmentasi."""
+def load_audio(file_path, pack=None):
+    """Memuat audio dari pack (jika tersedia dan masih valid) atau mendekode file WAV."""
+    if pack is not None:
+        audio = pack.lookup(file_path, DATASET_PATH)
+        if audio is not None:
+            return audio
+    audio, _ = librosa.load(file_path, sr=SAMPLE_RATE)
+    return audio
+
+def list_labels():
+    """Mendapatkan daftar label dari nama folder di direktori dataset."""
+    return [d for d in os.listdir(DATASET_PATH) if os.path.isdir(os.path.join(DATASET_PATH, d)) and not d.startswith('_')]
+
+def list_files(label, max_files=None, exclude=None, seed=42):
+    """Daftar path WAV untuk satu label, opsional dibatasi dan dikecualikan sebagian."""
+    class_path = os.path.join(DATASET_PATH, label)
+    files = sorted(os.path.join(class_path, f) for f in os.listdir(class_path) if f.endswith('.wav'))
+    if exclude:
+        files = [f for f in files if f not in exclude]
+    if max_files is not None and len(files) > max_files:
+        rng = np.random.default_rng(seed)
+        files = sorted(rng.choice(files, max_files, replace=False).tolist())
+    return files
+
+def prepare_clip(audio):
+    """Menyesuaikan durasi audio ke DURATION lalu menormalisasi amplitudonya."""
+    # Menyesuaikan durasi audio (tambahkan padding jika kurang, potong jika lebih)
+    target_samples = int(SAMPLE_RATE * DURATION)
+    if len(audio) < target_samples:
+        audio = np.pad(audio, (0, target_samples - len(audio)))
+    else:
+        audio = audio[:target_samples]
+    
+    # Normalisasi amplitudo audio
+    if np.max(np.abs(audio)) > 0:
+        audio = audio / np.max(np.abs(audio))
+    return audio
+
+def source_id(file_path):
+    """Identitas file sumber: jalur relatif terhadap DATASET_PATH dengan pemisah '/'."""
+    return os.path.relpath(file_path, DATASET_PATH).replace(os.sep, '/')
+
+def split_by_source(sources, test_size=TEST_SPLIT, seed=SPLIT_SEED):
+    """
+    Mask data uji per file sumber, sehingga semua augmentasi satu rekaman berada di
+    sisi yang sama. Keputusan diambil dari hash (seed, file), jadi stabil antar proses
+    dan tidak bergeser saat file lain ditambahkan.
+    """
+    def is_test(source):
+        digest = hashlib.sha1(f"{seed}:{source}".encode()).digest()
+        return int.from_bytes(digest[:4], 'little') / 2 ** 32 < test_size
+    decided = {s: is_test(s) for s in set(sources)}
+    return np.array([decided[s] for s in sources], dtype=bool)
+
+def load_data(labels=None, max_per_label=None, exclude=None, include_background=True, with_sources=False):
+    """
+    Memuat data audio dari dataset dan menerapkan augmentasi.
+    Secara default memuat semua label; `labels`, `max_per_label` dan `exclude`
+    membatasi file yang dipakai (misalnya untuk pelatihan inkremental).
+    Dengan `with_sources`, juga mengembalikan file sumber setiap baris (lihat split_by_source).
+    """
     X = []  # List untuk fitur audio
     y = []  # List untuk label kelas
+    sources = []  # File sumber setiap baris (augmentasi berbagi sumber dengan aslinya)
     
-    # Mendapatkan daftar label dari nama folder di direktori dataset
-    labels = [d for d in os.listdir(DATASET_PATH) if os.path.isdir(os.path.join(DATASET_PATH, d)) and not d.startswith('_')]
+    if labels is None:
+        labels = list_labels()
     
     print(f"📂 Kelas yang terdeteksi: {labels}")
     
+    # Gunakan pack memory-mapped jika sudah dibuat (lihat dataset_pack.py)
+    pack = open_pack()
+    if pack is not None:
+        print(f"📦 Menggunakan pack dataset ({len(pack)} klip)")
+    
     for label in labels:
-        class_path = os.path.join(DATASET_PATH, label)
-        wav_files = [f for f in os.listdir(class_path) if f.endswith('.wav')]
+        wav_files = list_files(label, max_per_label, exclude)
         
         print(f"   Memproses {label}: {len(wav_files)} sampel asli...")
         
-        for file in wav_files:
-            file_path = os.path.join(class_path, file)
-            
+        for file_path in wav_files:
+            before = len(y)
             try:
                 # Memuat file audio dengan tingkat sampling yang ditentukan
-                audio, _ = librosa.load(file_path, sr=SAMPLE_RATE)
-                
-                # Menyesuaikan durasi audio (tambahkan padding jika kurang, potong jika lebih)
-                target_samples = int(SAMPLE_RATE * DURATION)
-                if len(audio) < target_samples:
-                    audio = np.pad(audio, (0, target_samples - len(audio)))
-                else:
-                    audio = audio[:target_samples]
-                
-                # Normalisasi amplitudo audio
-                if np.max(np.abs(audio)) > 0:
-                    audio = audio / np.max(np.abs(audio))
+                audio = prepare_clip(load_audio(file_path, pack))
                 
                 # Ekstraksi fitur MFCC dari audio asli
                 X.append(extract_mfcc(audio))
@@ -78,8 +139,16 @@ def load_data():
                     y.append(label)
 
             except Exception as e:
-                print(f"Gagal memproses {file}: {e}")
-                continue
+                print(f"Gagal memproses {file_path}: {e}")
+            sources += [source_id(file_path)] * (len(y) - before)
+
+    def result():
+        if with_sources:
+            return np.array(X), np.array(y), np.array(sources)
+        return np.array(X), np.array(y)
+
+    if not include_background:
+        return result()
 
     # PENANGANAN NOISE LATAR BELAKANG (BACKGROUND NOISE)
     bg_path = os.path.join(DATASET_PATH, '_background_noise')
@@ -92,7 +161,7 @@ def load_data():
             if file.endswith('.wav'):
                 try:
                     fp = os.path.join(bg_path, file)
-                    aud, _ = librosa.load(fp, sr=SAMPLE_RATE)
+                    aud = load_audio(fp, pack)
                     target = int(SAMPLE_RATE * DURATION)
                     # Potong noise menjadi potongan-potongan sesuai durasi target
                     for i in range(0, len(aud) - target, target):
@@ -100,35 +169,57 @@ def load_data():
                         X.append(extract_mfcc(chunk))
                         y.append("background")
                         bg_samples.append(chunk)
+                        # Potongan tidak diaugmentasi, jadi masing-masing menjadi sumber sendiri
+                        sources.append(f"{source_id(fp)}#{i // target}")
                 except: pass
     
     # Jika sampel noise kurang dari 50, buat noise putih secara sintetik
     if len(bg_samples) < 50:
         print("Menghasilkan noise latar belakang sintetik...")
         num_needed = 100 - len(bg_samples)
-        for _ in range(num_needed):
+        for i in range(num_needed):
             noise = np.random.normal(0, 0.005, int(SAMPLE_RATE * DURATION))
             X.append(extract_mfcc(noise))
             y.append("background")
+            sources.append(f"synthetic:{i}")
+
+    return result()
 
-    return np.array(X), np.array(y)
+def dataset_fingerprint():
+    """Sidik jari ringan dataset (jumlah file dan mtime terbaru) untuk validasi cache."""
+    count, latest = 0, 0.0
+    for root, _, files in os.walk(DATASET_PATH):
+        for f in files:
+            if f.endswith('.wav'):
+                count += 1
+                latest = max(latest, os.path.getmtime(os.path.join(root, f)))
+    return f"{count}:{latest:.0f}:{SAMPLE_RATE}:{DURATION}:{N_MFCC}"
+
+def load_cached_data(cache_path=FEATURE_CACHE, with_sources=False):
+    """
+    Memuat fitur (sudah diaugmentasi) dari cache, atau membangunnya dengan load_data().
+    Dipakai alat benchmark agar semua kandidat dilatih pada fitur yang sama persis.
+    Dengan `with_sources`, juga mengembalikan file sumber setiap baris.
+    """
+    fingerprint = dataset_fingerprint()
+    if os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=False) as data:
+            # Cache lama tanpa file sumber ikut dibangun ulang
+            if str(data["fingerprint"]) == fingerprint and "sources" in data.files:
+                print(f"📦 Memuat fitur dari cache: {cache_path}")
+                X, y, sources = data["X"], data["y"], data["sources"]
+                return (X, y, sources) if with_sources else (X, y)
+        print("⚠️ Cache fitur kedaluwarsa, membangun ulang...")
+    X, y, sources = load_data(with_sources=True)
+    np.savez(cache_path, X=X, y=y.astype(str), sources=sources.astype(str), fingerprint=fingerprint)
+    return (X, y, sources) if with_sources else (X, y)
 
 def extract_mfcc(audio):
-    """Mengekstrak fitur MFCC beserta delta dan delta-delta."""
-    # Ekstraksi MFCC standar
-    mfcc = librosa.feature.mfcc(y=audio, sr=SAMPLE_RATE, n_mfcc=N_MFCC)
-    
-    # Menghitung delta (turunan pertama)
-    mfcc_delta = librosa.feature.delta(mfcc)
-    
-    # Menghitung delta2 (turunan kedua)
-    mfcc_delta2 = librosa.feature.delta(mfcc, order=2)
-    
-    # Menggabungkan ketiga fitur menjadi satu array
-    combined = np.concatenate([mfcc, mfcc_delta, mfcc_delta2], axis=0)
-    
-    # Transpose agar dimensi sesuai dengan input CNN (Frames, Fitur)
-    return combined.T
+    """
+    Mengekstrak fitur MFCC beserta delta dan delta-delta dengan bentuk (Frames, Fitur).
+    Memakai implementasi NumPy di features.py (setara librosa, lihat 'python features.py check').
+    """
+    return mfcc_features(audio, SAMPLE_RATE, N_MFCC)
 
 def add_noise(audio, noise_factor):
     """Menambahkan noise putih ke dalam audio."""
@@ -140,7 +231,7 @@ def shift_time(audio, shift_max):
     shift = int(SAMPLE_RATE * shift_max * np.random.uniform(-1, 1))
     return np.roll(audio, shift)
 
-def build_compact_model(input_shape, num_classes):
+def build_compact_model(input_shape, num_classes, jit_compile=False):
     """Membangun arsitektur model CNN yang ringan."""
     model = models.Sequential([
         layers.Input(shape=input_shape), # Layer input
@@ -176,8 +267,8 @@ def build_compact_model(input_shape, num_classes):
         layers.BatchNormalization(),
         layers.Dropout(0.5),
         
-        # Output Layer (Klasifikasi Softmax)
-        layers.Dense(num_classes, activation='softmax')
+        # Output Layer (Klasifikasi Softmax), tetap float32 saat mixed precision
+        layers.Dense(num_classes, activation='softmax', dtype='float32')
     ])
     
     # Menggunakan optimizer Adam
@@ -187,18 +278,122 @@ def build_compact_model(input_shape, num_classes):
     model.compile(
         optimizer=optimizer,
         loss='sparse_categorical_crossentropy',
-        metrics=['accuracy']
+        metrics=['accuracy'],
+        jit_compile=jit_compile
     )
     
     return model
 
+def fit_model(model, X_train, y_train, X_val, y_val, epochs=EPOCHS, batch_size=BATCH_SIZE, patience=10, extra_callbacks=None):
+    """Melatih model dengan callback early stopping dan penurunan learning rate."""
+    # Definisi Callback untuk optimasi pelatihan
+    callbacks = list(extra_callbacks or []) + [
+        # Berhenti lebih awal jika tidak ada peningkatan
+        EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True, verbose=1),
+        # Mengurangi learning rate saat stagnan
+        ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=max(1, patience // 2), min_lr=0.00001, verbose=1)
+    ]
+    
+    return model.fit(
+        X_train, y_train,
+        validation_data=(X_val, y_val),
+        epochs=epochs,
+        batch_size=batch_size,
+        callbacks=callbacks,
+        verbose=1
+    )
+
+class ThroughputProfiler(tf.keras.callbacks.Callback):
+    """
+    Mencatat throughput per epoch (sampel/detik) serta pembagian waktu antara
+    komputasi batch dan jeda di antara batch (input pipeline / overhead Python).
+    """
+    def __init__(self, n_samples):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._batch_end = self._epoch_start
+        self._compute = 0.0
+        self._gap = 0.0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        now = time.perf_counter()
+        self._gap += now - self._batch_end
+        self._batch_start = now
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        self._compute += now - self._batch_start
+        self._batch_end = now
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._epoch_start
+        stats = {
+            "epoch": epoch + 1,
+            "seconds": elapsed,
+            "samples_per_sec": self.n_samples / elapsed,
+            "compute_s": self._compute,
+            "input_gap_s": self._gap,
+        }
+        self.epochs.append(stats)
+        print(f"\n⏱️ Epoch {epoch + 1}: {stats['samples_per_sec']:.0f} sampel/detik | "
+              f"komputasi {self._compute:.2f}s | jeda input {self._gap:.2f}s | validasi+lainnya {elapsed - self._compute - self._gap:.2f}s")
+
+def cpu_supports_bf16():
+    """Mendeteksi dukungan bfloat16 native pada CPU (None jika tidak dapat diketahui)."""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            flags = f.read()
+    except OSError:
+        return None
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+def configure_runtime(args):
+    """Menerapkan pengaturan threading, XLA dan mixed precision sebelum model dibangun."""
+    if args.intra_threads:
+        tf.config.threading.set_intra_op_parallelism_threads(args.intra_threads)
+    if args.inter_threads:
+        tf.config.threading.set_inter_op_parallelism_threads(args.inter_threads)
+    if args.mixed_precision:
+        supported = cpu_supports_bf16()
+        if supported is False:
+            print("⚠️ CPU tidak mendukung bfloat16 secara native; pelatihan bisa lebih lambat.")
+        elif supported is None:
+            print("⚠️ Dukungan bfloat16 CPU tidak dapat dideteksi.")
+        tf.keras.mixed_precision.set_global_policy('mixed_bfloat16')
+    print(f"⚙️ Threads intra/inter: {args.intra_threads or 'default'}/{args.inter_threads or 'default'} | "
+          f"XLA: {args.xla} | Batch: {args.batch_size} | Presisi: {'mixed_bfloat16' if args.mixed_precision else 'float32'}")
+
+def parse_args():
+    """Argumen CLI untuk mengatur throughput pelatihan di CPU."""
+    parser = argparse.ArgumentParser(description="Pelatihan model perintah suara.")
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help="Jumlah iterasi pelatihan")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Ukuran batch")
+    parser.add_argument('--intra-threads', type=int, default=0, help="Thread intra-op TensorFlow (0 = default)")
+    parser.add_argument('--inter-threads', type=int, default=0, help="Thread inter-op TensorFlow (0 = default)")
+    parser.add_argument('--xla', action='store_true', help="Aktifkan kompilasi XLA (jit_compile)")
+    parser.add_argument('--mixed-precision', action='store_true', help="Gunakan mixed precision bfloat16")
+    parser.add_argument('--profile', action='store_true', help="Catat throughput per epoch dan trace profiler TensorBoard")
+    parser.add_argument('--profile-steps', default='10,15', help="Rentang batch untuk trace profiler (awal,akhir)")
+    parser.add_argument('--logdir', default=os.path.join(MODELS_PATH, 'logs'), help="Direktori log TensorBoard")
+    parser.add_argument('--streaming', action='store_true', help="Latih juga varian streaming kausal (streaming_model.py)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    configure_runtime(args)
+
     print("="*60)
     print("TRAINING MODEL PERINTAH SUARA")
     print("="*60)
     
     # 1. Memuat Dataset
-    X, y = load_data()
+    t_prep = time.perf_counter()
+    X, y, sources = load_data(with_sources=True)
+    t_prep = time.perf_counter() - t_prep
     
     if len(X) == 0:
         print("Error: Dataset kosong.")
@@ -215,42 +410,70 @@ if __name__ == "__main__":
     
     print(f"Kelas yang dipelajari ({num_classes}): {le.classes_}")
 
-    # 3. Pembagian Data (Training & Testing)
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-    )
+    # 3. Pembagian Data (Training & Testing) per file sumber, agar augmentasi satu
+    # rekaman tidak muncul di kedua sisi; distill.py memakai pembagian yang sama
+    test = split_by_source(sources)
+    X_train, X_test, y_train, y_test = X[~test], X[test], y_encoded[~test], y_encoded[test]
+    print(f"Pembagian per file: {len(set(sources[~test]))} file latih, {len(set(sources[test]))} file uji")
     
     # 4. Pembangunan & Pelatihan Model
     input_shape = (X_train.shape[1], X_train.shape[2])
     print(f"\nBentuk Input Model: {input_shape}")
     
-    model = build_compact_model(input_shape, num_classes)
+    model = build_compact_model(input_shape, num_classes, jit_compile=args.xla)
     model.summary() # Menampilkan ringkasan arsitektur model
     
-    # Definisi Callback untuk optimasi pelatihan
-    callbacks = [
-        # Berhenti lebih awal jika tidak ada peningkatan
-        EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True, verbose=1),
-        # Mengurangi learning rate saat stagnan
-        ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=0.00001, verbose=1)
-    ]
+    extra_callbacks = []
+    if args.profile:
+        profiler = ThroughputProfiler(len(X_train))
+        start, end = (int(v) for v in args.profile_steps.split(','))
+        extra_callbacks = [profiler, tf.keras.callbacks.TensorBoard(log_dir=args.logdir, profile_batch=(start, end))]
     
     print("\nMemulai Pelatihan...")
-    history = model.fit(
-        X_train, y_train,
-        validation_data=(X_test, y_test),
-        epochs=EPOCHS,
-        batch_size=BATCH_SIZE,
-        callbacks=callbacks,
-        verbose=1
-    )
+    t_fit = time.perf_counter()
+    history = fit_model(model, X_train, y_train, X_test, y_test,
+                        epochs=args.epochs, batch_size=args.batch_size, extra_callbacks=extra_callbacks)
+    t_fit = time.perf_counter() - t_fit
+    
+    if args.profile:
+        rates = [e["samples_per_sec"] for e in profiler.epochs]
+        compute = sum(e["compute_s"] for e in profiler.epochs)
+        gap = sum(e["input_gap_s"] for e in profiler.epochs)
+        print("="*60)
+        print(f"Persiapan fitur: {t_prep:.1f}s | Fit: {t_fit:.1f}s ({t_prep / (t_prep + t_fit) * 100:.0f}% waktu di persiapan fitur)")
+        print(f"Throughput: rata-rata {np.mean(rates):.0f}, puncak {np.max(rates):.0f} sampel/detik")
+        print(f"Di dalam fit: komputasi {compute:.1f}s vs jeda input {gap:.1f}s")
+        print(f"Trace profiler: tensorboard --logdir {args.logdir}")
+        print("="*60)
+    
+    # Model disimpan dalam float32 agar inferensi di main.py tidak bergantung pada bfloat16
+    if args.mixed_precision:
+        tf.keras.mixed_precision.set_global_policy('float32')
+        trained = model
+        model = build_compact_model(input_shape, num_classes)
+        model.set_weights(trained.get_weights())
     
     # 5. Penyimpanan Model
     model.save(os.path.join(MODELS_PATH, 'voice_model.h5'))
     model.save(os.path.join(MODELS_PATH, 'voice_model.keras'))
+    # Bundle berversi untuk main.py: bobot mentah, label JSON dan parameter fitur pelatihan
+    sha = export_bundle(model, le.classes_, bundle_path(MODELS_PATH),
+                        feature_config(SAMPLE_RATE, DURATION, N_MFCC, n_frames=input_shape[0]),
+                        sources=source_files(MODELS_PATH))
     
-    print("\nPelatihan Selesai & Model Berhasil Disimpan!")
+    print(f"\nPelatihan Selesai & Model Berhasil Disimpan! (bundle sha256 {sha[:12]})")
     
     # Evaluasi akhir menggunakan data testing
     loss, acc = model.evaluate(X_test, y_test)
-    print(f"Akurasi Pengujian Akhir: {acc*100:.2f}%")
\ No newline at end of file
+    print(f"Akurasi Pengujian Akhir: {acc*100:.2f}%")
+
+    # 6. Varian streaming (opsional): data dan pembagian yang sama, disimpan di samping model utama
+    if args.streaming:
+        print("\nMelatih varian streaming kausal...")
+        streaming = build_streaming_model(X_train.shape[2], num_classes)
+        fit_model(streaming, X_train, y_train, X_test, y_test, epochs=args.epochs, batch_size=args.batch_size)
+        model_path, weights_path = streaming_paths(MODELS_PATH)
+        streaming.save(model_path)
+        export_streaming(streaming, weights_path, window=X_train.shape[1])
+        loss, acc = streaming.evaluate(X_test, y_test)
+        print(f"Akurasi Pengujian Streaming: {acc*100:.2f}% | Disimpan: {model_path}, {weights_path}")
\ No newline at end of file
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import struct
+import hashlib
+import argparse
+import numpy as np
+import tensorflow as tf
+from features import HOP_LENGTH
+
+# --- KONFIGURASI ---
+BUNDLE_NAME = 'voice_model.bundle'   # Satu file: header JSON + bobot mentah
+BUNDLE_MAGIC = b'VCMB'
+BUNDLE_VERSION = 1           # Dinaikkan jika tata letak file berubah
+ALIGN = 64                   # Perataan awal blok bobot dan setiap tensor (byte)
+VERIFY_HASH = True           # Periksa hash konten saat memuat
+SOURCE_FILES = ('voice_model.h5', 'label_encoder.npy')   # File asal yang dicatat di bundle (deteksi bundle basi)
+
+
+class BundleError(Exception):
+    """Bundle model rusak, versinya tidak didukung, atau tidak cocok dengan konfigurasi runtime."""
+
+
+def feature_config(sample_rate, duration, n_mfcc, **extra):
+    """Parameter fitur yang disematkan di bundle dan dibandingkan saat memuat."""
+    config = {"sample_rate": int(sample_rate), "duration": float(duration), "n_mfcc": int(n_mfcc),
+              "hop_length": HOP_LENGTH}
+    config.update(extra)
+    return config
+
+
+def _padding(n):
+    return -n % ALIGN
+
+
+def _content_hash(header, blob):
+    """SHA-256 atas header (tanpa field hash) dan blok bobot."""
+    digest = hashlib.sha256(json.dumps({k: v for k, v in header.items() if k != "sha256"}, sort_keys=True).encode())
+    digest.update(blob)
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    """SHA-256 isi file, dibaca per blok."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_files(model_dir):
+    """File asal (h5 + label) di direktori model yang ada, untuk dicatat saat ekspor."""
+    return [p for p in (os.path.join(model_dir, name) for name in SOURCE_FILES) if os.path.exists(p)]
+
+
+def export_bundle(model, labels, path, features, sources=()):
+    """
+    Menulis model sebagai satu file bundle: magic, versi, panjang header, header JSON
+    (arsitektur Keras, label, parameter fitur, tabel tensor, hash konten), lalu bobot
+    float32 mentah yang diratakan sehingga dapat dipetakan ke memori tanpa salinan.
+    SHA-256 dan mtime file `sources` (h5 dan label yang baru disimpan) dicatat agar
+    pemuat dapat menolak bundle yang tertinggal dari h5 di sebelahnya.
+    """
+    tensors, chunks, offset = [], [], 0
+    for weight, value in zip(model.weights, model.get_weights()):
+        value = np.ascontiguousarray(value, dtype=np.float32)
+        tensors.append({"name": weight.name, "shape": list(value.shape), "offset": offset, "nbytes": value.nbytes})
+        chunks += [value.tobytes(), b"\0" * _padding(value.nbytes)]
+        offset += value.nbytes + _padding(value.nbytes)
+    blob = b"".join(chunks)
+
+    header = {
+        "version": BUNDLE_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "architecture": json.loads(model.to_json()),
+        "labels": [str(l) for l in labels],
+        "features": features,
+        "input_shape": list(model.input_shape[1:]),
+        "dtype": "float32",
+        "tensors": tensors,
+        "sources": {os.path.basename(p): {"sha256": file_sha256(p), "mtime": os.path.getmtime(p)} for p in sources},
+    }
+    header["sha256"] = _content_hash(header, blob)
+    raw = json.dumps(header).encode()
+    prefix = BUNDLE_MAGIC + struct.pack("<II", BUNDLE_VERSION, len(raw))
+    with open(path, "wb") as f:
+        f.write(prefix + raw + b"\0" * _padding(len(prefix) + len(raw)))
+        f.write(blob)
+    return header["sha256"]
+
+
+def read_header(path):
+    """Header bundle beserta offset blok bobot; memvalidasi magic dan versi."""
+    with open(path, "rb") as f:
+        prefix = f.read(12)
+        if len(prefix) < 12 or prefix[:4] != BUNDLE_MAGIC:
+            raise BundleError(f"{path} bukan bundle model")
+        version, size = struct.unpack("<II", prefix[4:])
+        if version != BUNDLE_VERSION:
+            raise BundleError(f"Versi bundle {version} tidak didukung (diharapkan {BUNDLE_VERSION})")
+        header = json.loads(f.read(size))
+    return header, 12 + size + _padding(12 + size)
+
+
+def load_bundle(path, features=None, verify=VERIFY_HASH):
+    """
+    Memuat bundle tanpa pickle: arsitektur dibangun dari JSON, bobot dibaca sebagai
+    view memmap lalu disalin sekali ke variabel model. Dengan `features`, parameter
+    fitur bundle harus sama dengan konfigurasi runtime. Mengembalikan (model, label, header).
+    """
+    header, data_offset = read_header(path)
+    if features is not None:
+        mismatch = {k: (header["features"].get(k), v) for k, v in features.items() if header["features"].get(k) != v}
+        if mismatch:
+            detail = ", ".join(f"{k}: bundle {a} != runtime {b}" for k, (a, b) in mismatch.items())
+            raise BundleError(f"Parameter fitur bundle tidak cocok dengan runtime ({detail})")
+
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset)
+    if verify and _content_hash(header, data) != header["sha256"]:
+        raise BundleError(f"Hash konten {path} tidak cocok (file rusak atau diubah)")
+
+    model = tf.keras.models.model_from_json(json.dumps(header["architecture"]))
+    model.set_weights([np.frombuffer(data, np.float32, int(np.prod(t["shape"])), t["offset"]).reshape(t["shape"])
+                       for t in header["tensors"]])
+    del data
+    return model, np.array(header["labels"]), header
+
+
+def bundle_path(model_dir):
+    """Jalur bundle di direktori model."""
+    return os.path.join(model_dir, BUNDLE_NAME)
+
+
+def stale_reason(path):
+    """
+    None jika bundle masih sesuai dengan voice_model.h5 / label_encoder.npy di sebelahnya,
+    atau alasan mengapa bundle basi (file asal ditulis ulang setelah ekspor, atau bundle
+    lama tanpa catatan asal). mtime yang sama dianggap cocok; jika berbeda (mis. file
+    disalin), SHA-256 isi file yang menentukan. Bundle tanpa h5/label di sebelahnya selalu dipakai.
+    """
+    header, _ = read_header(path)
+    model_dir = os.path.dirname(path)
+    recorded = header.get("sources")
+    for file_path in source_files(model_dir):
+        name = os.path.basename(file_path)
+        if recorded is None:
+            return f"bundle tidak mencatat asal, sedangkan {name} ada di sebelahnya"
+        entry = recorded.get(name)
+        if entry is None:
+            return f"{name} tidak tercatat di bundle"
+        if os.path.getmtime(file_path) != entry["mtime"] and file_sha256(file_path) != entry["sha256"]:
+            return f"{name} berubah setelah bundle diekspor"
+    return None
+
+
+def current_bundle(model_dir, log=print):
+    """Jalur bundle jika ada dan tidak basi; bundle basi dilaporkan lewat `log` lalu diabaikan."""
+    path = bundle_path(model_dir)
+    if not os.path.exists(path):
+        return None
+    reason = stale_reason(path)
+    if reason is not None:
+        log(f"⚠️ Bundle {path} diabaikan ({reason}); memuat voice_model.h5. "
+            f"Perbarui dengan 'python model_bundle.py export --model-dir {model_dir}'.")
+        return None
+    return path
+
+
+def export_dir(model_dir, sample_rate=44100, duration=2.0, n_mfcc=40):
+    """Mengonversi voice_model.h5 + label_encoder.npy yang sudah ada menjadi bundle."""
+    model = tf.keras.models.load_model(os.path.join(model_dir, 'voice_model.h5'))
+    labels = np.load(os.path.join(model_dir, 'label_encoder.npy'), allow_pickle=True)
+    path = bundle_path(model_dir)
+    sha = export_bundle(model, labels, path, feature_config(sample_rate, duration, n_mfcc, n_frames=model.input_shape[1]),
+                        sources=source_files(model_dir))
+    print(f"✅ Bundle ditulis: {path} ({os.path.getsize(path) / 1024:.0f} KB, sha256 {sha[:12]})")
+
+
+def benchmark(model_dir, repeats=5):
+    """Waktu muat h5 + npy (pickle) dibandingkan bundle, beserta kesetaraan outputnya."""
+    h5_path = os.path.join(model_dir, 'voice_model.h5')
+    le_path = os.path.join(model_dir, 'label_encoder.npy')
+    path = bundle_path(model_dir)
+    if not os.path.exists(path):
+        print(f"Bundle belum ada. Jalankan 'python model_bundle.py export --model-dir {model_dir}' terlebih dahulu.")
+        return
+
+    def load_h5():
+        return tf.keras.models.load_model(h5_path), np.load(le_path, allow_pickle=True)
+
+    def load_vcb():
+        model, labels, _ = load_bundle(path)
+        return model, labels
+
+    results = {}
+    for name, load in (("h5 + npy", load_h5), ("bundle", load_vcb)):
+        times = []
+        for _ in range(repeats):
+            tf.keras.backend.clear_session()
+            t0 = time.perf_counter()
+            model, labels = load()
+            times.append((time.perf_counter() - t0) * 1000)
+        x = np.zeros((1,) + tuple(d or 173 for d in model.input_shape[1:]), dtype=np.float32)
+        results[name] = (times, model(x, training=False).numpy(), [str(l) for l in labels])
+
+    (_, ref, ref_labels), (_, out, labels) = results["h5 + npy"], results["bundle"]
+    print("=" * 64)
+    print(f"{'Format':<12}{'Ukuran KB':>11}{'Pertama ms':>12}{'p50 ms':>10}{'Min ms':>10}")
+    for name, files in (("h5 + npy", (h5_path, le_path)), ("bundle", (path,))):
+        times = results[name][0]
+        size = sum(os.path.getsize(f) for f in files) / 1024
+        print(f"{name:<12}{size:>11.0f}{times[0]:>12.1f}{np.median(times):>10.1f}{min(times):>10.1f}")
+    speedup = np.median(results["h5 + npy"][0]) / np.median(results["bundle"][0])
+    print(f"Percepatan muat (p50): {speedup:.2f}x | Selisih output maks: {np.max(np.abs(ref - out)):.2e} | "
+          f"Label sama: {'ya' if ref_labels == labels else 'TIDAK'}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle model berversi: ekspor, verifikasi dan benchmark waktu muat.")
+    parser.add_argument('command', choices=['export', 'verify', 'bench'])
+    parser.add_argument('--model-dir', default='models', help="Direktori berisi voice_model.h5 / voice_model.bundle")
+    parser.add_argument('--repeats', type=int, default=5, help="Pengulangan muat untuk 'bench'")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_dir(args.model_dir)
+    elif args.command == 'verify':
+        _, labels, header = load_bundle(bundle_path(args.model_dir))
+        print(f"✅ Bundle v{header['version']} valid | sha256 {header['sha256'][:12]} | dibuat {header['created']}")
+        print(f"   {len(labels)} label | Fitur: {header['features']} | Input: {header['input_shape']}")
+        reason = stale_reason(bundle_path(args.model_dir))
+        print(f"⚠️ Bundle basi: {reason}" if reason else "   Sesuai dengan voice_model.h5 / label_encoder.npy di sebelahnya")
+    else:
+        benchmark(args.model_dir, args.repeats)
@@ -0,0 +1,94 @@
+import time
+import argparse
+import numpy as np
+from voice_core import MODELS_PATH, DURATION, SAMPLE_RATE
+from standby_bench import ReplayCore
+from profiles import ProfileCache, list_profiles, CACHE_SIZE
+from features import HOP_LENGTH
+
+# --- KONFIGURASI ---
+ROUNDS = 5                   # Putaran perpindahan melalui semua profil
+
+
+def probe_features(core):
+    """Fitur nol seukuran input model aktif untuk mengukur latensi klasifikasi."""
+    shape = core.model.input_shape
+    frames = shape[1] or int(DURATION * SAMPLE_RATE) // HOP_LENGTH + 1
+    return np.zeros((frames, shape[2]), dtype=np.float32)
+
+
+def switch_and_serve(core, name, features):
+    """
+    Berpindah ke profil `name` sambil terus mengklasifikasi dengan profil lama selama
+    muat dingin berjalan. Mengembalikan (hasil perpindahan, ms klasifikasi selama menunggu).
+    """
+    done = core.switch_profile(name)
+    served = []
+    while not done.done():
+        t0 = time.perf_counter()
+        core.classify(features)
+        served.append((time.perf_counter() - t0) * 1000)
+    return done.result(), served
+
+
+def benchmark(rounds=ROUNDS, capacity=CACHE_SIZE):
+    """Mengukur latensi perpindahan profil dari cache dibanding muat dingin."""
+    names = list_profiles(MODELS_PATH)
+    if len(names) < 2:
+        print("Hanya profil 'default' yang tersedia. Buat profil dengan 'python profiles.py create <nama>'.")
+        return
+
+    core = ReplayCore()
+    core.profiles = ProfileCache(core._load_profile, capacity=capacity, log=core.log)
+    if not core.load_resources():
+        while not core.log_queue.empty():
+            print(core.log_queue.get()[0])
+        return
+    features = probe_features(core)
+
+    # Latensi klasifikasi tanpa muat latar sebagai pembanding
+    idle = []
+    for _ in range(50):
+        t0 = time.perf_counter()
+        core.classify(features)
+        idle.append((time.perf_counter() - t0) * 1000)
+
+    serving = []
+    failed = 0
+    for _ in range(rounds):
+        for name in names[1:] + names[:1]:
+            ok, served = switch_and_serve(core, name, features)
+            failed += not ok
+            serving += served
+    stats = core.profiles.stats()
+    core.profiles.close()
+    core.shutdown()
+
+    print("=" * 64)
+    print(f"{len(names)} profil | {rounds} putaran | Kapasitas cache {capacity} | Gagal: {failed}")
+    print(f"{'Jenis':<10}{'Jumlah':>8}{'p50 ms':>10}{'p95 ms':>10}{'Maks ms':>10}")
+    for kind in ("cache", "dingin"):
+        ms = np.array([t for k, t in core.switch_times if k == kind])
+        if len(ms):
+            print(f"{kind:<10}{len(ms):>8}{np.percentile(ms, 50):>10.1f}{np.percentile(ms, 95):>10.1f}{ms.max():>10.1f}")
+        else:
+            print(f"{kind:<10}{0:>8}{'-':>10}{'-':>10}{'-':>10}")
+    print("-" * 64)
+    if serving:
+        print(f"Klasifikasi selama muat dingin: p50 {np.percentile(serving, 50):.1f} ms "
+              f"(tanpa muat: {np.percentile(idle, 50):.1f} ms, {len(serving)} prediksi)")
+    for name, ms in stats['load_ms'].items():
+        print(f"  Muat + pemanasan '{name}': {ms:.0f} ms")
+    print(f"Cache: {stats['used_mb']:.1f}/{stats['budget_mb']:.0f} MB | Hit: {stats['hits']} | "
+          f"Miss: {stats['misses']} | Dikeluarkan: {stats['evictions']}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latensi perpindahan profil pengguna: cache LRU vs muat dingin.")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help="Putaran perpindahan melalui semua profil")
+    parser.add_argument('--capacity', type=int, default=CACHE_SIZE,
+                        help="Kapasitas cache (lebih kecil dari jumlah profil memaksa muat dingin berulang)")
+    args = parser.parse_args()
+
+    benchmark(args.rounds, args.capacity)
@@ -0,0 +1,198 @@
+import os
+import shutil
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))      # Direktori aplikasi
+MODELS_PATH = os.path.join(BASE_DIR, 'models')             # Profil "default" = models/, lainnya models/<profil>/
+DEFAULT_PROFILE = "default"
+PROFILE_FILES = ('voice_model.h5', 'label_encoder.npy', 'command_map.json')  # Isi direktori profil (format h5 + npy)
+BUNDLE_FILES = ('voice_model.bundle', 'command_map.json')                    # Isi direktori profil (format bundle)
+CACHE_SIZE = 3               # Jumlah profil maksimum yang tetap dimuat
+MEMORY_BUDGET_MB = 512       # Batas perkiraan memori semua profil yang dimuat (MB)
+MEMORY_OVERHEAD = 3.0        # Pengali ukuran bobot untuk graf, buffer dan state TensorFlow
+
+
+def profile_dir(name, models_path=MODELS_PATH):
+    """Direktori artefak satu profil."""
+    return models_path if name == DEFAULT_PROFILE else os.path.join(models_path, name)
+
+
+def list_profiles(models_path=MODELS_PATH):
+    """Profil yang tersedia: "default" lalu setiap models/<profil>/ berisi model, label dan peta perintah."""
+    names = [DEFAULT_PROFILE]
+    if os.path.isdir(models_path):
+        for name in sorted(os.listdir(models_path)):
+            path = os.path.join(models_path, name)
+            if os.path.isdir(path) and any(all(os.path.exists(os.path.join(path, f)) for f in files)
+                                           for files in (BUNDLE_FILES, PROFILE_FILES)):
+                names.append(name)
+    return names
+
+
+def estimate_bytes(model):
+    """Perkiraan memori model yang dimuat dari ukuran bobotnya."""
+    return int(sum(w.nbytes for w in model.get_weights()) * MEMORY_OVERHEAD)
+
+
+class Profile:
+    """Sumber daya satu profil yang siap dipakai: model, label, peta perintah dan penjadwal inferensinya."""
+    def __init__(self, name, model, classes, command_map, policies, scheduler, nbytes,
+                 embedder=None, prototypes=None, load_ms=0.0):
+        self.name = name
+        self.model = model
+        self.classes = classes
+        self.command_map = command_map
+        self.policies = policies
+        self.scheduler = scheduler
+        self.nbytes = nbytes
+        self.embedder = embedder
+        self.prototypes = prototypes
+        self.load_ms = load_ms       # Waktu muat + pemanasan (ms)
+
+    def close(self):
+        """Menghentikan penjadwal inferensi profil (saat dikeluarkan dari cache)."""
+        self.scheduler.stop()
+
+
+class ProfileCache:
+    """
+    Cache LRU profil yang dimuat. Profil yang paling lama tidak dipakai dikeluarkan
+    jika jumlahnya melebihi CACHE_SIZE atau perkiraan memorinya melebihi MEMORY_BUDGET_MB;
+    profil aktif (pinned) tidak pernah dikeluarkan. Muat dingin dijalankan di thread latar.
+    """
+    def __init__(self, loader, capacity=CACHE_SIZE, budget_mb=MEMORY_BUDGET_MB, log=None):
+        self.loader = loader         # Fungsi nama profil -> Profile (sudah dipanaskan)
+        self.capacity = capacity
+        self.budget = budget_mb * 1024 * 1024
+        self.log = log or (lambda message, type="info": None)
+        self.pinned = None
+        self._cache = OrderedDict()
+        self._loading = {}           # Nama -> Future muat latar
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name):
+        """Profil dari cache (ditandai baru dipakai) atau None."""
+        with self._lock:
+            profile = self._cache.get(name)
+            if profile is not None:
+                self._cache.move_to_end(name)
+                self.hits += 1
+            return profile
+
+    def load(self, name):
+        """Profil dari cache, atau dimuat dan dipanaskan sekarang (memblokir)."""
+        profile = self.get(name)
+        if profile is not None:
+            return profile
+        with self._lock:
+            self.misses += 1
+        profile = self.loader(name)
+        self._insert(profile)
+        return profile
+
+    def load_async(self, name):
+        """Future berisi profil; muat dingin dijalankan di thread latar (satu muat per profil)."""
+        with self._lock:
+            if name in self._loading:
+                return self._loading[name]
+            if name in self._cache:
+                future = Future()
+                future.set_result(self._cache[name])
+                return future
+            future = self._pool.submit(self.load, name)
+            self._loading[name] = future
+        future.add_done_callback(lambda f: self._loading.pop(name, None))
+        return future
+
+    def pin(self, name):
+        """Menandai profil aktif agar tidak dikeluarkan."""
+        self.pinned = name
+
+    def _insert(self, profile):
+        with self._lock:
+            self._cache[profile.name] = profile
+            self._cache.move_to_end(profile.name)
+            evicted = []
+            for name in list(self._cache):
+                if len(self._cache) <= self.capacity and self.used_bytes() <= self.budget:
+                    break
+                if name in (self.pinned, profile.name):
+                    continue
+                evicted.append(self._cache.pop(name))
+            self.evictions += len(evicted)
+        for old in evicted:
+            old.close()
+            self.log(f"🗃️ Profil '{old.name}' dikeluarkan dari cache", "debug")
+
+    def used_bytes(self):
+        return sum(p.nbytes for p in self._cache.values())
+
+    def names(self):
+        """Profil di cache dari yang paling lama hingga paling baru dipakai."""
+        with self._lock:
+            return list(self._cache)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": list(self._cache),
+                "used_mb": self.used_bytes() / 1024 / 1024,
+                "budget_mb": self.budget / 1024 / 1024,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_ms": {name: p.load_ms for name, p in self._cache.items()},
+            }
+
+    def close(self):
+        """Menghentikan semua penjadwal profil yang dimuat."""
+        self._pool.shutdown(wait=False)
+        with self._lock:
+            profiles, self._cache = list(self._cache.values()), OrderedDict()
+        for profile in profiles:
+            profile.close()
+
+
+def create_profile(name, source=DEFAULT_PROFILE, models_path=MODELS_PATH):
+    """Membuat models/<name>/ dari salinan profil lain sebagai titik awal model per operator."""
+    target = profile_dir(name, models_path)
+    if name == DEFAULT_PROFILE or os.path.exists(target):
+        raise ValueError(f"Profil '{name}' sudah ada")
+    os.makedirs(target)
+    src = profile_dir(source, models_path)
+    for f in PROFILE_FILES + BUNDLE_FILES[:1] + ('command_policy.json',):
+        path = os.path.join(src, f)
+        if not os.path.exists(path) and source == DEFAULT_PROFILE:
+            path = os.path.join(BASE_DIR, f)    # Peta perintah profil default ada di direktori aplikasi
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(target, f))
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kelola profil model per pengguna (models/<profil>/).")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="Daftar profil yang tersedia")
+    create = sub.add_parser('create', help="Membuat profil baru dari salinan profil lain")
+    create.add_argument('name')
+    create.add_argument('--from', dest='source', default=DEFAULT_PROFILE, help="Profil sumber")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in list_profiles():
+            path = profile_dir(name)
+            labels = os.path.join(path, 'label_encoder.npy')
+            size = os.path.getsize(os.path.join(path, 'voice_model.h5')) / 1024 if os.path.exists(os.path.join(path, 'voice_model.h5')) else 0
+            trained = os.path.exists(labels) or os.path.exists(os.path.join(path, BUNDLE_FILES[0]))
+            print(f"{name:<16}{path}  ({size:.0f} KB){'' if trained else '  [belum dilatih]'}")
+    else:
+        print(f"✅ Profil dibuat: {create_profile(args.name, args.source)}")
+    print("   Latih model operator lalu simpan voice_model.bundle (atau voice_model.h5 + label_encoder.npy) ke direktori ini.")
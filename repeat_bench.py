@@ -0,0 +1,164 @@
+import time
+import argparse
+import numpy as np
+import librosa
+from voice_core import SAMPLE_RATE, POLL_INTERVAL, COOLDOWN_PERIOD
+from standby_bench import ReplayCore
+from trigger_bench import office_noise
+from model import list_files, load_audio
+from dataset_pack import open_pack
+
+# --- KONFIGURASI ---
+REPEATS = 12                 # Pengulangan perintah per urutan
+GAPS = (0.2, 0.4, 0.7, 1.0)  # Jeda antar ucapan yang diuji (detik)
+NOISE_RMS = 0.005            # Tingkat noise ruangan dalam replay
+SPEECH_PEAK = 0.5            # Amplitudo puncak ucapan yang disisipkan
+LEAD_IN = 3.0                # Noise sebelum urutan agar noise floor stabil (detik)
+TAIL = 3.0                   # Noise setelah urutan agar aksi terakhir sempat tertangani (detik)
+
+
+class VirtualFuture:
+    """Hasil analisis yang baru dianggap selesai setelah durasi nyatanya berlalu di jam virtual."""
+    def __init__(self, core, result, ready_at):
+        self.core = core
+        self._result = result
+        self.ready_at = ready_at
+
+    def done(self):
+        return self.core.clock >= self.ready_at
+
+    def result(self):
+        return self._result
+
+
+class VirtualPool:
+    """Pengganti thread pool analisis: analisis dijalankan seketika dengan model asli, waktunya dibebankan ke jam virtual."""
+    def __init__(self, core):
+        self.core = core
+
+    def submit(self, fn, *args):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        return VirtualFuture(self.core, result, self.core.clock + time.perf_counter() - t0)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class RepeatCore(ReplayCore):
+    """ReplayCore yang mencatat setiap aksi yang dieksekusi beserta waktunya."""
+    def __init__(self):
+        super().__init__()
+        self.low_power_standby = False
+        self.analysis_pool = VirtualPool(self)
+        self.clock = 0.0
+        self.executed = []
+
+    def handle_prediction(self, source, result, now):
+        outcome = super().handle_prediction(source, result, now)
+        if outcome == "action":
+            self.executed.append((now, result.label))
+        return outcome
+
+
+def load_utterances(label, limit=20):
+    """Klip satu label, dipotong ke bagian bersuara agar jeda antar ucapan dapat diatur."""
+    pack = open_pack()
+    clips = []
+    for path in list_files(label, max_files=limit):
+        audio, _ = librosa.effects.trim(load_audio(path, pack), top_db=30)
+        clips.append(audio / max(float(np.max(np.abs(audio))), 1e-9) * SPEECH_PEAK)
+    return clips
+
+
+def build_sequence(clips, repeats, gap, noise_rms, seed=42):
+    """Noise dengan `repeats` ucapan berurutan berjeda `gap` detik. Mengembalikan (stream, [(start, end), ...])."""
+    rng = np.random.default_rng(seed)
+    parts = [clips[i % len(clips)] for i in range(repeats)]
+    length = LEAD_IN + sum(len(p) for p in parts) / SAMPLE_RATE + gap * (repeats - 1) + TAIL
+    stream = office_noise(int(length * SAMPLE_RATE), noise_rms, rng)
+    events = []
+    t = LEAD_IN
+    for clip in parts:
+        start = int(t * SAMPLE_RATE)
+        stream[start:start + len(clip)] += clip
+        events.append((start / SAMPLE_RATE, (start + len(clip)) / SAMPLE_RATE))
+        t += len(clip) / SAMPLE_RATE + gap
+    return stream, events
+
+
+def replay(core, stream, label):
+    """Memutar stream pada sumber aktif dengan jam virtual. Mengembalikan aksi label yang dieksekusi."""
+    core.executed = []
+    source = core.add_source("replay")
+    source.is_awake = True
+    hop = int(POLL_INTERVAL * SAMPLE_RATE)
+    for i in range(0, len(stream) - hop, hop):
+        source.feed(stream[i:i + hop])
+        core.clock = (i + hop) / SAMPLE_RATE
+        core.poll_source(source, core.clock)
+    core.sources.remove(source)
+    return [t for t, l in core.executed if l == label]
+
+
+def summarize(times, events):
+    """Perintah/detik, recall, eksekusi berlebih dan latensi akhir-ucapan hingga aksi."""
+    duration = events[-1][1] - events[0][0]
+    ends = np.array([end for _, end in events])
+    latencies = []
+    for t in times:
+        before = ends[ends <= t]
+        if len(before):
+            latencies.append(t - before[-1])
+    return {
+        "spoken_per_sec": len(events) / duration,
+        "cmds_per_sec": min(len(times), len(events)) / duration,
+        "recall": min(len(times), len(events)) / len(events),
+        "extra": max(len(times) - len(events), 0),
+        "latency_ms": float(np.mean(latencies)) * 1000 if latencies else float("nan"),
+    }
+
+
+def benchmark(labels=("bawah",), repeats=REPEATS, gaps=GAPS, noise_rms=NOISE_RMS):
+    """Membandingkan cooldown global lama dengan command_policy.json pada urutan perintah berulang."""
+    core = RepeatCore()
+    if not core.load_resources():
+        while not core.log_queue.empty():
+            print(core.log_queue.get()[0])
+        return
+    policies = {
+        "cooldown global": {"_default": {"mode": "once", "debounce": COOLDOWN_PERIOD}},
+        "command_policy": core.policies,
+    }
+
+    print("=" * 84)
+    print(f"{repeats} ucapan berulang per urutan | Noise RMS {noise_rms}")
+    print(f"{'Label':<12}{'Jeda(s)':>8}{'Kebijakan':>17}{'Diucapkan/s':>13}{'Perintah/s':>12}{'Recall':>9}{'Lebih':>7}{'Latensi':>11}")
+    for label in labels:
+        clips = load_utterances(label)
+        if not clips:
+            print(f"{label:<12}tidak ada klip di dataset")
+            continue
+        for gap in gaps:
+            stream, events = build_sequence(clips, repeats, gap, noise_rms)
+            for name, policy in policies.items():
+                core.policies = policy
+                r = summarize(replay(core, stream, label), events)
+                print(f"{label:<12}{gap:>8.2f}{name:>17}{r['spoken_per_sec']:>13.2f}{r['cmds_per_sec']:>12.2f}"
+                      f"{r['recall'] * 100:>8.0f}%{r['extra']:>7}{r['latency_ms']:>8.0f} ms")
+    print("=" * 84)
+    for label in labels:
+        print(f"Kebijakan '{label}': {core.policy(label)}")
+    core.scheduler.stop()
+    core.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur perintah/detik pada urutan perintah berulang: cooldown global vs kebijakan per label.")
+    parser.add_argument('--labels', nargs='+', default=["bawah"], help="Label yang diulang")
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="Ucapan per urutan")
+    parser.add_argument('--gaps', type=float, nargs='+', default=list(GAPS), help="Jeda antar ucapan yang diuji (detik)")
+    parser.add_argument('--noise', type=float, default=NOISE_RMS, help="RMS noise ruangan")
+    args = parser.parse_args()
+
+    benchmark(args.labels, args.repeats, args.gaps, args.noise)
@@ -0,0 +1,194 @@
+import io
+import time
+import wave
+import queue
+import asyncio
+import argparse
+import numpy as np
+import librosa
+from aiohttp import web, WSMsgType
+from voice_core import VoiceAssistantCore, AudioSource, SAMPLE_RATE, ANALYSIS_WORKERS
+
+# --- KONFIGURASI ---
+HOST = '127.0.0.1'                    # Hanya melayani klien lokal
+PORT = 8765                           # Port server
+MAX_INFLIGHT = ANALYSIS_WORKERS * 4   # Batas permintaan yang diproses bersamaan (backpressure)
+MAX_SESSIONS = ANALYSIS_WORKERS * 2   # Batas sesi WebSocket aktif; koneksi berikutnya ditolak 503
+PCM_FORMATS = ('i16', 'f32')          # Format PCM mentah yang diterima
+
+
+class RecognitionCore(VoiceAssistantCore):
+    """
+    VoiceAssistantCore untuk mode server: model tetap hangat dan hasil pengenalan
+    dikirim ke klien, tanpa menjalankan aksi keyboard/aplikasi di mesin server.
+    """
+    def __init__(self):
+        super().__init__(queue.Queue(), queue.Queue(), lambda is_awake: None, devices=[])
+        # Tidak ada status wake di server: semua ucapan dianalisis penuh
+        self.low_power_standby = False
+
+    def handle_prediction(self, source, result, now):
+        """Meneruskan hasil ke sesi stream; audio yang sudah dikenali ditandai agar satu ucapan tidak dilaporkan dua kali."""
+        source.results.append(result)
+        if result.accepted:
+            source.mark_consumed()
+        return "reported"
+
+
+class StreamSource(AudioSource):
+    """AudioSource untuk klien stream; hasil pengenalan ditampung untuk dikirim balik."""
+    def __init__(self, name):
+        super().__init__(name, live=False)
+        self.results = []
+
+
+class StreamSession:
+    """Satu klien WebSocket: stream PCM diumpankan ke AudioSource dengan deteksi yang sama seperti main.py."""
+    def __init__(self, core, name):
+        self.core = core
+        self.source = StreamSource(name)
+
+    def stream_time(self):
+        """Waktu stream (detik) berdasarkan jumlah sampel yang diterima, bukan jam dinding."""
+        return self.source.buffer.total / SAMPLE_RATE
+
+    async def feed(self, samples):
+        """Menambahkan blok audio lalu menjalankan deteksi. Mengembalikan hasil baru (jika ada)."""
+        self.source.feed(samples)
+        self.core.poll_source(self.source, self.stream_time())
+        if self.source.pending is not None:
+            # Menunggu analisis sebelum membaca blok berikutnya (backpressure per koneksi)
+            await asyncio.wrap_future(self.source.pending)
+            self.core.poll_source(self.source, self.stream_time())
+        results, self.source.results = self.source.results, []
+        return results
+
+
+def decode_audio(body, content_type, fmt):
+    """Mendekode badan permintaan: WAV, atau PCM mentah int16/float32 mono pada SAMPLE_RATE."""
+    if content_type in ('audio/wav', 'audio/x-wav', 'audio/wave'):
+        with wave.open(io.BytesIO(body), 'rb') as wf:
+            if wf.getsampwidth() == 2 and wf.getnchannels() == 1 and wf.getframerate() == SAMPLE_RATE:
+                return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+        # Format lain: dekode dan resample lewat librosa
+        audio, _ = librosa.load(io.BytesIO(body), sr=SAMPLE_RATE)
+        return audio
+    return decode_pcm(body, fmt)
+
+
+def decode_pcm(data, fmt):
+    """PCM mentah little-endian ke float32. ValueError jika format atau panjang data tidak valid."""
+    if fmt not in PCM_FORMATS:
+        raise ValueError(f"format PCM tidak dikenal: {fmt} (pilih {', '.join(PCM_FORMATS)})")
+    if fmt == 'f32':
+        return np.frombuffer(data, dtype='<f4').astype(np.float32)
+    return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+
+class RecognitionServer:
+    """Server pengenalan lokal: HTTP untuk klip utuh, WebSocket untuk stream PCM."""
+    def __init__(self):
+        self.core = RecognitionCore()
+        self.inflight = 0
+        self.n_sessions = 0
+        self.active_sessions = 0
+        self.started = time.time()
+
+    async def recognize(self, request):
+        """POST /recognize: satu klip utuh (WAV atau PCM) -> label, confidence dan timing."""
+        if self.inflight >= MAX_INFLIGHT:
+            return web.json_response({"error": "server sibuk"}, status=503, headers={"Retry-After": "1"})
+
+        self.inflight += 1
+        try:
+            t0 = time.perf_counter()
+            body = await request.read()
+            try:
+                audio = decode_audio(body, request.content_type, request.query.get('format', 'i16'))
+            except Exception as e:
+                # Badan permintaan tidak dapat didekode: kesalahan klien
+                return web.json_response({"error": f"audio tidak valid: {e}"}, status=400)
+            if len(audio) == 0:
+                return web.json_response({"error": "audio kosong"}, status=400)
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.core.analysis_pool, self.core.analyze, audio)
+            response = result.to_dict()
+            response["timings"]["total_ms"] = (time.perf_counter() - t0) * 1000
+            return web.json_response(response)
+        except Exception as e:
+            # Kegagalan analisis atau model di sisi server
+            return web.json_response({"error": str(e)}, status=500)
+        finally:
+            self.inflight -= 1
+
+    async def stream(self, request):
+        """
+        GET /ws: stream PCM biner; server mengirim JSON untuk setiap ucapan yang terdeteksi.
+        Di atas MAX_SESSIONS, koneksi ditolak 503 sebelum upgrade; format yang tidak
+        dikenal ditolak 400.
+        """
+        if self.active_sessions >= MAX_SESSIONS:
+            return web.json_response({"error": "sesi stream penuh"}, status=503, headers={"Retry-After": "1"})
+        fmt = request.query.get('format', 'i16')
+        if fmt not in PCM_FORMATS:
+            return web.json_response({"error": f"format PCM tidak dikenal: {fmt}"}, status=400)
+
+        ws = web.WebSocketResponse(max_msg_size=SAMPLE_RATE * 8)
+        await ws.prepare(request)
+        self.n_sessions += 1
+        self.active_sessions += 1
+        session = StreamSession(self.core, f"ws{self.n_sessions}")
+
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.BINARY:
+                    try:
+                        samples = decode_pcm(msg.data, fmt)
+                    except ValueError as e:
+                        # Blok PCM tidak utuh: data tidak valid (1007)
+                        await ws.close(code=1007, message=str(e).encode())
+                        break
+                    for result in await session.feed(samples):
+                        payload = result.to_dict()
+                        payload["stream_time"] = session.stream_time()
+                        await ws.send_json(payload)
+                elif msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.active_sessions -= 1
+        return ws
+
+    async def health(self, request):
+        """GET /health: status server dan statistik batching."""
+        return web.json_response({
+            "status": "ok",
+            "uptime_s": time.time() - self.started,
+            "inflight": self.inflight,
+            "sessions": self.active_sessions,
+            "scheduler": self.core.scheduler.stats(),
+        })
+
+    def build_app(self):
+        """Memuat model (tetap hangat selama server berjalan) lalu menyusun aplikasi aiohttp."""
+        if not self.core.load_resources():
+            while not self.core.log_queue.empty():
+                print(self.core.log_queue.get()[0])
+            raise SystemExit(1)
+        app = web.Application(client_max_size=SAMPLE_RATE * 4 * 30)
+        app.add_routes([
+            web.post('/recognize', self.recognize),
+            web.get('/ws', self.stream),
+            web.get('/health', self.health),
+        ])
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server pengenalan suara lokal (HTTP + WebSocket).")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    server = RecognitionServer()
+    web.run_app(server.build_app(), host=args.host, port=args.port)
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import queue
+import ctypes
+import argparse
+import threading
+from collections import deque
+import numpy as np
+import tensorflow as tf
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # Direktori aplikasi
+SHADOW_LOG_PATH = os.path.join(BASE_DIR, 'logs', 'shadow.jsonl')  # Log perbandingan live vs kandidat
+QUEUE_SIZE = 32              # Fitur yang menunggu model kandidat (lebih dari ini dibuang)
+SUMMARY_EVERY = 50           # Ringkasan ke log setiap N perbandingan
+LATENCY_WINDOW = 1000        # Jumlah latensi terakhir untuk persentil di stats()
+
+
+class ShadowEvaluator:
+    """
+    Menjalankan model kandidat pada tensor fitur yang sama dengan model live di
+    thread berprioritas rendah, di luar jalur kritis. Hasil kandidat hanya dicatat
+    (kesepakatan, selisih confidence, latensi) dan tidak pernah dieksekusi.
+    """
+    def __init__(self, model_dir, log_path=SHADOW_LOG_PATH, log=None):
+        self.model_dir = model_dir
+        self.model = tf.keras.models.load_model(os.path.join(model_dir, 'voice_model.h5'))
+        self.labels = [str(c) for c in np.load(os.path.join(model_dir, 'label_encoder.npy'), allow_pickle=True)]
+        self.log_path = log_path
+        self.log = log or (lambda message, type="info": None)
+
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.n_compared = 0
+        self.n_agree = 0             # Label teratas sama
+        self.n_decision_agree = 0    # Keputusan akhir sama (aksi yang sama atau sama-sama ditolak)
+        self.n_dropped = 0           # Fitur dibuang karena kandidat tertinggal
+        self.n_errors = 0
+        self.delta_total = 0.0       # Jumlah selisih confidence (kandidat - live)
+        self.live_ms = deque(maxlen=LATENCY_WINDOW)
+        self.candidate_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        """Memulai thread kandidat."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Menghentikan thread kandidat setelah antrian habis."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, features, result):
+        """Menjadwalkan perbandingan untuk satu analisis live (tidak pernah memblokir)."""
+        try:
+            self._queue.put_nowait((time.time(), features, result))
+        except queue.Full:
+            self.n_dropped += 1
+
+    def _run(self):
+        """Thread kandidat: prioritas diturunkan (Windows) lalu fitur diproses satu per satu."""
+        try:
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), -2)   # THREAD_PRIORITY_LOWEST
+        except Exception:
+            pass
+
+        directory = os.path.dirname(self.log_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.log_path, 'a') as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                try:
+                    record = self.compare(*item)
+                except Exception as e:
+                    self.n_errors += 1
+                    if self.n_errors == 1:
+                        self.log(f"⚠️ Model kandidat gagal: {e}", "warning")
+                    continue
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                if self.n_compared % SUMMARY_EVERY == 0:
+                    s = self.stats()
+                    self.log(f"🧪 Kandidat: setuju {s['agreement'] * 100:.0f}% | keputusan {s['decision_agreement'] * 100:.0f}% | "
+                             f"Δconf {s['mean_delta']:+.3f} | {s['candidate_p50_ms']:.0f} ms vs live {s['live_p50_ms']:.0f} ms", "debug")
+
+    def compare(self, ts, features, result):
+        """Menjalankan kandidat pada fitur yang sama dan mencatat perbandingannya dengan hasil live."""
+        t0 = time.perf_counter()
+        scores = self.model(features[np.newaxis].astype(np.float32), training=False).numpy()[0]
+        candidate_ms = (time.perf_counter() - t0) * 1000
+        best = int(np.argmax(scores))
+        label, confidence = self.labels[best], float(scores[best])
+
+        live_action = result.label if result.accepted else None
+        candidate_action = label if label != "background" and confidence >= result.threshold else None
+        live_ms = result.timings.get("inference_ms", 0.0)
+        record = {
+            "ts": ts,
+            "live_label": result.label,
+            "live_confidence": result.confidence,
+            "live_action": live_action,
+            "live_ms": live_ms,
+            "candidate_label": label,
+            "candidate_confidence": confidence,
+            "candidate_action": candidate_action,
+            "candidate_ms": candidate_ms,
+            "agree": label == result.label,
+            "decision_agree": candidate_action == live_action,
+        }
+        with self._lock:
+            self.n_compared += 1
+            self.n_agree += record["agree"]
+            self.n_decision_agree += record["decision_agree"]
+            self.delta_total += confidence - result.confidence
+            self.live_ms.append(live_ms)
+            self.candidate_ms.append(candidate_ms)
+        return record
+
+    def stats(self):
+        """Ringkasan perbandingan sejauh ini."""
+        with self._lock:
+            n = self.n_compared
+            return {
+                "compared": n,
+                "dropped": self.n_dropped,
+                "errors": self.n_errors,
+                "agreement": self.n_agree / n if n else 0.0,
+                "decision_agreement": self.n_decision_agree / n if n else 0.0,
+                "mean_delta": self.delta_total / n if n else 0.0,
+                "live_p50_ms": float(np.percentile(self.live_ms, 50)) if self.live_ms else 0.0,
+                "candidate_p50_ms": float(np.percentile(self.candidate_ms, 50)) if self.candidate_ms else 0.0,
+            }
+
+
+def load_records(path=SHADOW_LOG_PATH, since_hours=None):
+    """Membaca log perbandingan (opsional hanya `since_hours` jam terakhir)."""
+    records = []
+    since = time.time() - since_hours * 3600 if since_hours else None
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if since is None or record["ts"] >= since:
+                records.append(record)
+    return records
+
+
+def report(records, top=10):
+    """Kesepakatan, selisih confidence, latensi dan pasangan label yang paling sering berbeda."""
+    n = len(records)
+    if not n:
+        print("Belum ada perbandingan.")
+        return
+    agree = np.mean([r["agree"] for r in records])
+    decision = np.mean([r["decision_agree"] for r in records])
+    delta = np.array([r["candidate_confidence"] - r["live_confidence"] for r in records])
+    live_ms = np.array([r["live_ms"] for r in records])
+    candidate_ms = np.array([r["candidate_ms"] for r in records])
+    actions = [r for r in records if r["live_action"] or r["candidate_action"]]
+
+    print("=" * 72)
+    print(f"Perbandingan: {n} | Label sama: {agree * 100:.1f}% | Keputusan sama: {decision * 100:.1f}%")
+    if actions:
+        print(f"Keputusan sama pada {len(actions)} analisis yang berujung aksi (live atau kandidat): "
+              f"{np.mean([r['decision_agree'] for r in actions]) * 100:.1f}%")
+    print(f"Δconfidence (kandidat - live): rata-rata {delta.mean():+.3f} | median {np.median(delta):+.3f} | "
+          f"|Δ| p95 {np.percentile(np.abs(delta), 95):.3f}")
+    print(f"{'Latensi (ms)':<14}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for name, values in (("live", live_ms), ("kandidat", candidate_ms)):
+        print(f"{name:<14}{np.percentile(values, 50):>8.1f}{np.percentile(values, 95):>8.1f}{np.percentile(values, 99):>8.1f}")
+
+    pairs = {}
+    for r in records:
+        if not r["decision_agree"]:
+            key = (r["live_action"] or "-", r["candidate_action"] or "-")
+            pairs[key] = pairs.get(key, 0) + 1
+    if pairs:
+        print(f"\n{'Aksi live':<20}{'Aksi kandidat':<20}{'Jumlah':>8}")
+        for (live, candidate), count in sorted(pairs.items(), key=lambda x: -x[1])[:top]:
+            print(f"{live:<20}{candidate:<20}{count:>8}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Laporan evaluasi model kandidat (shadow) terhadap model live.")
+    parser.add_argument('--log', default=SHADOW_LOG_PATH, help="Jalur log perbandingan")
+    parser.add_argument('--since', type=float, default=None, help="Hanya N jam terakhir")
+    parser.add_argument('--top', type=int, default=10, help="Jumlah pasangan keputusan berbeda yang ditampilkan")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        print(f"Log kandidat belum ada: {args.log}")
+        raise SystemExit(1)
+    report(load_records(args.log, args.since), args.top)
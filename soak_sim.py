@@ -0,0 +1,198 @@
+import time
+import bisect
+import argparse
+import numpy as np
+import librosa
+from voice_core import SAMPLE_RATE, LOW_POWER_STANDBY
+from standby_bench import ReplayCore
+from repeat_bench import VirtualPool
+from trigger_bench import office_noise
+from model import list_labels, list_files, load_audio
+from dataset_pack import open_pack
+
+# --- KONFIGURASI ---
+SOAK_HOURS = 1.0             # Panjang stream sintetis (jam audio)
+WAKE_LABEL = "hello_voicecmd"
+SLEEP_LABEL = "sleep_cmd"
+COMMANDS_PER_SESSION = (1, 5)    # Jumlah perintah antara wake dan sleep
+GAP = (1.5, 6.0)             # Jeda acak antar ucapan dalam sesi (detik)
+IDLE = (20.0, 180.0)         # Jeda acak antar sesi, hanya noise (detik)
+DISTRACTOR_RATE = 0.3        # Peluang perintah terucap saat standby (harus diabaikan)
+SPEECH_PEAK = (0.15, 0.8)    # Rentang amplitudo puncak ucapan
+NOISE_RMS = (0.003, 0.03)    # Rentang RMS noise latar (berubah tiap menit)
+MATCH_WINDOW = 2.5           # Hasil dihitung milik ucapan jika terjadi <= ini setelah ucapan selesai (detik)
+CLIPS_PER_LABEL = 30         # Klip maksimum per label yang dimuat
+
+
+class SoakCore(ReplayCore):
+    """ReplayCore dengan jam virtual yang mencatat setiap wake, sleep dan aksi beserta waktunya."""
+    def __init__(self):
+        super().__init__()
+        self.low_power_standby = LOW_POWER_STANDBY
+        self.analysis_pool = VirtualPool(self)
+        self.clock = 0.0
+        self.outcomes = []           # (waktu, hasil, label)
+
+    def handle_prediction(self, source, result, now):
+        outcome = super().handle_prediction(source, result, now)
+        if outcome in ("wake", "sleep", "action"):
+            self.outcomes.append((now, outcome, result.label))
+        return outcome
+
+
+def load_clips(limit=CLIPS_PER_LABEL):
+    """Klip per label dari dataset, dipotong ke bagian bersuara agar akhir ucapan tepat."""
+    pack = open_pack()
+    clips = {}
+    for label in sorted(list_labels()):
+        trimmed = []
+        for path in list_files(label, max_files=limit):
+            audio, _ = librosa.effects.trim(load_audio(path, pack), top_db=30)
+            if len(audio):
+                trimmed.append(audio / max(float(np.max(np.abs(audio))), 1e-9))
+        if trimmed:
+            clips[label] = trimmed
+    return clips
+
+
+def build_timeline(clips, hours, rng):
+    """
+    Skenario acak: jeda noise, kadang perintah saat standby (pengalih), lalu sesi
+    wake -> perintah -> sleep. Mengembalikan [(start, end, label, harapan, klip)] dengan
+    harapan "wake", "action", "sleep" atau "ignored"; waktu dalam sampel.
+    """
+    commands = [l for l in clips if l not in (WAKE_LABEL, SLEEP_LABEL)]
+    total = int(hours * 3600 * SAMPLE_RATE)
+    timeline = []
+    t = rng.uniform(*GAP)
+
+    def say(label, expected):
+        nonlocal t
+        clip = clips[label][rng.integers(len(clips[label]))] * rng.uniform(*SPEECH_PEAK)
+        start = int(t * SAMPLE_RATE)
+        timeline.append((start, start + len(clip), label, expected, clip))
+        t += len(clip) / SAMPLE_RATE + rng.uniform(*GAP)
+
+    while True:
+        t += rng.uniform(*IDLE)
+        if rng.random() < DISTRACTOR_RATE:
+            say(commands[rng.integers(len(commands))], "ignored")
+        say(WAKE_LABEL, "wake")
+        for _ in range(rng.integers(COMMANDS_PER_SESSION[0], COMMANDS_PER_SESSION[1] + 1)):
+            say(commands[rng.integers(len(commands))], "action")
+        say(SLEEP_LABEL, "sleep")
+        if t * SAMPLE_RATE >= total:
+            break
+    return [e for e in timeline if e[1] < total], total
+
+
+class SyntheticStream:
+    """Stream yang dirender per blok dari timeline; tidak pernah disimpan utuh di memori."""
+    def __init__(self, timeline, total, rng):
+        self.timeline = timeline
+        self.starts = [e[0] for e in timeline]
+        self.total = total
+        self.minute = int(60 * SAMPLE_RATE)
+        self.bed = office_noise(self.minute, 1.0, rng)
+        self.levels = rng.uniform(*NOISE_RMS, size=total // self.minute + 1).astype(np.float32)
+
+    def render(self, a, b):
+        """Sampel [a, b): noise dengan level per menit ditambah ucapan yang tumpang tindih."""
+        index = np.arange(a, b)
+        block = self.bed[index % self.minute] * self.levels[index // self.minute]
+        i = bisect.bisect_left(self.starts, b)
+        for start, end, _, _, clip in self.timeline[max(0, i - 3):i]:
+            lo, hi = max(start, a), min(end, b)
+            if lo < hi:
+                block[lo - a:hi - a] += clip[lo - start:hi - start]
+        return block
+
+
+def score(timeline, outcomes, hours):
+    """Recall per jenis ucapan, aktivasi palsu per jam dan latensi akhir ucapan hingga hasil."""
+    ends = [e[1] / SAMPLE_RATE for e in timeline]
+    matched = set()
+    false = {"wake": 0, "action": 0, "sleep": 0}
+    latencies = {"wake": [], "action": [], "sleep": []}
+    for t, outcome, label in outcomes:
+        # Ucapan terakhir yang selesai sebelum hasil ini, dalam MATCH_WINDOW
+        i = bisect.bisect_right(ends, t) - 1
+        if i >= 0 and t - ends[i] <= MATCH_WINDOW and i not in matched:
+            _, _, true_label, expected, _ = timeline[i]
+            if expected == outcome and true_label == label:
+                matched.add(i)
+                latencies[outcome].append(t - ends[i])
+                continue
+        false[outcome] += 1
+
+    report = {}
+    for kind in ("wake", "action", "sleep"):
+        expected = [i for i, e in enumerate(timeline) if e[3] == kind]
+        lat = np.array(latencies[kind]) * 1000
+        report[kind] = {
+            "spoken": len(expected),
+            "recall": sum(i in matched for i in expected) / max(len(expected), 1),
+            "false_per_hour": false[kind] / hours,
+            "latency_p50_ms": float(np.percentile(lat, 50)) if len(lat) else float("nan"),
+            "latency_p95_ms": float(np.percentile(lat, 95)) if len(lat) else float("nan"),
+        }
+    ignored = [i for i, e in enumerate(timeline) if e[3] == "ignored"]
+    report["ignored"] = {"spoken": len(ignored)}
+    return report
+
+
+def run(hours=SOAK_HOURS, seed=42):
+    """Membangun stream sintetis lalu memutarnya melalui poll_source lebih cepat dari waktu nyata."""
+    rng = np.random.default_rng(seed)
+    core = SoakCore()
+    if not core.load_resources():
+        while not core.log_queue.empty():
+            print(core.log_queue.get()[0])
+        return
+    clips = load_clips()
+    if WAKE_LABEL not in clips or SLEEP_LABEL not in clips:
+        print(f"Dataset harus berisi '{WAKE_LABEL}' dan '{SLEEP_LABEL}'.")
+        return
+    timeline, total = build_timeline(clips, hours, rng)
+    stream = SyntheticStream(timeline, total, rng)
+    source = core.add_source("soak")
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    pos = 0
+    while pos < total:
+        # Blok dan interval mengikuti profil daya seperti run_inference_loop
+        _, interval = core.profile()
+        hop = min(int(interval * SAMPLE_RATE), total - pos)
+        source.feed(stream.render(pos, pos + hop))
+        pos += hop
+        core.clock = pos / SAMPLE_RATE
+        core.poll_source(source, core.clock)
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    core.scheduler.stop()
+    core.shutdown()
+
+    audio_hours = total / SAMPLE_RATE / 3600
+    report = score(timeline, core.outcomes, audio_hours)
+
+    print("=" * 78)
+    print(f"Stream sintetis {audio_hours:.2f} jam | {len(timeline)} ucapan ({report['ignored']['spoken']} pengalih saat standby) | "
+          f"Seed {seed}")
+    print(f"{'Jenis':<10}{'Diucapkan':>11}{'Recall':>9}{'Palsu/jam':>11}{'Latensi p50':>13}{'p95':>9}")
+    for kind in ("wake", "action", "sleep"):
+        r = report[kind]
+        print(f"{kind:<10}{r['spoken']:>11}{r['recall'] * 100:>8.1f}%{r['false_per_hour']:>11.2f}"
+              f"{r['latency_p50_ms']:>10.0f} ms{r['latency_p95_ms']:>6.0f} ms")
+    print(f"Inferensi: {core.n_inferences} | Ditolak gate: {core.n_gated} | Terbuang: {core.n_discarded}")
+    print(f"CPU: {cpu / audio_hours:.0f} dtk per jam audio | {total / SAMPLE_RATE / wall:.1f}x waktu nyata")
+    print("=" * 78)
+    print("Latensi = akhir ucapan hingga hasil ditangani (jam virtual; waktu analisis nyata ikut dihitung).")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulasi soak: stream sintetis dari dataset diputar melalui loop deteksi lengkap.")
+    parser.add_argument('--hours', type=float, default=SOAK_HOURS, help="Panjang stream (jam audio)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed skenario acak")
+    args = parser.parse_args()
+
+    run(args.hours, args.seed)
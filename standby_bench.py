@@ -0,0 +1,103 @@
+import time
+import queue
+import argparse
+import threading
+import numpy as np
+from voice_core import VoiceAssistantCore, SAMPLE_RATE
+from trigger_bench import office_noise
+
+# --- KONFIGURASI ---
+REPLAY_MINUTES = 10.0        # Durasi replay idle per profil (menit, waktu nyata)
+NOISE_RMS = 0.01             # Tingkat noise ruangan dalam replay
+
+
+class ReplayCore(VoiceAssistantCore):
+    """Core untuk replay: model dan deteksi asli, tanpa aksi keyboard maupun suara feedback."""
+    def __init__(self):
+        super().__init__(queue.Queue(), queue.Queue(), lambda is_awake: None, devices=[])
+        self.record_events = False     # Replay tidak dicatat ke logs/events.db
+
+    def execute_action(self, label):
+        pass
+
+    def play_feedback(self, filename):
+        pass
+
+
+def run_profile(core, noise, awake, minutes):
+    """
+    Memutar noise idle secara waktu nyata: thread pengumpan meniru callback audio
+    dengan blocksize profil, loop utama meniru run_inference_loop. Mengembalikan CPU %.
+    """
+    source = core.sources[0]
+    source.is_awake = awake
+    blocksize, interval = core.profile()
+    stop = threading.Event()
+
+    def feeder():
+        pos = 0
+        next_block = time.perf_counter()
+        while not stop.is_set():
+            block = noise[pos:pos + blocksize]
+            if len(block) < blocksize:
+                pos = 0
+                continue
+            source.feed(block)
+            pos += blocksize
+            next_block += blocksize / SAMPLE_RATE
+            time.sleep(max(0.0, next_block - time.perf_counter()))
+
+    inferences = core.n_inferences
+    gated = core.n_gated
+    thread = threading.Thread(target=feeder, daemon=True)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    thread.start()
+    end = wall0 + minutes * 60
+    while time.perf_counter() < end:
+        core.step()
+        time.sleep(interval)
+    stop.set()
+    thread.join()
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    return {
+        "profile": "aktif" if awake else "standby",
+        "blocksize": blocksize,
+        "interval_ms": interval * 1000,
+        "cpu_percent": cpu / wall * 100,
+        "inferences": core.n_inferences - inferences,
+        "gated": core.n_gated - gated,
+    }
+
+
+def benchmark(minutes=REPLAY_MINUTES, noise_rms=NOISE_RMS):
+    """Membandingkan CPU % profil standby hemat daya dan profil aktif pada replay idle yang sama."""
+    core = ReplayCore()
+    if not core.load_resources():
+        while not core.log_queue.empty():
+            print(core.log_queue.get()[0])
+        return
+    core.add_source("replay")
+    noise = office_noise(int(60 * SAMPLE_RATE), noise_rms, np.random.default_rng(42))
+
+    rows = [run_profile(core, noise, awake, minutes) for awake in (False, True)]
+    core.scheduler.stop()
+
+    print("=" * 72)
+    print(f"Replay idle {minutes:.1f} menit per profil | Noise RMS {noise_rms}")
+    print(f"{'Profil':<10}{'Blok':>8}{'Polling(ms)':>13}{'CPU %':>9}{'Inferensi':>11}{'Ditolak gate':>14}")
+    for r in rows:
+        print(f"{r['profile']:<10}{r['blocksize']:>8}{r['interval_ms']:>13.0f}{r['cpu_percent']:>9.2f}"
+              f"{r['inferences']:>11}{r['gated']:>14}")
+    if rows[1]["cpu_percent"] > 0:
+        print(f"Standby memakai {rows[0]['cpu_percent'] / rows[1]['cpu_percent'] * 100:.0f}% CPU profil aktif")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur CPU % standby hemat daya vs aktif pada replay idle.")
+    parser.add_argument('--minutes', type=float, default=REPLAY_MINUTES, help="Durasi replay per profil (menit)")
+    parser.add_argument('--noise', type=float, default=NOISE_RMS, help="RMS noise ruangan")
+    args = parser.parse_args()
+
+    benchmark(args.minutes, args.noise)
@@ -0,0 +1,129 @@
+import os
+import time
+import argparse
+import numpy as np
+import librosa
+import tensorflow as tf
+from voice_core import MODELS_PATH, SAMPLE_RATE, N_MFCC, CONFIDENCE_THRESHOLD
+from trigger_bench import DATASET_PATH, build_stream
+from features import mfcc_features, HOP_LENGTH
+from arch_bench import count_flops
+from streaming_model import StreamingCNN, streaming_paths
+
+# --- KONFIGURASI ---
+STREAM_MINUTES = 3.0         # Panjang stream replay (menit)
+UPDATE_FRAMES = 4            # Frame baru per update (~46 ms, setara POLL_INTERVAL)
+MAX_WAIT = 2.0               # Deteksi dihitung jika terjadi <= ini setelah ucapan selesai (detik)
+NOISE_RMS = 0.01             # Tingkat noise latar stream
+SPEECH_PEAK = 0.5            # Amplitudo puncak perintah
+
+
+def load_labeled_commands(seed=42):
+    """Klip perintah dataset beserta labelnya, diacak dengan urutan yang sama."""
+    clips = []
+    for label in sorted(os.listdir(DATASET_PATH)):
+        class_path = os.path.join(DATASET_PATH, label)
+        if os.path.isdir(class_path) and not label.startswith('_'):
+            for f in sorted(os.listdir(class_path)):
+                if f.endswith('.wav'):
+                    clips.append((label, librosa.load(os.path.join(class_path, f), sr=SAMPLE_RATE)[0]))
+    order = np.random.default_rng(seed).permutation(len(clips))
+    return [clips[i][1] for i in order], [clips[i][0] for i in order]
+
+
+def replay(name, predict, features, window, classes):
+    """
+    Memanggil `predict(f)` setiap UPDATE_FRAMES frame (f = indeks frame akhir).
+    Mengembalikan (waktu update dalam detik, label teratas, confidence, ms per update).
+    """
+    times, labels, confidences, cost = [], [], [], []
+    for f in range(window, len(features) + 1, UPDATE_FRAMES):
+        t0 = time.perf_counter()
+        probs = predict(f)
+        cost.append((time.perf_counter() - t0) * 1000)
+        best = int(np.argmax(probs))
+        times.append(f * HOP_LENGTH / SAMPLE_RATE)
+        labels.append(classes[best])
+        confidences.append(float(probs[best]))
+    print(f"  {name}: {len(times)} update")
+    return np.array(times), np.array(labels), np.array(confidences), np.array(cost)
+
+
+def detections(times, labels, confidences, events, event_labels):
+    """Recall, latensi akhir-ucapan hingga deteksi pertama, dan deteksi palsu (tepi naik di luar ucapan)."""
+    accepted = (labels != "background") & (confidences >= CONFIDENCE_THRESHOLD)
+    latencies, found = [], 0
+    inside = np.zeros(len(times), dtype=bool)
+    for (start, end), label in zip(events, event_labels):
+        window = (times >= start) & (times <= end + MAX_WAIT)
+        inside |= window
+        hits = np.nonzero(window & accepted & (labels == label))[0]
+        if len(hits):
+            found += 1
+            latencies.append(times[hits[0]] - end)
+    outside = accepted & ~inside
+    false = int(np.count_nonzero(outside[1:] & ~outside[:-1]) + (outside[0] if len(outside) else 0))
+    lat = np.array(latencies) * 1000
+    return {
+        "recall": found / max(len(events), 1),
+        "latency_p50_ms": float(np.percentile(lat, 50)) if len(lat) else float("nan"),
+        "latency_p95_ms": float(np.percentile(lat, 95)) if len(lat) else float("nan"),
+        "false": false,
+    }
+
+
+def benchmark(minutes=STREAM_MINUTES):
+    """Membandingkan inferensi streaming dengan inferensi jendela penuh pada stream replay yang sama."""
+    fixed = tf.keras.models.load_model(os.path.join(MODELS_PATH, 'voice_model.h5'))
+    classes = np.array([str(c) for c in np.load(os.path.join(MODELS_PATH, 'label_encoder.npy'), allow_pickle=True)])
+    model_path, weights_path = streaming_paths(MODELS_PATH)
+    if not os.path.exists(weights_path):
+        print("Model streaming belum ada. Jalankan 'python model.py --streaming' terlebih dahulu.")
+        return
+    streaming_keras = tf.keras.models.load_model(model_path)
+    cnn = StreamingCNN(weights_path)
+    window = cnn.window
+
+    commands, labels = load_labeled_commands()
+    stream, events = build_stream(commands, minutes, NOISE_RMS, SPEECH_PEAK)
+    event_labels = [labels[i % len(labels)] for i in range(len(events))]
+    # Fitur dihitung sekali untuk seluruh stream; semua metode menerima frame yang sama
+    features = mfcc_features(stream, SAMPLE_RATE, N_MFCC).astype(np.float32)
+    print(f"Stream {minutes:.1f} menit | {len(events)} perintah | {len(features)} frame | update tiap {UPDATE_FRAMES} frame")
+
+    def full(model):
+        return lambda f: model(features[f - window:f][np.newaxis], training=False).numpy()[0]
+
+    cnn.reset()
+    cnn.update(features[:window - UPDATE_FRAMES])   # Mengisi state hingga update pertama
+    methods = {
+        "CNN 2D jendela penuh": (full(fixed), count_flops(fixed)),
+        "Kausal jendela penuh": (full(streaming_keras), cnn.flops_per_frame() * window + cnn.flops_classifier()),
+        "Kausal streaming": (lambda f: cnn.update(features[f - UPDATE_FRAMES:f]),
+                             cnn.flops_per_frame() * UPDATE_FRAMES + cnn.flops_classifier()),
+    }
+
+    rows = []
+    for name, (predict, flops) in methods.items():
+        times, top, conf, cost = replay(name, predict, features, window, classes)
+        result = detections(times, top, conf, events, event_labels)
+        result.update(name=name, mflops=flops / 1e6, ms_p50=float(np.median(cost)), ms_p95=float(np.percentile(cost, 95)))
+        rows.append(result)
+
+    hours = minutes / 60
+    print("=" * 96)
+    print(f"{'Metode':<22}{'MFLOPs/update':>14}{'ms p50':>9}{'ms p95':>9}{'Recall':>9}{'Latensi p50':>13}{'p95':>9}{'Palsu/jam':>11}")
+    for r in rows:
+        print(f"{r['name']:<22}{r['mflops']:>14.2f}{r['ms_p50']:>9.2f}{r['ms_p95']:>9.2f}{r['recall'] * 100:>8.1f}%"
+              f"{r['latency_p50_ms']:>10.0f} ms{r['latency_p95_ms']:>6.0f} ms{r['false'] / hours:>11.1f}")
+    print("=" * 96)
+    print("Latensi = akhir ucapan hingga update pertama dengan label benar dan confidence >= ambang (waktu stream).")
+    print("Fitur tanpa enhance per jendela; ketiga metode menerima frame MFCC yang identik.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan inferensi CNN streaming kausal dengan inferensi jendela penuh.")
+    parser.add_argument('--minutes', type=float, default=STREAM_MINUTES, help="Panjang stream replay (menit)")
+    args = parser.parse_args()
+
+    benchmark(args.minutes)
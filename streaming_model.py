@@ -0,0 +1,145 @@
+import os
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, models, regularizers
+
+# --- KONFIGURASI ---
+STREAMING_MODEL_NAME = 'streaming_model.h5'        # Model Keras (pelatihan, inferensi jendela penuh)
+STREAMING_WEIGHTS_NAME = 'streaming_weights.npz'   # Bobot untuk inferensi streaming NumPy
+WINDOW_FRAMES = 173          # Frame MFCC per jendela 2 detik (44100 Hz, hop 512)
+KERNEL = 5                   # Lebar kernel konvolusi waktu
+FILTERS = (64, 64, 96, 96)   # Filter per blok konvolusi
+DILATIONS = (1, 2, 4, 8)     # Dilasi per blok (receptive field 61 frame, ~0,7 detik)
+
+
+def build_streaming_model(n_features, num_classes, filters=FILTERS, dilations=DILATIONS, kernel=KERNEL):
+    """
+    CNN 1-D kausal sepanjang waktu (koefisien MFCC/delta sebagai channel) dengan
+    dilasi, tanpa pooling waktu, diakhiri rata-rata global dan classifier Dense.
+    Setiap frame output hanya bergantung pada frame masa lalu, sehingga saat
+    streaming hanya kolom output baru yang perlu dihitung.
+    """
+    stack = [layers.Input(shape=(None, n_features))]
+    for n_filters, dilation in zip(filters, dilations):
+        stack += [
+            layers.Conv1D(n_filters, kernel, padding='causal', dilation_rate=dilation),
+            layers.Activation('relu'),
+            layers.BatchNormalization(),
+            layers.Dropout(0.2),
+        ]
+    stack += [
+        layers.GlobalAveragePooling1D(),
+        layers.Dense(64, activation='relu', kernel_regularizer=regularizers.l2(0.001)),
+        layers.Dropout(0.5),
+        layers.Dense(num_classes, activation='softmax', dtype='float32'),
+    ]
+    model = models.Sequential(stack)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def export_streaming(model, path, window=WINDOW_FRAMES):
+    """
+    Menyimpan bobot model streaming untuk StreamingCNN: kernel konvolusi beserta
+    dilasinya, BatchNorm sebagai skala/geser setelah ReLU, dan dua layer Dense.
+    """
+    arrays = {"window": np.array(window)}
+    convs = [l for l in model.layers if isinstance(l, layers.Conv1D)]
+    norms = [l for l in model.layers if isinstance(l, layers.BatchNormalization)]
+    dense = [l for l in model.layers if isinstance(l, layers.Dense)]
+    for i, (conv, bn) in enumerate(zip(convs, norms)):
+        kernel, bias = conv.get_weights()
+        gamma, beta, mean, var = bn.get_weights()
+        scale = gamma / np.sqrt(var + bn.epsilon)
+        arrays[f"conv{i}_kernel"] = kernel.astype(np.float32)          # (k, cin, cout)
+        arrays[f"conv{i}_bias"] = bias.astype(np.float32)
+        arrays[f"conv{i}_dilation"] = np.array(conv.dilation_rate[0])
+        arrays[f"conv{i}_scale"] = scale.astype(np.float32)
+        arrays[f"conv{i}_shift"] = (beta - mean * scale).astype(np.float32)
+    for i, layer in enumerate(dense):
+        kernel, bias = layer.get_weights()
+        arrays[f"dense{i}_kernel"] = kernel.astype(np.float32)
+        arrays[f"dense{i}_bias"] = bias.astype(np.float32)
+    np.savez(path, **arrays)
+
+
+class StreamingCNN:
+    """
+    Inferensi streaming model kausal. Setiap konvolusi menyimpan (k-1)*dilasi frame
+    input terakhir sebagai state, sehingga update dengan n frame baru hanya menghitung
+    n kolom output per layer. Output layer terakhir masuk ke buffer cincin WINDOW_FRAMES
+    frame dengan jumlah berjalan; rata-ratanya setara GlobalAveragePooling1D atas
+    jendela terakhir (dengan riwayat nyata, bukan padding nol, di awal jendela).
+    """
+    def __init__(self, path):
+        data = np.load(path)
+        self.window = int(data["window"])
+        self.convs = []
+        i = 0
+        while f"conv{i}_kernel" in data:
+            self.convs.append((data[f"conv{i}_kernel"], data[f"conv{i}_bias"], int(data[f"conv{i}_dilation"]),
+                               data[f"conv{i}_scale"], data[f"conv{i}_shift"]))
+            i += 1
+        self.dense = [(data["dense0_kernel"], data["dense0_bias"]), (data["dense1_kernel"], data["dense1_bias"])]
+        self.reset()
+
+    def reset(self):
+        """Mengosongkan state konvolusi dan buffer pooling (awal stream)."""
+        self.states = [np.zeros(((k.shape[0] - 1) * d, k.shape[1]), dtype=np.float32) for k, _, d, _, _ in self.convs]
+        width = self.convs[-1][0].shape[2]
+        self.pool = np.zeros((self.window, width), dtype=np.float32)
+        self.pool_sum = np.zeros(width, dtype=np.float64)
+        self.pool_pos = 0
+
+    def flops_per_frame(self):
+        """FLOPs konvolusi per frame baru (2 x multiply-accumulate)."""
+        return sum(2 * k.shape[0] * k.shape[1] * k.shape[2] for k, _, _, _, _ in self.convs)
+
+    def flops_classifier(self):
+        """FLOPs classifier Dense per prediksi."""
+        return sum(2 * w.shape[0] * w.shape[1] for w, _ in self.dense)
+
+    def update(self, frames):
+        """Memasukkan frame fitur baru (n, fitur) lalu mengembalikan probabilitas kelas jendela terakhir."""
+        x = frames.astype(np.float32)
+        n = len(x)
+        for i, (kernel, bias, dilation, scale, shift) in enumerate(self.convs):
+            buf = np.concatenate([self.states[i], x])
+            out = np.full((n, kernel.shape[2]), bias, dtype=np.float32)
+            for j in range(kernel.shape[0]):
+                out += buf[j * dilation:j * dilation + n] @ kernel[j]
+            np.maximum(out, 0, out=out)
+            out = out * scale + shift
+            if len(self.states[i]):
+                self.states[i] = buf[-len(self.states[i]):]
+            x = out
+        self._push(x)
+        return self.classify()
+
+    def _push(self, columns):
+        """Menambahkan kolom output ke buffer cincin pooling dan memperbarui jumlah berjalan."""
+        columns = columns[-self.window:]
+        for column in columns:
+            self.pool_sum += column - self.pool[self.pool_pos]
+            self.pool[self.pool_pos] = column
+            self.pool_pos = (self.pool_pos + 1) % self.window
+            if self.pool_pos == 0:
+                # Hitung ulang sekali per putaran agar galat pembulatan tidak menumpuk
+                self.pool_sum = self.pool.sum(axis=0, dtype=np.float64)
+
+    def classify(self):
+        """Classifier Dense atas rata-rata output jendela terakhir."""
+        (w1, b1), (w2, b2) = self.dense
+        hidden = np.maximum((self.pool_sum / self.window).astype(np.float32) @ w1 + b1, 0)
+        logits = hidden @ w2 + b2
+        e = np.exp(logits - logits.max())
+        return e / e.sum()
+
+
+def streaming_paths(models_path):
+    """Jalur model Keras dan bobot streaming di samping model utama."""
+    return os.path.join(models_path, STREAMING_MODEL_NAME), os.path.join(models_path, STREAMING_WEIGHTS_NAME)
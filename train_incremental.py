@@ -0,0 +1,177 @@
+import os
+import time
+import shutil
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers, models
+from sklearn.preprocessing import LabelEncoder
+from model import (
+    MODELS_PATH, EPOCHS, SAMPLE_RATE, DURATION, N_MFCC, load_data, list_labels, list_files, prepare_clip,
+    load_audio, extract_mfcc, build_compact_model, fit_model
+)
+from dataset_pack import open_pack
+from model_bundle import export_bundle, feature_config, bundle_path, source_files
+
+# --- KONFIGURASI ---
+REPLAY_PER_CLASS = 8        # Jumlah rekaman asli per kelas lama yang diputar ulang
+EVAL_PER_CLASS = 4          # Rekaman asli per kelas lama yang disisihkan untuk evaluasi
+FINETUNE_EPOCHS = 15        # Iterasi fine-tuning
+FINETUNE_LR = 0.0005        # Learning rate fine-tuning
+
+
+def expand_head(old_model, num_new, freeze_trunk=True):
+    """
+    Memakai ulang trunk konvolusi model lama dan memperbesar layer softmax.
+    Bobot kelas lama disalin sehingga indeksnya tetap sama; kelas baru ditambahkan di akhir.
+    """
+    old_head = old_model.layers[-1]
+    num_old = old_head.units
+
+    # Layer sebelum Flatten adalah trunk konvolusi
+    if freeze_trunk:
+        for layer in old_model.layers:
+            if isinstance(layer, layers.Flatten):
+                break
+            layer.trainable = False
+
+    new_head = layers.Dense(num_old + num_new, activation='softmax', name='output_expanded')
+    model = models.Sequential(old_model.layers[:-1] + [new_head])
+    model.build(old_model.input_shape)
+
+    # Salin bobot kelas lama, kelas baru memakai inisialisasi acak
+    old_w, old_b = old_head.get_weights()
+    new_w, new_b = new_head.get_weights()
+    new_w[:, :num_old] = old_w
+    new_b[:num_old] = old_b
+    new_head.set_weights([new_w, new_b])
+
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=FINETUNE_LR),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def build_eval_set(labels, per_class):
+    """Menyisihkan rekaman asli (tanpa augmentasi) per kelas untuk evaluasi."""
+    pack = open_pack()
+    X, y, files = [], [], []
+    for label in labels:
+        for file_path in list_files(label, per_class, seed=7):
+            X.append(extract_mfcc(prepare_clip(load_audio(file_path, pack))))
+            y.append(label)
+            files.append(file_path)
+    return np.array(X), np.array(y), set(files)
+
+
+def accuracy_on(model, classes, X, y):
+    """Akurasi model pada (X, y) berlabel string sesuai urutan `classes`."""
+    if len(X) == 0:
+        return float('nan')
+    preds = np.argmax(model.predict(X, verbose=0), axis=1)
+    return float(np.mean(np.asarray(classes)[preds] == y))
+
+
+def incremental_train(new_labels=None, replay_per_class=REPLAY_PER_CLASS, epochs=FINETUNE_EPOCHS,
+                      freeze_trunk=True, compare_full=False):
+    """Menambahkan kelas baru ke model yang sudah ada tanpa pelatihan ulang penuh."""
+    model_path = os.path.join(MODELS_PATH, 'voice_model.h5')
+    le_path = os.path.join(MODELS_PATH, 'label_encoder.npy')
+    if not os.path.exists(model_path) or not os.path.exists(le_path):
+        print("Error: Model belum ada. Jalankan model.py terlebih dahulu.")
+        return
+
+    old_classes = [str(c) for c in np.load(le_path, allow_pickle=True)]
+    dataset_labels = list_labels()
+    if new_labels is None:
+        new_labels = [l for l in dataset_labels if l not in old_classes]
+    else:
+        duplicate = [l for l in new_labels if l in old_classes]
+        if duplicate:
+            print(f"Error: Label sudah ada di model: {duplicate}")
+            return
+    if not new_labels:
+        print("Tidak ada label baru untuk ditambahkan.")
+        return
+
+    old_dataset_labels = [l for l in old_classes if l in dataset_labels]
+    print(f"🆕 Label baru: {new_labels}")
+    print(f"🔁 Replay {replay_per_class} rekaman dari {len(old_dataset_labels)} kelas lama")
+
+    # Set evaluasi kelas lama, tidak ikut dilatih oleh kedua metode
+    X_eval, y_eval, eval_files = build_eval_set(old_dataset_labels, EVAL_PER_CLASS)
+    old_model = tf.keras.models.load_model(model_path)
+    acc_old_before = accuracy_on(old_model, old_classes, X_eval, y_eval)
+
+    # --- 1. Pelatihan Inkremental ---
+    t0 = time.perf_counter()
+    X_new, y_new = load_data(labels=new_labels, include_background=False)
+    X_old, y_old = load_data(labels=old_dataset_labels, max_per_label=replay_per_class,
+                             exclude=eval_files, include_background='background' in old_classes)
+    X = np.concatenate([X_new, X_old])
+    y = np.concatenate([y_new, y_old])
+
+    classes = old_classes + list(new_labels)
+    class_index = {c: i for i, c in enumerate(classes)}
+    y_encoded = np.array([class_index[label] for label in y])
+
+    model = expand_head(old_model, len(new_labels), freeze_trunk)
+
+    # Validasi pada sebagian kecil data campuran
+    rng = np.random.default_rng(42)
+    order = rng.permutation(len(X))
+    n_val = max(1, len(X) // 10)
+    val_idx, train_idx = order[:n_val], order[n_val:]
+    fit_model(model, X[train_idx], y_encoded[train_idx], X[val_idx], y_encoded[val_idx], epochs=epochs, patience=4)
+    t_incremental = time.perf_counter() - t0
+
+    acc_old = accuracy_on(model, classes, X_eval, y_eval)
+
+    # --- 2. Penyimpanan (model lama dicadangkan) ---
+    shutil.copy(model_path, os.path.join(MODELS_PATH, 'voice_model.prev.h5'))
+    shutil.copy(le_path, os.path.join(MODELS_PATH, 'label_encoder.prev.npy'))
+    model.save(model_path)
+    model.save(os.path.join(MODELS_PATH, 'voice_model.keras'))
+    # Urutan label mengikuti indeks output (kelas baru di akhir), bukan urutan alfabet
+    np.save(le_path, np.array(classes))
+    # Bundle diekspor ulang; bundle lama akan ditolak pemuat karena h5 sudah berubah
+    sha = export_bundle(model, classes, bundle_path(MODELS_PATH),
+                        feature_config(SAMPLE_RATE, DURATION, N_MFCC, n_frames=model.input_shape[1]),
+                        sources=source_files(MODELS_PATH))
+    print(f"\n✅ Model diperbarui: {len(old_classes)} -> {len(classes)} kelas (bundle sha256 {sha[:12]})")
+
+    # --- 3. Pembanding: Pelatihan Ulang Penuh ---
+    t_full, acc_old_full = None, None
+    if compare_full:
+        print("\nMenjalankan pelatihan ulang penuh sebagai pembanding...")
+        t0 = time.perf_counter()
+        X_all, y_all = load_data(exclude=eval_files)
+        le = LabelEncoder()
+        y_all_encoded = le.fit_transform(y_all)
+        val = np.arange(len(X_all)) % 5 == 0
+        full_model = build_compact_model((X_all.shape[1], X_all.shape[2]), len(le.classes_))
+        fit_model(full_model, X_all[~val], y_all_encoded[~val], X_all[val], y_all_encoded[val], epochs=EPOCHS)
+        t_full = time.perf_counter() - t0
+        acc_old_full = accuracy_on(full_model, le.classes_, X_eval, y_eval)
+
+    print("=" * 60)
+    print(f"{'Metode':<28}{'Waktu (s)':>12}{'Akurasi kelas lama':>20}")
+    print(f"{'Model lama (sebelum)':<28}{'-':>12}{acc_old_before * 100:>19.2f}%")
+    print(f"{'Inkremental':<28}{t_incremental:>12.1f}{acc_old * 100:>19.2f}%")
+    if compare_full:
+        print(f"{'Pelatihan ulang penuh':<28}{t_full:>12.1f}{acc_old_full * 100:>19.2f}%")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Menambahkan perintah suara baru tanpa pelatihan ulang penuh.")
+    parser.add_argument('--labels', nargs='+', help="Label baru (default: semua folder dataset yang belum ada di model)")
+    parser.add_argument('--replay', type=int, default=REPLAY_PER_CLASS, help="Rekaman replay per kelas lama")
+    parser.add_argument('--epochs', type=int, default=FINETUNE_EPOCHS, help="Iterasi fine-tuning")
+    parser.add_argument('--unfreeze', action='store_true', help="Ikut melatih trunk konvolusi")
+    parser.add_argument('--compare-full', action='store_true', help="Bandingkan dengan pelatihan ulang penuh")
+    args = parser.parse_args()
+
+    incremental_train(args.labels, args.replay, args.epochs, not args.unfreeze, args.compare_full)
@@ -0,0 +1,148 @@
+import os
+import queue
+import argparse
+import numpy as np
+import librosa
+from voice_core import (VoiceAssistantCore, NoiseFloorTrigger, Recognition, SAMPLE_RATE, DURATION,
+                        POLL_INTERVAL)
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))      # Direktori aplikasi
+DATASET_PATH = os.path.join(BASE_DIR, 'dataset')           # Jalur folder dataset
+STREAM_MINUTES = 10.0        # Panjang stream replay (menit)
+COMMAND_GAP = (4.0, 8.0)     # Jeda acak antar perintah dalam stream (detik)
+COVERAGE = 0.8               # Proporsi ucapan yang harus masuk snapshot agar dihitung terdeteksi
+
+
+class TriggerProbeCore(VoiceAssistantCore):
+    """
+    Core yang menjalankan poll_source apa adanya tetapi mencatat waktu snapshot
+    alih-alih menjalankan model: mengukur berapa kali model akan dipanggil.
+    """
+    def __init__(self):
+        super().__init__(queue.Queue(), queue.Queue(), lambda is_awake: None, devices=[])
+        self.low_power_standby = False     # Ukur trigger saja, tanpa gate wake standby
+        self.snapshot_times = []
+        self.clock = 0.0
+
+    def analyze(self, snapshot):
+        self.snapshot_times.append(self.clock)
+        return Recognition("background", 1.0, 1.0, [("background", 1.0)])
+
+
+def load_commands(seed=42):
+    """Semua klip perintah dataset (tanpa background)."""
+    clips = []
+    for label in sorted(os.listdir(DATASET_PATH)):
+        class_path = os.path.join(DATASET_PATH, label)
+        if os.path.isdir(class_path) and not label.startswith('_'):
+            for f in sorted(os.listdir(class_path)):
+                if f.endswith('.wav'):
+                    audio, _ = librosa.load(os.path.join(class_path, f), sr=SAMPLE_RATE)
+                    clips.append(audio)
+    np.random.default_rng(seed).shuffle(clips)
+    return clips
+
+
+def office_noise(n_samples, noise_rms, rng):
+    """
+    Noise latar: rekaman _background_noise (diulang dan diskalakan ke noise_rms)
+    atau noise sintetik dengan ketukan keyboard acak jika rekaman tidak tersedia.
+    """
+    bg_path = os.path.join(DATASET_PATH, '_background_noise')
+    parts = []
+    if os.path.exists(bg_path):
+        for f in sorted(os.listdir(bg_path)):
+            if f.endswith('.wav'):
+                parts.append(librosa.load(os.path.join(bg_path, f), sr=SAMPLE_RATE)[0])
+    if parts:
+        base = np.concatenate(parts)
+        noise = np.resize(base, n_samples).astype(np.float32)
+    else:
+        noise = rng.normal(0, 1, n_samples).astype(np.float32)
+        # Ketukan singkat 2-6 kali per detik
+        clicks = rng.integers(0, n_samples, int(n_samples / SAMPLE_RATE * rng.uniform(2, 6)))
+        click_len = int(0.02 * SAMPLE_RATE)
+        for c in clicks:
+            noise[c:c + click_len] += rng.normal(0, 6, len(noise[c:c + click_len]))
+    noise *= noise_rms / max(float(np.sqrt(np.mean(noise ** 2))), 1e-9)
+    return noise
+
+
+def build_stream(commands, minutes, noise_rms, speech_peak, seed=42):
+    """Stream noise berdurasi `minutes` dengan perintah disisipkan. Mengembalikan (stream, [(start, end), ...])."""
+    rng = np.random.default_rng(seed)
+    n_samples = int(minutes * 60 * SAMPLE_RATE)
+    stream = office_noise(n_samples, noise_rms, rng)
+    events = []
+    t = rng.uniform(*COMMAND_GAP)
+    i = 0
+    while True:
+        clip = commands[i % len(commands)]
+        start = int(t * SAMPLE_RATE)
+        if start + len(clip) >= n_samples:
+            break
+        peak = max(float(np.max(np.abs(clip))), 1e-9)
+        stream[start:start + len(clip)] += clip / peak * speech_peak
+        events.append((start / SAMPLE_RATE, (start + len(clip)) / SAMPLE_RATE))
+        t += len(clip) / SAMPLE_RATE + rng.uniform(*COMMAND_GAP)
+        i += 1
+    return stream, events
+
+
+def replay(stream, events, adaptive):
+    """Memutar stream melalui poll_source dengan jam virtual. Mengembalikan (jumlah inferensi, recall)."""
+    core = TriggerProbeCore()
+    source = core.add_source("replay")
+    source.trigger = NoiseFloorTrigger(adaptive=adaptive)
+    hop = int(POLL_INTERVAL * SAMPLE_RATE)
+
+    for i in range(0, len(stream) - hop, hop):
+        source.feed(stream[i:i + hop])
+        core.clock = (i + hop) / SAMPLE_RATE
+        core.poll_source(source, core.clock)
+        if source.pending is not None:
+            source.pending.result()
+    core.analysis_pool.shutdown()
+
+    # Ucapan terdeteksi jika sebagian besar isinya masuk salah satu snapshot (DURATION detik terakhir)
+    snaps = np.array(core.snapshot_times)
+    detected = 0
+    for start, end in events:
+        if len(snaps) == 0:
+            break
+        overlap = np.clip(np.minimum(snaps, end) - np.maximum(snaps - DURATION, start), 0, None)
+        if np.max(overlap) >= COVERAGE * (end - start):
+            detected += 1
+    return len(snaps), detected / max(len(events), 1)
+
+
+def benchmark(minutes=STREAM_MINUTES, noise_levels=(0.005, 0.02, 0.04), speech_peak=0.5):
+    """Membandingkan trigger tetap vs adaptif pada beberapa tingkat noise ruangan."""
+    commands = load_commands()
+    print("=" * 78)
+    print(f"Stream {minutes:.0f} menit per tingkat noise | Puncak ucapan {speech_peak}")
+    print(f"{'Noise RMS':>10}{'Perintah':>10}{'Mode':>10}{'Inferensi/jam':>15}{'Recall':>10}{'Terbuang':>11}")
+    for noise_rms in noise_levels:
+        stream, events = build_stream(commands, minutes, noise_rms, speech_peak)
+        results = {}
+        for mode in ("fixed", "adaptive"):
+            n_inferences, recall = replay(stream, events, adaptive=(mode == "adaptive"))
+            per_hour = n_inferences / (minutes / 60)
+            # Inferensi di luar ucapan pasti berakhir background/confidence rendah
+            wasted = max(n_inferences - recall * len(events), 0) / max(n_inferences, 1)
+            results[mode] = per_hour
+            print(f"{noise_rms:>10.3f}{len(events):>10}{mode:>10}{per_hour:>15.0f}{recall * 100:>9.1f}%{wasted * 100:>10.1f}%")
+        if results["fixed"]:
+            print(f"{'':>20}Pengurangan inferensi: {(1 - results['adaptive'] / results['fixed']) * 100:.0f}%")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay stream berisik: trigger RMS tetap vs noise floor adaptif.")
+    parser.add_argument('--minutes', type=float, default=STREAM_MINUTES, help="Panjang stream per tingkat noise")
+    parser.add_argument('--noise', type=float, nargs='+', default=[0.005, 0.02, 0.04], help="RMS noise latar yang diuji")
+    parser.add_argument('--speech-peak', type=float, default=0.5, help="Amplitudo puncak perintah yang disisipkan")
+    args = parser.parse_args()
+
+    benchmark(args.minutes, args.noise, args.speech_peak)
@@ -0,0 +1,278 @@
+import os
+import csv
+import time
+import argparse
+import numpy as np
+import librosa
+import tensorflow as tf
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from dataset_pack import open_pack
+from audio_utils import pad_to_bucket
+from arch_bench import build_temporal_model
+from model import (DATASET_PATH, MODELS_PATH, SAMPLE_RATE, DURATION, EPOCHS, BATCH_SIZE,
+                   list_labels, list_files, load_audio, load_data, prepare_clip, extract_mfcc,
+                   add_noise, build_compact_model, fit_model)
+
+# --- KONFIGURASI ---
+VARLEN_PATH = os.path.join(MODELS_PATH, 'varlen')          # Artefak model panjang-variabel
+REPORT_PATH = os.path.join(VARLEN_PATH, 'benchmark.csv')   # Tabel perbandingan per perintah
+BUCKET = 0.25              # Lebar bucket panjang (detik); juga dipakai voice_core saat inferensi
+MIN_DURATION = 0.25        # Panjang minimum noise latar sintetik/potongan (detik)
+TRIM_DB = 20               # Ambang pemotongan sunyi, sama dengan enhance_audio
+N_FEATURES = 120           # MFCC + Delta + Delta2
+
+
+def prepare_varlen(audio):
+    """Memotong sunyi, padding hingga bucket berikutnya (bukan 2 detik penuh), lalu normalisasi."""
+    trimmed, _ = librosa.effects.trim(audio, top_db=TRIM_DB)
+    if len(trimmed) == 0:
+        trimmed = audio
+    audio = pad_to_bucket(trimmed, SAMPLE_RATE, BUCKET, DURATION)
+    if np.max(np.abs(audio)) > 0:
+        audio = audio / np.max(np.abs(audio))
+    return audio
+
+
+def split_files(test_size=0.2):
+    """Memilih file uji (bukan sampel hasil augmentasi) per label. Mengembalikan [(path, label), ...]."""
+    files, labels = [], []
+    for label in list_labels():
+        wavs = list_files(label)
+        files += wavs
+        labels += [label] * len(wavs)
+    _, test, _, test_labels = train_test_split(
+        files, labels, test_size=test_size, random_state=42, stratify=labels
+    )
+    return list(zip(test, test_labels))
+
+
+def load_varlen_data(exclude):
+    """
+    Fitur panjang-variabel untuk semua file kecuali `exclude`, dengan augmentasi
+    noise dan pitch. Pergeseran waktu tidak dipakai karena ucapan sudah dipotong.
+    """
+    X, y = [], []
+    rng = np.random.default_rng(42)
+    pack = open_pack()
+
+    for label in list_labels():
+        wav_files = list_files(label, exclude=exclude)
+        print(f"   Memproses {label}: {len(wav_files)} sampel asli...")
+        for file_path in wav_files:
+            try:
+                audio = prepare_varlen(load_audio(file_path, pack))
+                X.append(extract_mfcc(audio))
+                y.append(label)
+
+                X.append(extract_mfcc(add_noise(audio, noise_factor=0.008)))
+                y.append(label)
+
+                step = rng.integers(-2, 3)
+                if step != 0:
+                    pitch_audio = librosa.effects.pitch_shift(audio, sr=SAMPLE_RATE, n_steps=step)
+                    X.append(extract_mfcc(pitch_audio))
+                    y.append(label)
+            except Exception as e:
+                print(f"Gagal memproses {file_path}: {e}")
+
+    # Noise latar dengan panjang acak agar semua bucket memiliki contoh background
+    bg_path = os.path.join(DATASET_PATH, '_background_noise')
+    chunks = []
+    if os.path.exists(bg_path):
+        for file in os.listdir(bg_path):
+            if file.endswith('.wav'):
+                aud = load_audio(os.path.join(bg_path, file), pack)
+                i = 0
+                while i < len(aud):
+                    length = int(SAMPLE_RATE * rng.uniform(MIN_DURATION, DURATION))
+                    if i + length > len(aud):
+                        break
+                    chunks.append(aud[i:i + length])
+                    i += length
+    while len(chunks) < 100:
+        chunks.append(rng.normal(0, 0.005, int(SAMPLE_RATE * rng.uniform(MIN_DURATION, DURATION))))
+    for chunk in chunks:
+        X.append(extract_mfcc(pad_to_bucket(chunk, SAMPLE_RATE, BUCKET, DURATION)))
+        y.append("background")
+
+    return X, np.array(y)
+
+
+def bucket_dataset(X, y, batch_size=BATCH_SIZE, shuffle=True, seed=42):
+    """
+    tf.data.Dataset berisi batch yang setiap batch-nya berasal dari satu bucket panjang,
+    sehingga tidak ada padding di dalam batch. Urutan batch diacak setiap epoch.
+    """
+    buckets = {}
+    for x, label in zip(X, y):
+        buckets.setdefault(x.shape[0], []).append((x, label))
+    arrays = {n: (np.stack([x for x, _ in items]).astype(np.float32), np.array([l for _, l in items]))
+              for n, items in buckets.items()}
+    rng = np.random.default_rng(seed)
+
+    def generate():
+        batches = []
+        for n, (Xb, _) in arrays.items():
+            order = rng.permutation(len(Xb)) if shuffle else np.arange(len(Xb))
+            batches += [(n, order[i:i + batch_size]) for i in range(0, len(order), batch_size)]
+        if shuffle:
+            rng.shuffle(batches)
+        for n, idx in batches:
+            yield arrays[n][0][idx], arrays[n][1][idx]
+
+    signature = (tf.TensorSpec((None, None, N_FEATURES), tf.float32), tf.TensorSpec((None,), tf.int64))
+    return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(2)
+
+
+def bucket_summary(X):
+    """Jumlah sampel per bucket (frame -> jumlah)."""
+    counts = {}
+    for x in X:
+        counts[x.shape[0]] = counts.get(x.shape[0], 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def train_varlen(test_size=0.2, epochs=EPOCHS, batch_size=BATCH_SIZE):
+    """Melatih model panjang-variabel dengan bucketing. Mengembalikan (model, classes, test_clips)."""
+    if not os.path.exists(VARLEN_PATH):
+        os.makedirs(VARLEN_PATH)
+
+    test_clips = split_files(test_size)
+    X, y = load_varlen_data(exclude={f for f, _ in test_clips})
+
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y_encoded, test_size=0.15, random_state=42, stratify=y_encoded
+    )
+    print(f"\nBucket (frame: sampel): {bucket_summary(X_train)}")
+
+    # Input (None, fitur): model menerima jumlah frame berapa pun, dirangkum dengan global pooling
+    model = build_temporal_model((None, N_FEATURES), len(le.classes_))
+    model.summary()
+    model.fit(
+        bucket_dataset(X_train, y_train, batch_size),
+        validation_data=bucket_dataset(X_val, y_val, batch_size, shuffle=False),
+        epochs=epochs,
+        callbacks=[
+            EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True, verbose=1),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=0.00001, verbose=1),
+        ],
+        verbose=1
+    )
+
+    model.save(os.path.join(VARLEN_PATH, 'voice_model.h5'))
+    model.save(os.path.join(VARLEN_PATH, 'voice_model.keras'))
+    np.save(os.path.join(VARLEN_PATH, 'label_encoder.npy'), le.classes_)
+    print(f"✅ Model panjang-variabel disimpan: {VARLEN_PATH}")
+    return model, le.classes_, test_clips
+
+
+def train_fixed(exclude, epochs=EPOCHS):
+    """Melatih ulang model 2 detik pada file latih yang sama agar perbandingan adil."""
+    X, y = load_data(exclude=exclude)
+    le = LabelEncoder()
+    y_encoded = le.fit_transform(y)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y_encoded, test_size=0.15, random_state=42, stratify=y_encoded
+    )
+    model = build_compact_model((X_train.shape[1], X_train.shape[2]), len(le.classes_))
+    fit_model(model, X_train, y_train, X_val, y_val, epochs=epochs, batch_size=BATCH_SIZE)
+    return model, le.classes_
+
+
+def timed_predict(model, classes, features):
+    """Prediksi satu sampel, mengembalikan (label, waktu inferensi dalam ms)."""
+    t0 = time.perf_counter()
+    probs = model(features[np.newaxis, ...], training=False).numpy()[0]
+    return str(classes[int(np.argmax(probs))]), (time.perf_counter() - t0) * 1000
+
+
+def compare(var_model, var_classes, fixed_model, fixed_classes, test_clips, report_path=REPORT_PATH):
+    """Akurasi dan latensi (fitur + inferensi) per perintah: input 2 detik vs ucapan terpotong."""
+    pack = open_pack()
+    # Pemanasan kedua model (panggilan pertama memuat kernel)
+    for _ in range(3):
+        fixed_model(np.zeros((1,) + tuple(fixed_model.input_shape[1:]), np.float32), training=False)
+        var_model(np.zeros((1, 64, N_FEATURES), np.float32), training=False)
+
+    stats = {}
+    for file_path, label in test_clips:
+        audio = load_audio(file_path, pack)
+        s = stats.setdefault(label, {"n": 0, "seconds": 0.0, "frames": 0,
+                                     "fixed_ok": 0, "fixed_ms": [], "var_ok": 0, "var_ms": []})
+        s["n"] += 1
+
+        t0 = time.perf_counter()
+        features = extract_mfcc(prepare_clip(audio))
+        feat_ms = (time.perf_counter() - t0) * 1000
+        pred, infer_ms = timed_predict(fixed_model, fixed_classes, features)
+        s["fixed_ok"] += pred == label
+        s["fixed_ms"].append(feat_ms + infer_ms)
+
+        t0 = time.perf_counter()
+        trimmed = prepare_varlen(audio)
+        features = extract_mfcc(trimmed)
+        feat_ms = (time.perf_counter() - t0) * 1000
+        pred, infer_ms = timed_predict(var_model, var_classes, features)
+        s["var_ok"] += pred == label
+        s["var_ms"].append(feat_ms + infer_ms)
+        s["seconds"] += len(trimmed) / SAMPLE_RATE
+        s["frames"] += features.shape[0]
+
+    rows = []
+    for label, s in sorted(stats.items()):
+        rows.append({
+            'label': label,
+            'clips': s["n"],
+            'input_s': round(s["seconds"] / s["n"], 2),
+            'frames': round(s["frames"] / s["n"], 1),
+            'fixed_acc': round(s["fixed_ok"] / s["n"] * 100, 1),
+            'varlen_acc': round(s["var_ok"] / s["n"] * 100, 1),
+            'fixed_ms': round(float(np.median(s["fixed_ms"])), 2),
+            'varlen_ms': round(float(np.median(s["var_ms"])), 2),
+        })
+
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print("=" * 84)
+    print(f"{'Perintah':<14}{'Klip':>6}{'Input(s)':>10}{'Frame':>8}{'Akurasi 2s':>12}{'Akurasi var':>13}"
+          f"{'ms 2s':>9}{'ms var':>9}{'Hemat':>8}")
+    for r in rows:
+        saving = (1 - r['varlen_ms'] / r['fixed_ms']) * 100 if r['fixed_ms'] else 0.0
+        print(f"{r['label']:<14}{r['clips']:>6}{r['input_s']:>10.2f}{r['frames']:>8.1f}{r['fixed_acc']:>11.1f}%"
+              f"{r['varlen_acc']:>12.1f}%{r['fixed_ms']:>9.2f}{r['varlen_ms']:>9.2f}{saving:>7.0f}%")
+    n = sum(s["n"] for s in stats.values())
+    fixed_acc = sum(s["fixed_ok"] for s in stats.values()) / n * 100
+    var_acc = sum(s["var_ok"] for s in stats.values()) / n * 100
+    fixed_ms = np.median([t for s in stats.values() for t in s["fixed_ms"]])
+    var_ms = np.median([t for s in stats.values() for t in s["var_ms"]])
+    print("-" * 84)
+    print(f"{'Total':<14}{n:>6}{'':>18}{fixed_acc:>11.1f}%{var_acc:>12.1f}%{fixed_ms:>9.2f}{var_ms:>9.2f}")
+    print("=" * 84)
+    print(f"✅ Hasil disimpan: {report_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model panjang-variabel (global pooling + bucketing) vs model 2 detik.")
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help="Iterasi pelatihan")
+    parser.add_argument('--use-existing', action='store_true',
+                        help="Bandingkan dengan models/voice_model.h5 (mungkin sudah melihat klip uji) alih-alih melatih ulang")
+    args = parser.parse_args()
+
+    var_model, var_classes, test_clips = train_varlen(epochs=args.epochs)
+
+    if args.use_existing:
+        fixed_model = tf.keras.models.load_model(os.path.join(MODELS_PATH, 'voice_model.h5'))
+        fixed_classes = np.load(os.path.join(MODELS_PATH, 'label_encoder.npy'), allow_pickle=True)
+    else:
+        print("\nMelatih ulang model 2 detik pada file latih yang sama...")
+        fixed_model, fixed_classes = train_fixed({f for f, _ in test_clips}, epochs=args.epochs)
+
+    compare(var_model, var_classes, fixed_model, fixed_classes, test_clips)
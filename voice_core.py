@@ -0,0 +1,880 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+import numpy as np
+import tensorflow as tf
+from sklearn.preprocessing import LabelEncoder
+import pyautogui
+import ctypes
+from audio_utils import extract_features, choose_denoise
+from embedding_index import PrototypeIndex, build_embedding_model, INDEX_PATH
+from inference_scheduler import InferenceScheduler, keras_predict_fn
+from event_store import EventStore, EVENTS_PATH
+from shadow_model import ShadowEvaluator
+from audio_stream import StreamSupervisor
+from profiles import ProfileCache, Profile, DEFAULT_PROFILE, list_profiles, profile_dir, estimate_bytes
+from model_bundle import load_bundle, feature_config, current_bundle
+from features import HOP_LENGTH
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))          # Direktori aplikasi
+MODELS_PATH = os.path.join(BASE_DIR, 'models')                 # Direktori model
+COMMAND_MAP_PATH = os.path.join(BASE_DIR, 'command_map.json')  # Peta perintah
+COMMAND_POLICY_PATH = os.path.join(BASE_DIR, 'command_policy.json')  # Kebijakan ulang per perintah
+APPS_PATH = os.path.join(BASE_DIR, 'apps')                     # Direktori aplikasi
+SOUNDS_PATH = os.path.join(BASE_DIR, 'sound')                  # Direktori suara feedback
+
+SAMPLE_RATE = 44100          # Tingkat sampling audio
+DURATION = 2.0               # Durasi buffer audio dalam detik
+N_MFCC = 40                  # Jumlah koefisien MFCC
+RMS_THRESHOLD = 0.05         # Ambang batas deteksi suara (mode trigger "fixed" dan pemanasan)
+CONFIDENCE_THRESHOLD = 0.8   # Ambang batas kepercayaan prediksi
+COOLDOWN_PERIOD = 1.5        # Jeda default label tanpa kebijakan di command_policy.json (detik)
+TOP_K = 3                    # Jumlah kandidat label yang dicatat per prediksi
+TRIGGER_DELAY = 0.6          # Waktu tunggu setelah trigger agar ucapan lengkap (detik)
+POLL_INTERVAL = 0.05         # Interval pengecekan sumber audio (detik)
+ANALYSIS_WORKERS = 4         # Thread ekstraksi fitur paralel (dibagi semua sumber)
+
+# Trigger: "adaptive" (SNR di atas noise floor yang dilacak, dengan histeresis)
+# atau "fixed" (RMS di atas RMS_THRESHOLD)
+TRIGGER_MODE = "adaptive"
+NOISE_WINDOW = 10.0          # Panjang riwayat RMS untuk estimasi noise floor (detik)
+NOISE_PERCENTILE = 20        # Persentil RMS riwayat yang dianggap noise floor
+TRIGGER_SNR_DB = 12.0        # SNR di atas noise floor yang memicu analisis (dB)
+RELEASE_SNR_DB = 6.0         # Trigger aktif kembali setelah SNR turun di bawah ini (dB)
+MIN_TRIGGER_RMS = 0.01       # RMS minimum agar ruangan sangat sunyi tidak memicu suara kecil
+
+# Profil standby hemat daya: selama semua sumber standby, stream dibuka ulang dengan
+# blok lebih besar, pengecekan diperlambat, gate energi memakai sampel yang didesimasi
+# dan model baru dijalankan jika durasi suara cocok dengan frase wake
+LOW_POWER_STANDBY = True
+ACTIVE_BLOCKSIZE = 1024      # Sampel per callback audio saat aktif (~23 ms)
+STANDBY_BLOCKSIZE = 8192     # Sampel per callback audio saat standby (~186 ms)
+STANDBY_POLL_INTERVAL = 0.2  # Interval pengecekan saat standby (detik)
+STANDBY_DECIMATION = 8       # Gate energi standby memakai setiap sampel ke-N
+WAKE_MIN_DURATION = 0.4      # Durasi suara minimum kandidat frase wake (detik)
+WAKE_MAX_DURATION = 1.8      # Durasi suara maksimum kandidat frase wake (detik)
+
+# Penyimpanan event: setiap trigger dicatat ke logs/events.db (lihat event_store.py)
+RECORD_EVENTS = True
+RECORD_AUDIO = False         # Simpan juga snapshot audio (int16) setiap trigger
+
+# Perangkat input: None = perangkat default. Tambahkan indeks perangkat lain
+# (lihat sd.query_devices()) untuk mendengarkan beberapa mikrofon sekaligus.
+INPUT_DEVICES = [None]
+
+# Mode klasifikasi: "softmax" (head model), "prototype" (prototipe terdekat di
+# models/prototypes.npz), atau "both" (softmax, dengan prototipe untuk perintah
+# yang didaftarkan tanpa pelatihan)
+CLASSIFIER_MODE = "softmax"
+PROTOTYPE_THRESHOLD = 0.85   # Ambang batas kemiripan kosinus prototipe
+
+# Reduksi noise sebelum fitur: "full" (selalu noisereduce penuh), "light", "none", atau
+# "adaptive" (dipilih per snapshot dari SNR-nya, lihat choose_denoise di audio_utils.py).
+# Bandingkan akurasi dan CPU setiap kebijakan dengan 'python evaluate.py --ablation'.
+DENOISE_POLICY = "full"
+
+# Varian model: "fixed" (input 2 detik, models/) atau "varlen" (ucapan terpotong
+# dengan panjang kelipatan VARLEN_BUCKET, models/varlen/ dari varlen_model.py)
+MODEL_VARIANT = "fixed"
+VARLEN_BUCKET = 0.25         # Harus sama dengan BUCKET di varlen_model.py
+
+# Model kandidat (shadow): direktori berisi voice_model.h5 dan label_encoder.npy
+# (misalnya os.path.join(MODELS_PATH, 'student')). Kandidat menilai fitur yang sama
+# di thread berprioritas rendah; hasilnya hanya dicatat ke logs/shadow.jsonl
+# (lihat shadow_model.py) dan tidak pernah dieksekusi. None = nonaktif.
+SHADOW_MODEL_DIR = None
+
+# Profil pengguna: "default" (model di atas) atau models/<profil>/ berisi model, label
+# dan peta perintah sendiri (lihat profiles.py). Profil dapat diganti lewat HUD atau
+# perintah suara yang dipetakan ke "cmd:profile:<nama>" / "cmd:profile_next".
+START_PROFILE = DEFAULT_PROFILE
+
+
+class Recognition:
+    """Hasil analisis satu snapshot: prediksi teratas, top-k dan waktu per tahap (ms)."""
+    __slots__ = ("label", "confidence", "threshold", "top_k", "timings", "denoise")
+
+    def __init__(self, label, confidence, threshold, top_k, timings=None, denoise=None):
+        self.label = label
+        self.confidence = float(confidence)
+        self.threshold = threshold
+        self.top_k = top_k              # [(label, skor), ...] dari yang tertinggi
+        self.timings = timings or {}
+        self.denoise = denoise          # Jalur reduksi noise yang dipakai ("none"/"light"/"full")
+
+    @property
+    def accepted(self):
+        """True jika bukan background dan confidence memenuhi ambang batas."""
+        return self.label != "background" and self.confidence >= self.threshold
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "confidence": self.confidence,
+            "accepted": self.accepted,
+            "top_k": [[l, float(c)] for l, c in self.top_k],
+            "timings": self.timings,
+            "denoise": self.denoise,
+        }
+
+
+class RingBuffer:
+    """Buffer cincin audio berukuran tetap: blok baru ditulis tanpa menggeser seluruh buffer."""
+    def __init__(self, size):
+        self.size = size
+        self.data = np.zeros(size, dtype=np.float32)
+        self.pos = 0          # Posisi tulis berikutnya
+        self.total = 0        # Total sampel yang pernah ditulis
+        self.lock = threading.Lock()
+
+    def write(self, block):
+        """Menulis blok sampel ke buffer."""
+        n = len(block)
+        with self.lock:
+            if n >= self.size:
+                self.data[:] = block[-self.size:]
+                self.pos = 0
+            else:
+                end = self.pos + n
+                if end <= self.size:
+                    self.data[self.pos:end] = block
+                else:
+                    first = self.size - self.pos
+                    self.data[self.pos:] = block[:first]
+                    self.data[:n - first] = block[first:]
+                self.pos = end % self.size
+            self.total += n
+
+    def latest(self, n, step=1):
+        """Salinan n sampel terakhir secara berurutan (setiap sampel ke-`step` jika step > 1)."""
+        n = min(n, self.size)
+        with self.lock:
+            start = (self.pos - n) % self.size
+            if start + n <= self.size:
+                return self.data[start:start + n:step].copy()
+            return np.concatenate([self.data[start:], self.data[:self.pos]])[::step]
+
+    def snapshot(self):
+        """Salinan seluruh isi buffer (sampel terlama di awal)."""
+        return self.latest(self.size)
+
+    def snapshot_since(self, mark):
+        """
+        Salinan seluruh isi buffer beserta total saat itu. Sampel yang ditulis sebelum
+        `mark` (nilai total sebelumnya) dinolkan agar ucapan yang sudah dikenali tidak
+        ikut dianalisis lagi bersama ucapan berikutnya.
+        """
+        with self.lock:
+            total = self.total
+            data = np.concatenate([self.data[self.pos:], self.data[:self.pos]])
+        stale = min(self.size - (total - mark), self.size)
+        if stale > 0:
+            data[:stale] = 0.0
+        return data, total
+
+
+class NoiseFloorTrigger:
+    """
+    Trigger analisis berbasis noise floor adaptif. RMS setiap pengecekan disimpan
+    bersama waktunya dalam riwayat NOISE_WINDOW detik (tidak bergantung pada interval
+    pengecekan, yang melambat saat standby); persentil rendahnya menjadi estimasi noise
+    ruangan. Analisis dipicu saat SNR terhadap floor melewati TRIGGER_SNR_DB, lalu
+    trigger baru aktif kembali setelah SNR turun di bawah RELEASE_SNR_DB (histeresis),
+    sehingga noise yang terus-menerus tidak memicu inferensi berulang.
+    """
+    def __init__(self, adaptive=None):
+        self.adaptive = TRIGGER_MODE == "adaptive" if adaptive is None else adaptive
+        self.history = deque()    # (waktu, RMS) dalam NOISE_WINDOW detik terakhir
+        self.started = None       # Waktu RMS pertama; detik pertama memakai RMS_THRESHOLD
+        self.floor = 0.0          # Estimasi noise floor (RMS)
+        self.snr_db = 0.0         # SNR pengecekan terakhir
+        self.armed = True
+
+    @property
+    def floor_db(self):
+        return 20 * np.log10(max(self.floor, 1e-10))
+
+    def update(self, rms, now=None):
+        """Memasukkan RMS terbaru pada waktu `now`. Mengembalikan True jika analisis perlu dipicu."""
+        if not self.adaptive:
+            return rms > RMS_THRESHOLD
+
+        now = time.time() if now is None else now
+        self.history.append((now, rms))
+        while self.history[0][0] < now - NOISE_WINDOW:
+            self.history.popleft()
+        if self.started is None:
+            self.started = now
+        if now - self.started < 1.0:
+            return rms > RMS_THRESHOLD
+
+        filled = np.fromiter((r for _, r in self.history), dtype=np.float32, count=len(self.history))
+        self.floor = max(float(np.percentile(filled, NOISE_PERCENTILE)), 1e-5)
+        self.snr_db = 20 * np.log10(max(rms, 1e-10) / self.floor)
+
+        if not self.armed:
+            if self.snr_db < RELEASE_SNR_DB:
+                self.armed = True
+            return False
+        if self.snr_db >= TRIGGER_SNR_DB and rms >= MIN_TRIGGER_RMS:
+            self.armed = False
+            return True
+        return False
+
+
+class AudioSource:
+    """
+    Satu sumber input (mikrofon atau stream rekaman) dengan buffer cincin,
+    deteksi suara dan status wake sendiri.
+    """
+    def __init__(self, name, device=None, live=True):
+        self.name = name              # Nama sumber (untuk log)
+        self.device = device          # Indeks perangkat sounddevice (None = default)
+        self.live = live              # False untuk stream rekaman yang diumpankan lewat feed()
+
+        self.buffer = RingBuffer(int(DURATION * SAMPLE_RATE))  # Buffer audio
+        self.waveform_data = np.zeros(100)  # Data untuk visualisasi waveform
+        self.is_awake = False         # Status aktif/standby sumber ini
+        self.holdoff_until = 0.0      # Deteksi dijeda hingga waktu ini (kebijakan "once")
+        self.last_label_time = {}     # Waktu eksekusi terakhir per label (debounce)
+        self.consumed = 0             # Total sampel buffer yang sudah dikenali sebagai perintah
+        self.snapshot_total = 0       # Total sampel buffer saat snapshot terakhir diambil
+        self.trigger_time = None      # Waktu suara terdeteksi, menunggu ucapan lengkap
+        self.trigger_info = None      # (waktu, status wake, RMS, SNR, snapshot) trigger yang sedang diproses
+        self.pending = None           # Future analisis yang sedang berjalan
+        self.trigger = NoiseFloorTrigger()  # Trigger analisis (adaptif atau ambang tetap)
+
+    def audio_callback(self, indata, frames, time_info, status):
+        """Callback untuk menerima data audio dari microphone."""
+        self.feed(indata[:, 0])
+
+    def feed(self, samples):
+        """Menambahkan sampel baru ke buffer (dipakai callback maupun stream rekaman)."""
+        self.buffer.write(samples)
+        # Update data visualisasi waveform
+        self.waveform_data = samples[::len(samples)//100] if len(samples) > 100 else samples
+
+    def mark_consumed(self):
+        """Menandai isi snapshot terakhir sebagai sudah dikenali (tidak dianalisis ulang)."""
+        self.consumed = self.snapshot_total
+
+    def rms(self, seconds=0.15, decimate=1):
+        """RMS (Root Mean Square) dari bagian terakhir buffer, opsional dari sampel yang didesimasi."""
+        recent = self.buffer.latest(int(seconds * SAMPLE_RATE), step=decimate)
+        return float(np.sqrt(np.mean(recent ** 2)))
+
+
+class VoiceAssistantCore:
+    """Inti sistem asisten suara (logika AI dan deteksi)."""
+    def __init__(self, log_queue, history_queue, state_callback, devices=None):
+        self.log_queue = log_queue              # Antrian untuk log
+        self.history_queue = history_queue      # Antrian untuk riwayat perintah
+        self.state_callback = state_callback    # Callback untuk update status UI
+
+        self.is_running = False    # Status sistem berjalan
+        self.model = None          # Model TensorFlow
+        self.le = None             # Label Encoder
+        self.embedder = None       # Model embedding (mode prototype/both)
+        self.prototypes = None     # Indeks prototipe kelas
+        self.scheduler = None      # Penjadwal inferensi bersama semua sumber
+        self.active_profile = None # Profil aktif (model, label, peta perintah, penjadwal)
+        self.profile_name = None
+        self.pending_profile = None  # Profil yang sedang dimuat di latar
+        self.switch_times = []     # (jenis "cache"/"dingin", ms) setiap perpindahan profil
+        self.command_map = {}      # Peta perintah ke aksi
+        self.policies = {}         # Kebijakan ulang per label (command_policy.json)
+        self.held_keys = set()     # Menyimpan tombol yang sedang ditekan
+        self.n_inferences = 0      # Jumlah analisis yang dipicu
+        self.n_discarded = 0       # Analisis yang berakhir background/confidence rendah
+        self.n_gated = 0           # Trigger standby yang ditolak gate wake sebelum model
+        self.denoise_counts = {}   # Jumlah analisis per jalur reduksi noise
+        self.low_power_standby = LOW_POWER_STANDBY
+        self.record_events = RECORD_EVENTS
+        self.event_store = None    # Penyimpanan event, dibuka di load_resources
+        self.shadow = None         # Evaluator model kandidat (SHADOW_MODEL_DIR)
+        self.supervisors = []      # Pengawas stream mikrofon (dibuat di run_inference_loop)
+        self.profiles = ProfileCache(self._load_profile, log=self.log)
+        self.started = time.time()
+
+        # Satu AudioSource per perangkat input; sumber pertama ditampilkan di HUD
+        devices = INPUT_DEVICES if devices is None else devices
+        self.sources = [AudioSource(f"mic{i}", device) for i, device in enumerate(devices)]
+        self.analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS)
+
+        # Aksi dijalankan berurutan di thread terpisah agar deteksi tidak menunggu keyboard/aplikasi
+        self.action_queue = queue.Queue()
+        self.action_thread = threading.Thread(target=self._run_actions, daemon=True)
+        self.action_thread.start()
+
+    @property
+    def primary(self):
+        """Sumber utama yang statusnya ditampilkan di HUD."""
+        return self.sources[0] if self.sources else None
+
+    @property
+    def is_awake(self):
+        return self.primary.is_awake if self.primary else False
+
+    @property
+    def waveform_data(self):
+        return self.primary.waveform_data if self.primary else np.zeros(100)
+
+    def low_power(self):
+        """True jika profil standby hemat daya berlaku (diaktifkan dan semua sumber standby)."""
+        return self.low_power_standby and not any(source.is_awake for source in self.sources)
+
+    def profile(self):
+        """(blocksize audio, interval pengecekan) untuk profil daya saat ini."""
+        if self.low_power():
+            return STANDBY_BLOCKSIZE, STANDBY_POLL_INTERVAL
+        return ACTIVE_BLOCKSIZE, POLL_INTERVAL
+
+    def sources_idle(self):
+        """True jika tidak ada sumber yang menunggu ucapan lengkap atau hasil analisis."""
+        return all(source.trigger_time is None and source.pending is None for source in self.sources)
+
+    def wake_gate(self, snapshot, floor):
+        """
+        Gate murah sebelum model saat standby: durasi bagian bersuara (frame 20 ms
+        dari sampel yang didesimasi) harus cocok dengan panjang frase wake.
+        Ketukan singkat dan noise panjang ditolak tanpa MFCC maupun inferensi.
+        """
+        samples = snapshot[::STANDBY_DECIMATION]
+        frame = max(1, int(0.02 * SAMPLE_RATE / STANDBY_DECIMATION))
+        n_frames = len(samples) // frame
+        if n_frames == 0:
+            return False
+        rms = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+        level = max(floor * 10 ** (RELEASE_SNR_DB / 20), MIN_TRIGGER_RMS)
+        voiced = np.count_nonzero(rms > level) * 0.02
+        return WAKE_MIN_DURATION <= voiced <= WAKE_MAX_DURATION
+
+    def add_source(self, name, device=None, live=False):
+        """Menambahkan sumber input baru (misalnya stream rekaman untuk pengujian)."""
+        source = AudioSource(name, device, live)
+        self.sources.append(source)
+        return source
+
+    def log(self, message, type="info"):
+        """Mengirim pesan log ke antrian."""
+        self.log_queue.put((message, type))
+
+    def load_resources(self):
+        """Memuat model AI dan konfigurasi perintah."""
+        self.log("📦 Memuat model AI dan konfigurasi...")
+        try:
+            # Profil awal dimuat langsung; profil lain dimuat saat diminta (lihat switch_profile)
+            name = START_PROFILE if START_PROFILE in list_profiles(MODELS_PATH) else DEFAULT_PROFILE
+            self.activate(self.profiles.load(name))
+
+            # Penulis event latar (tidak memblokir thread inferensi)
+            if self.record_events and self.event_store is None:
+                self.event_store = EventStore(EVENTS_PATH, keep_audio=RECORD_AUDIO)
+
+            # Model kandidat opsional; kegagalannya tidak menghentikan model live
+            if SHADOW_MODEL_DIR and self.shadow is None:
+                try:
+                    self.shadow = ShadowEvaluator(SHADOW_MODEL_DIR, log=self.log).start()
+                    self.log(f"🧪 Model kandidat dimuat: {SHADOW_MODEL_DIR}")
+                except Exception as e:
+                    self.log(f"⚠️ Model kandidat tidak dimuat: {e}", "warning")
+
+            self.log("✅ Sumber daya berhasil dimuat.")
+            return True
+        except Exception as e:
+            self.log(f"❌ Kesalahan Inisialisasi: {e}", "error")
+            return False
+
+    def _load_profile(self, name):
+        """Memuat dan memanaskan satu profil (dipanggil ProfileCache, juga dari thread latar)."""
+        t0 = time.perf_counter()
+        if name == DEFAULT_PROFILE:
+            model_dir = os.path.join(MODELS_PATH, 'varlen') if MODEL_VARIANT == "varlen" else MODELS_PATH
+            map_path, policy_path = COMMAND_MAP_PATH, COMMAND_POLICY_PATH
+        else:
+            model_dir = profile_dir(name, MODELS_PATH)
+            map_path = os.path.join(model_dir, 'command_map.json')
+            policy_path = os.path.join(model_dir, 'command_policy.json')
+            if not os.path.exists(policy_path):
+                policy_path = COMMAND_POLICY_PATH
+        model_path = os.path.join(model_dir, 'voice_model.h5')
+        le_path = os.path.join(model_dir, 'label_encoder.npy')
+        # Bundle yang tertinggal dari h5 di sebelahnya (mis. setelah train_incremental lama) diabaikan
+        bundle = current_bundle(model_dir, log=lambda message: self.log(message, "warning"))
+
+        # Validasi keberadaan file model
+        if bundle is None and (not os.path.exists(model_path) or not os.path.exists(le_path)):
+            script = "varlen_model.py" if MODEL_VARIANT == "varlen" else "model.py"
+            raise Exception(f"File model profil '{name}' tidak ditemukan. Jalankan {script} terlebih dahulu.")
+        if MODEL_VARIANT == "varlen" and CLASSIFIER_MODE != "softmax":
+            raise Exception("Indeks prototipe dibangun dari model 2 detik; gunakan CLASSIFIER_MODE 'softmax' untuk model varlen.")
+        if name != DEFAULT_PROFILE and CLASSIFIER_MODE != "softmax":
+            raise Exception("Indeks prototipe dibangun dari model default; gunakan CLASSIFIER_MODE 'softmax' untuk profil pengguna.")
+
+        # Memuat model dan label: bundle (tanpa pickle, parameter fitur divalidasi) atau h5 + npy lama
+        if bundle is not None:
+            model, classes, header = load_bundle(bundle, feature_config(SAMPLE_RATE, DURATION, N_MFCC))
+            self.log(f"📦 Profil '{name}': bundle v{header['version']} (sha256 {header['sha256'][:12]})", "debug")
+        else:
+            model = tf.keras.models.load_model(model_path)
+            classes = np.load(le_path, allow_pickle=True)
+
+        # Memuat indeks prototipe jika mode klasifikasi memerlukannya
+        inference_model, embedder, prototypes = model, None, None
+        if CLASSIFIER_MODE != "softmax":
+            if not os.path.exists(INDEX_PATH):
+                raise Exception("Indeks prototipe tidak ditemukan. Jalankan 'python embedding_index.py build'.")
+            embedder = build_embedding_model(model, with_softmax=(CLASSIFIER_MODE == "both"))
+            prototypes = PrototypeIndex.load(INDEX_PATH)
+            inference_model = embedder
+            self.log(f"🧭 Mode klasifikasi: {CLASSIFIER_MODE} ({len(prototypes)} prototipe)")
+
+        # Satu model dipakai bersama oleh semua sumber melalui penjadwal
+        scheduler = InferenceScheduler(keras_predict_fn(inference_model)).start()
+
+        # Memuat peta perintah
+        if not os.path.exists(map_path):
+            scheduler.stop()
+            raise Exception(f"{map_path} tidak ditemukan.")
+        with open(map_path, 'r') as f:
+            command_map = json.load(f)
+
+        # Kebijakan ulang per perintah (opsional; tanpa file semua label memakai COOLDOWN_PERIOD)
+        policies = {}
+        if os.path.exists(policy_path):
+            with open(policy_path, 'r') as f:
+                policies = json.load(f)
+            for label, policy in policies.items():
+                if policy.get("mode", "once") not in ("once", "repeat"):
+                    scheduler.stop()
+                    raise Exception(f"Mode kebijakan tidak dikenal untuk '{label}': {policy['mode']}")
+
+        # Pemanasan: satu prediksi agar inferensi pertama setelah berpindah tidak lambat
+        frames = model.input_shape[1] or int(DURATION * SAMPLE_RATE) // HOP_LENGTH + 1
+        scheduler.predict(np.zeros((frames, model.input_shape[2]), dtype=np.float32))
+
+        return Profile(name, model, classes, command_map, policies, scheduler, estimate_bytes(model),
+                       embedder, prototypes, load_ms=(time.perf_counter() - t0) * 1000)
+
+    def activate(self, profile):
+        """Menjadikan profil aktif: model, label, peta perintah dan penjadwal diganti sekaligus."""
+        le = LabelEncoder()
+        le.classes_ = profile.classes
+        self.active_profile = profile
+        self.model, self.le = profile.model, le
+        self.embedder, self.prototypes = profile.embedder, profile.prototypes
+        self.scheduler = profile.scheduler
+        self.command_map, self.policies = profile.command_map, profile.policies
+        self.profile_name = profile.name
+        self.profiles.pin(profile.name)
+
+    def switch_profile(self, name):
+        """
+        Berpindah profil. Profil di cache langsung aktif; profil dingin dimuat dan
+        dipanaskan di thread latar sementara profil lama tetap melayani deteksi.
+        Mengembalikan Future yang selesai (True jika berhasil) saat profil aktif.
+        """
+        done = Future()
+        if name == self.profile_name:
+            done.set_result(True)
+            return done
+        if name not in list_profiles(MODELS_PATH):
+            self.log(f"⚠️ Profil tidak ditemukan: {name}", "warning")
+            done.set_result(False)
+            return done
+
+        t0 = time.perf_counter()
+        profile = self.profiles.get(name)
+        if profile is not None:
+            self._finish_switch(profile, "cache", t0)
+            done.set_result(True)
+            return done
+
+        self.pending_profile = name
+        self.log(f"⏳ Memuat profil '{name}' di latar...")
+
+        def finished(future):
+            try:
+                profile = future.result()
+            except Exception as e:
+                self.log(f"❌ Profil '{name}' gagal dimuat: {e}", "error")
+                if self.pending_profile == name:
+                    self.pending_profile = None
+                done.set_result(False)
+                return
+            # Permintaan profil yang lebih baru menggantikan yang ini
+            if self.pending_profile == name:
+                self._finish_switch(profile, "dingin", t0)
+            done.set_result(self.profile_name == name)
+
+        self.profiles.load_async(name).add_done_callback(finished)
+        return done
+
+    def _finish_switch(self, profile, kind, t0):
+        """Mengaktifkan profil hasil perpindahan dan mencatat latensinya."""
+        self.pending_profile = None
+        self.activate(profile)
+        ms = (time.perf_counter() - t0) * 1000
+        self.switch_times.append((kind, ms))
+        self.log(f"👤 Profil aktif: {profile.name} ({kind}, {ms:.0f} ms)", "success")
+
+    def next_profile(self):
+        """Nama profil berikutnya setelah profil aktif (berputar)."""
+        names = list_profiles(MODELS_PATH)
+        index = names.index(self.profile_name) if self.profile_name in names else -1
+        return names[(index + 1) % len(names)]
+
+    def play_feedback(self, filename):
+        """Memutar file audio feedback menggunakan MCI."""
+        def _play():
+            path = os.path.join(SOUNDS_PATH, filename)
+            if not os.path.exists(path): return
+            alias = f"sound_{int(time.time() * 1000)}"
+            try:
+                # Menggunakan Windows MCI untuk memutar audio
+                ctypes.windll.winmm.mciSendStringW(f'open "{path}" type mpegvideo alias {alias}', None, 0, 0)
+                ctypes.windll.winmm.mciSendStringW(f'play {alias} wait', None, 0, 0)
+                ctypes.windll.winmm.mciSendStringW(f'close {alias}', None, 0, 0)
+            except: pass
+        threading.Thread(target=_play, daemon=True).start()
+
+    def extract_features(self, audio, denoise_mode="full"):
+        """Mengekstrak fitur MFCC dari audio (model varlen: hanya ucapan terpotong, dibulatkan ke bucket)."""
+        bucket = VARLEN_BUCKET if MODEL_VARIANT == "varlen" else None
+        return extract_features(audio, SAMPLE_RATE, DURATION, N_MFCC, bucket=bucket, denoise_mode=denoise_mode)
+
+    def classify(self, features):
+        """
+        Mengklasifikasikan fitur sesuai CLASSIFIER_MODE melalui penjadwal bersama.
+        Mengembalikan Recognition untuk prediksi teratas.
+        """
+        # Profil dibaca sekali agar perpindahan profil di tengah analisis tetap konsisten
+        profile = self.active_profile
+        output = profile.scheduler.predict(features)
+
+        if CLASSIFIER_MODE == "prototype":
+            sims = profile.prototypes.similarities(output)
+            return self._top_k(profile.prototypes.labels, sims, PROTOTYPE_THRESHOLD)
+
+        if CLASSIFIER_MODE == "both":
+            embedding, predictions = output
+            # Perintah yang hanya terdaftar sebagai prototipe (belum ada di head softmax)
+            sims = profile.prototypes.similarities(embedding)
+            proto = self._top_k(profile.prototypes.labels, sims, PROTOTYPE_THRESHOLD)
+            if proto.label not in profile.classes and proto.confidence >= PROTOTYPE_THRESHOLD:
+                return proto
+        else:
+            predictions = output
+
+        return self._top_k(profile.classes, predictions, CONFIDENCE_THRESHOLD)
+
+    def _top_k(self, labels, scores, threshold):
+        """Membentuk Recognition dari skor per label."""
+        order = np.argsort(scores)[::-1][:TOP_K]
+        top_k = [(str(labels[i]), float(scores[i])) for i in order]
+        return Recognition(top_k[0][0], top_k[0][1], threshold, top_k)
+
+    def analyze(self, snapshot):
+        """Ekstraksi fitur dan prediksi untuk satu snapshot audio, beserta waktu per tahap."""
+        t0 = time.perf_counter()
+        mode, _ = choose_denoise(snapshot, DENOISE_POLICY)
+        features = self.extract_features(snapshot, mode)
+        t1 = time.perf_counter()
+        result = self.classify(features)
+        t2 = time.perf_counter()
+        result.timings = {"features_ms": (t1 - t0) * 1000, "inference_ms": (t2 - t1) * 1000}
+        result.denoise = mode
+        self.denoise_counts[mode] = self.denoise_counts.get(mode, 0) + 1
+        # Model kandidat menilai tensor fitur yang sama setelah hasil live siap
+        if self.shadow is not None:
+            self.shadow.submit(features, result)
+        return result
+
+    def policy(self, label):
+        """
+        Kebijakan ulang untuk satu label: "repeat" hanya mengabaikan label yang sama
+        selama `debounce` detik (deteksi perintah lain tetap berjalan), "once" menjeda
+        seluruh deteksi sumber selama `debounce` detik (peluncuran aplikasi, wake/sleep).
+        """
+        policy = {"mode": "once", "debounce": COOLDOWN_PERIOD}
+        policy.update(self.policies.get("_default", {}))
+        policy.update(self.policies.get(label, {}))
+        return policy
+
+    def apply_policy(self, source, label, now):
+        """Mencatat eksekusi label dan menerapkan jeda sesuai kebijakannya."""
+        policy = self.policy(label)
+        source.last_label_time[label] = now
+        source.mark_consumed()
+        if policy["mode"] == "once":
+            source.holdoff_until = now + policy["debounce"]
+
+    def debounced(self, source, label, now):
+        """True jika label yang sama baru saja dieksekusi (masih dalam debounce)."""
+        last = source.last_label_time.get(label)
+        return last is not None and now - last < self.policy(label)["debounce"]
+
+    def _run_actions(self):
+        """Thread aksi: menjalankan aksi dari antrian secara berurutan."""
+        while True:
+            label = self.action_queue.get()
+            if label is None:
+                break
+            try:
+                self.execute_action(label)
+            except Exception as e:
+                self.log(f"❌ Kesalahan Aksi: {e}", "error")
+
+    def execute_action(self, label):
+        """Menjalankan aksi berdasarkan label perintah."""
+        if label in self.command_map:
+            action = self.command_map[label]
+            if not action or action.lower() == "none": return
+
+            # Jika aksi adalah shortcut keyboard
+            if action.startswith("key:"):
+                keys_str = action[4:].strip()
+                keys = keys_str.split('+')
+                self.log(f"⌨️ [AUTO] Shortcut Keyboard: {keys_str}", "success")
+                try:
+                    pyautogui.hotkey(*keys)
+                except Exception as e:
+                    self.log(f"❌ Kesalahan Keyboard: {e}", "error")
+                return
+
+            # Jika aksi adalah perintah khusus (Internal Command)
+            if action.startswith("cmd:"):
+                cmd = action[4:].strip()
+                self.log(f"⚙️ [SYSTEM] Perintah Internal: {cmd}", "info")
+                try:
+                    if cmd == "alt_tab_start":
+                        if 'alt' not in self.held_keys:
+                            pyautogui.keyDown('alt')
+                            self.held_keys.add('alt')
+                        pyautogui.press('tab')
+                        self.log("🔀 Alt+Tab Aktif (Alt ditahan)", "success")
+                    elif cmd == "alt_tab_stop":
+                        for key in list(self.held_keys):
+                            pyautogui.keyUp(key)
+                            self.log(f"🔓 Melepas tombol: {key}", "info")
+                        self.held_keys.clear()
+                        self.log("✅ Semua tombol dilepas", "success")
+                    elif cmd.startswith("profile:"):
+                        self.switch_profile(cmd[len("profile:"):].strip())
+                    elif cmd == "profile_next":
+                        self.switch_profile(self.next_profile())
+                except Exception as e:
+                    self.log(f"❌ Kesalahan Perintah: {e}", "error")
+                return
+
+            # Jika aksi adalah membuka aplikasi
+            app_name = action
+            app_path = os.path.join(APPS_PATH, app_name)
+            if os.path.exists(app_path):
+                self.log(f"🚀 [AUTO] Membuka aplikasi: {app_name}", "success")
+                try:
+                    os.startfile(app_path)
+                except Exception as e:
+                    self.log(f"❌ Kesalahan Membuka: {e}", "error")
+            else:
+                self.log(f"⚠️ File shortcut tidak ditemukan: {app_name}", "warning")
+
+    def record_event(self, source, outcome, now, result=None):
+        """Meneruskan satu trigger ke penyimpanan event (tidak memblokir)."""
+        if self.event_store is None or source.trigger_info is None:
+            return
+        started, awake, rms, snr_db, snapshot = source.trigger_info
+        source.trigger_info = None
+        self.event_store.record(
+            outcome, ts=started, source=source.name, awake=awake, result=result,
+            rms=rms, snr_db=snr_db, latency_ms=(now - started) * 1000 if result is not None else None,
+            audio=snapshot
+        )
+
+    def handle_prediction(self, source, result, now):
+        """
+        Menerapkan state machine Awake/Standby untuk hasil prediksi satu sumber.
+        Mengembalikan hasil penanganan (background, low_confidence, wake, sleep, action,
+        debounced, ignored).
+        """
+        tag = f"[{source.name}] " if len(self.sources) > 1 else ""
+        is_primary = source is self.primary
+        label, confidence = result.label, result.confidence
+
+        # Abaikan jika background noise
+        if label == "background":
+            return "background"
+        # Abaikan jika confidence rendah
+        if confidence < result.threshold:
+            if source.is_awake:
+                self.log(f"❓ {tag}Deteksi confidence rendah: {label} ({confidence*100:.1f}%)", "warning")
+            return "low_confidence"
+
+        # Jika sumber dalam mode standby
+        if not source.is_awake:
+            # Perintah wake-up
+            if label == "hello_voicecmd":
+                source.is_awake = True
+                if is_primary:
+                    self.state_callback(True)
+                self.log(f"💡 {tag}Sistem AKTIF", "success")
+                self.play_feedback('active.mp3')
+                self.apply_policy(source, label, now)
+                return "wake"
+            return "ignored"
+        # Jika sumber sudah aktif
+        else:
+            # Perintah sleep
+            if label == "sleep_cmd":
+                source.is_awake = False
+                if is_primary:
+                    self.state_callback(False)
+                self.log(f"😴 {tag}Sistem STANDBY", "info")
+                self.play_feedback('standby.mp3')
+                self.apply_policy(source, label, now)
+                return "sleep"
+            # Label yang sama masih dalam debounce kebijakannya
+            elif self.debounced(source, label, now):
+                source.mark_consumed()
+                return "debounced"
+            # Perintah lainnya
+            else:
+                self.log(f"🎯 {tag}COCOK: {label.upper()} ({confidence*100:.1f}%)", "success")
+                self.history_queue.put((label, confidence))
+                self.action_queue.put(label)
+                self.apply_policy(source, label, now)
+                return "action"
+
+    def poll_source(self, source, now):
+        """
+        Satu langkah deteksi non-blocking untuk satu sumber:
+        trigger RMS -> tunggu TRIGGER_DELAY -> analisis di thread pool -> tangani hasil.
+        """
+        # Hasil analisis sebelumnya sudah siap?
+        if source.pending is not None:
+            if not source.pending.done():
+                return
+            future, source.pending = source.pending, None
+            try:
+                result = future.result()
+                if not result.accepted:
+                    self.n_discarded += 1
+                outcome = self.handle_prediction(source, result, now)
+                self.record_event(source, outcome or "reported", now, result)
+            except Exception as e:
+                self.log(f"❌ Kesalahan Prediksi: {e}", "error")
+            return
+
+        # Jeda setelah perintah berkebijakan "once"
+        if now < source.holdoff_until:
+            return
+
+        standby = self.low_power_standby and not source.is_awake
+        if source.trigger_time is None:
+            # Jika terdeteksi suara di atas threshold (gate energi didesimasi saat standby)
+            rms = source.rms(decimate=STANDBY_DECIMATION if standby else 1)
+            if source.trigger.update(rms, now):
+                if source.is_awake:
+                    self.log(f"✨ Suara Terdeteksi (RMS: {rms:.3f}, SNR: {source.trigger.snr_db:.1f} dB) - Menganalisis...", "debug")
+                source.trigger_time = now
+                source.trigger_info = [now, source.is_awake, rms, source.trigger.snr_db if source.trigger.adaptive else None, None]
+            return
+
+        # Tunggu sedikit untuk memastikan audio lengkap
+        if now - source.trigger_time >= TRIGGER_DELAY:
+            source.trigger_time = None
+            # Audio yang sudah dikenali sebagai perintah dinolkan (lihat snapshot_since)
+            snapshot, source.snapshot_total = source.buffer.snapshot_since(source.consumed)
+            if source.trigger_info is not None:
+                source.trigger_info[4] = snapshot
+            # Saat standby, model hanya dijalankan jika suara lolos gate wake
+            if standby and not self.wake_gate(snapshot, source.trigger.floor):
+                self.n_gated += 1
+                self.record_event(source, "gated", now)
+                return
+            source.pending = self.analysis_pool.submit(self.analyze, snapshot)
+            self.n_inferences += 1
+
+    def trigger_stats(self, now=None):
+        """Statistik trigger: jumlah inferensi, yang terbuang, laju per jam dan noise floor sumber utama."""
+        now = time.time() if now is None else now
+        hours = max(now - self.started, 1e-6) / 3600
+        return {
+            "inferences": self.n_inferences,
+            "discarded": self.n_discarded,
+            "discard_rate": self.n_discarded / self.n_inferences if self.n_inferences else 0.0,
+            "inferences_per_hour": self.n_inferences / hours,
+            "gated": self.n_gated,
+            "noise_floor_db": self.primary.trigger.floor_db if self.primary and self.primary.trigger.adaptive else None,
+            "overflows": sum(s.n_overflows for s in self.supervisors),
+            "dropped_seconds": sum(s.n_dropped_frames for s in self.supervisors) / SAMPLE_RATE,
+            "reopens": sum(s.n_reopens for s in self.supervisors),
+            "denoise": dict(self.denoise_counts),
+        }
+
+    def step(self, now=None):
+        """Satu putaran pengecekan untuk semua sumber."""
+        now = time.time() if now is None else now
+        for source in self.sources:
+            self.poll_source(source, now)
+
+    def run_inference_loop(self):
+        """Loop utama untuk deteksi dan inferensi perintah suara."""
+        self.is_running = True
+        self.play_feedback('standby.mp3')
+
+        # Stream tiap mikrofon diawasi: error/macet dibuka ulang, dengan fallback ke perangkat lain
+        self.supervisors = [StreamSupervisor(source, self.log, SAMPLE_RATE) for source in self.sources if source.live]
+        low_power = self.low_power()
+        blocksize, interval = self.profile()
+        wake_mark = self.n_inferences
+        # Membuka stream audio untuk setiap mikrofon dengan blocksize profil saat ini
+        # (perangkat yang gagal dibuka dicoba lagi oleh check())
+        for supervisor in self.supervisors:
+            supervisor.open(blocksize)
+        try:
+            while self.is_running:
+                if self.low_power() != low_power:
+                    # Interval pengecekan langsung mengikuti profil baru; stream tetap terbuka
+                    low_power = self.low_power()
+                    interval = self.profile()[1]
+                    wake_mark = self.n_inferences
+                    self.log(f"🔋 Profil daya: {'standby hemat daya' if low_power else 'aktif'}", "debug")
+
+                # Blocksize baru perlu membuka ulang stream (audio sesaat hilang), jadi ditunda
+                # hingga tidak ada ucapan yang sedang diproses; setelah bangun, juga hingga
+                # perintah pertama sesudah frase wake selesai dianalisis
+                target = self.profile()[0]
+                if target != blocksize and self.sources_idle() and (low_power or self.n_inferences > wake_mark):
+                    blocksize = target
+                    for supervisor in self.supervisors:
+                        supervisor.close()
+                        supervisor.open(blocksize)
+
+                self.step()
+                for supervisor in self.supervisors:
+                    supervisor.check()
+                time.sleep(interval)
+        except Exception as e:
+            self.log(f"💥 Kesalahan Fatal Audio: {e}", "error")
+            self.is_running = False
+        finally:
+            for supervisor in self.supervisors:
+                supervisor.close()
+            self.profiles.close()
+
+    def shutdown(self):
+        """Menghentikan loop inferensi dan thread aksi, lalu menulis event yang tersisa ke disk."""
+        self.is_running = False
+        self.action_queue.put(None)
+        if self.shadow is not None:
+            self.shadow.stop()
+            self.shadow = None
+        if self.event_store is not None:
+            self.event_store.close()
+            self.event_store = None